@@ -0,0 +1,355 @@
+"""Benchmark suite for the public algorithms of mathcrypto.
+
+Every benchmark is run for a range of input sizes, so the results form a scaling curve.
+Inputs are derived from a seeded random stream and are the same on every run.
+
+Usage::
+
+    python benchmarks/bench.py --output results.json
+    python benchmarks/bench.py --output new.json --compare results.json
+    python benchmarks/bench.py --filter Primes --repeat 10
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mathcrypto import __version__  # noqa: E402
+from mathcrypto.cryptography.batch_gcd import BatchGCD  # noqa: E402
+from mathcrypto.cryptography.certificates import PrimalityCertificate  # noqa: E402
+from mathcrypto.cryptography.curve_search import CurveSearch  # noqa: E402
+from mathcrypto.cryptography.diffie_hellman import DHCracker, DHCryptosystem  # noqa: E402
+from mathcrypto.cryptography.ecdh import ECDHCryptosystem  # noqa: E402
+from mathcrypto.cryptography.elliptic_curves import EllipticCurve  # noqa: E402
+from mathcrypto.cryptography.primes import Primes  # noqa: E402
+from mathcrypto.cryptography.rng import SeededRNG  # noqa: E402
+from mathcrypto.cryptography.rsa import RSA  # noqa: E402
+from mathcrypto.export import Export  # noqa: E402
+from mathcrypto.math.funcs import MathFunctions  # noqa: E402
+from mathcrypto.math.groups import MultiplicativeGroup  # noqa: E402
+
+BENCHMARKS = []
+
+
+def benchmark(name: str, sizes: list):
+    """Registers a benchmark.
+
+    The decorated function receives the input size and a seeded random stream, prepares the inputs
+    and returns a callable without arguments. Only the returned callable is measured.
+    """
+
+    def register(setup):
+        BENCHMARKS.append((name, sizes, setup))
+        return setup
+
+    return register
+
+
+def _prime(bits: int, rng) -> int:
+    prime = Primes.get_prime(bits, rng=rng)
+    while prime.bit_length() != bits:
+        prime = Primes.get_prime(bits, rng=rng)
+    return prime
+
+
+def _curve(field: int):
+    curve = EllipticCurve(1, 0, 0, 1, 0, 2, 3, field)
+    _, points = curve.get_curve_order(get_points=True)
+    point = next(p for p in points if p != "[∞,∞]" and p[1] != 0)
+    return EllipticCurve(1, 0, 0, 1, 0, 2, 3, field, *point), point
+
+
+def _dh(bits: int, rng):
+    dh = DHCryptosystem()
+    dh.generate_from(prime=_prime(bits, rng), rng=rng)
+    return DHCryptosystem(
+        prime=dh.prime, generator=dh.generator, alice_sends=dh.alice_sends, bob_sends=dh.bob_sends
+    )
+
+
+@benchmark("Primes.get_prime", [64, 256, 512])
+def bench_get_prime(bits, rng):
+    return lambda: Primes.get_prime(bits, rng=rng)
+
+
+@benchmark("Primes.is_prime", [16, 24, 32])
+def bench_is_prime(bits, rng):
+    prime = _prime(bits, rng)
+    return lambda: Primes.is_prime(prime)
+
+
+@benchmark("Primes.is_probable_prime_fermat", [256, 512, 1024])
+def bench_is_probable_prime_fermat(bits, rng):
+    prime = _prime(bits, rng)
+    return lambda: Primes.is_probable_prime_fermat(prime, rng=rng)
+
+
+@benchmark("Primes.factorize", [8, 12, 16])
+def bench_factorize(bits, rng):
+    num = _prime(bits, rng) * _prime(bits, rng)
+    return lambda: Primes.factorize(num)
+
+
+@benchmark("MathFunctions.phi", [8, 12, 16])
+def bench_phi(bits, rng):
+    num = _prime(bits, rng) * _prime(bits, rng)
+    return lambda: MathFunctions.phi(num)
+
+
+@benchmark("MathFunctions.euclid_gcd", [64, 256, 1024])
+def bench_euclid_gcd(bits, rng):
+    num_a, num_b = rng.getrandbits(bits), rng.getrandbits(bits)
+    return lambda: MathFunctions.euclid_gcd(num_a, num_b)
+
+
+@benchmark("MathFunctions.crt", [2, 4, 8])
+def bench_crt(count, rng):
+    moduli = set()
+    while len(moduli) < count:
+        moduli.add(_prime(16, rng))
+    problem = [[rng.randrange(0, m), m] for m in moduli]
+    return lambda: MathFunctions.crt(problem)
+
+
+@benchmark("MathFunctions.eea", [64, 256, 1024])
+def bench_eea(bits, rng):
+    modulus = _prime(bits, rng)
+    number = rng.randrange(2, modulus)
+    return lambda: MathFunctions.eea(modulus, number)
+
+
+@benchmark("MultiplicativeGroup", [101, 1009, 10007])
+def bench_multiplicative_group(mod, rng):
+    return lambda: MultiplicativeGroup(mod)
+
+
+@benchmark("MultiplicativeGroup compact", [101, 1009, 10007, 1000003])
+def bench_multiplicative_group_compact(mod, rng):
+    return lambda: MultiplicativeGroup(mod, compact=True)
+
+
+@benchmark("MultiplicativeGroup.from_bytes compact", [10007, 1000003])
+def bench_group_from_bytes(mod, rng):
+    data = MultiplicativeGroup(mod, compact=True).to_bytes()
+    return lambda: MultiplicativeGroup.from_bytes(data)
+
+
+@benchmark("MultiplicativeGroup.get_element_order", [101, 1009, 10007])
+def bench_get_element_order(mod, rng):
+    group = MultiplicativeGroup(mod)
+    element = rng.randrange(2, mod)
+    return lambda: group.get_element_order(element)
+
+
+@benchmark("MultiplicativeGroup.get_element_order tables", [101, 1009, 10007])
+def bench_get_element_order_tables(mod, rng):
+    group = MultiplicativeGroup(mod, tables=True)
+    element = rng.randrange(2, mod)
+    return lambda: group.get_element_order(element)
+
+
+@benchmark("EllipticCurve.get_curve_order", [101, 503, 1009])
+def bench_get_curve_order(field, rng):
+    curve = EllipticCurve(1, 0, 0, 1, 0, 2, 3, field)
+    return curve.get_curve_order
+
+
+@benchmark("CurveSearch.search", [1009, 10007])
+def bench_curve_search(field, rng):
+    return lambda: list(CurveSearch.search(field, range(0, 4), range(1, 5), prime_order=True))
+
+
+@benchmark("Export.curve_points", [10007, 100003])
+def bench_export_curve_points(field, rng):
+    curve = EllipticCurve(1, 0, 0, 1, 0, 2, 3, field)
+    path = os.path.join(tempfile.mkdtemp(), "points.npy")
+    return lambda: Export.curve_points(curve, path)
+
+
+@benchmark("Export.group_elements", [10 ** 5, 10 ** 6])
+def bench_export_group_elements(mod, rng):
+    path = os.path.join(tempfile.mkdtemp(), "elements.npy")
+    return lambda: Export.group_elements(mod, path)
+
+
+@benchmark("EllipticCurve.add_point", [101, 503, 1009])
+def bench_add_point(field, rng):
+    curve, point = _curve(field)
+    return lambda: curve.add_point(*point)
+
+
+@benchmark("EllipticCurve.get_point_order", [101, 503, 1009])
+def bench_get_point_order(field, rng):
+    curve, point = _curve(field)
+    return lambda: curve.get_point_order(*point)
+
+
+@benchmark("DHCracker.brute_force", [12, 16])
+def bench_brute_force(bits, rng):
+    crack_me = _dh(bits, rng)
+    return lambda: DHCracker.brute_force(crack_me, 2)
+
+
+@benchmark("DHCracker.baby_step", [16, 24, 32])
+def bench_baby_step(bits, rng):
+    crack_me = _dh(bits, rng)
+    return lambda: DHCracker.baby_step(crack_me)
+
+
+@benchmark("DHCracker.baby_step_many", [16, 64, 256])
+def bench_baby_step_many(count, rng):
+    crack_me = _dh(24, rng)
+    prime, generator = crack_me.prime, crack_me.generator
+    targets = [pow(generator, rng.randrange(1, prime), prime) for _ in range(count)]
+    return lambda: list(DHCracker.baby_step_many(prime, generator, targets))
+
+
+@benchmark("BatchGCD.gcds", [256, 1024, 4096])
+def bench_batch_gcd(count, rng):
+    moduli = [rng.getrandbits(512) | 1 for _ in range(count)]
+    return lambda: BatchGCD.gcds(moduli)
+
+
+@benchmark("PrimalityCertificate.verify", [256, 1024, 2048])
+def bench_certificate_verify(bits, rng):
+    certificate = PrimalityCertificate.generate(bits, rng=rng)
+    return certificate.verify
+
+
+@benchmark("RSAPrivateKey.decrypt", [1024, 2048])
+def bench_rsa_decrypt(bits, rng):
+    key = RSA.generate(bits, rng=rng)
+    ciphertext = key.public_key.encrypt(rng.randrange(0, key.n))
+    return lambda: key.decrypt(ciphertext)
+
+
+@benchmark("DHCryptosystem.generate_sessions", [1024, 2048])
+def bench_dh_sessions(bits, rng):
+    dh = DHCryptosystem(prime=_prime(bits, rng), generator=2)
+    return lambda: list(dh.generate_sessions(16, rng=rng))
+
+
+@benchmark("ECDHCryptosystem.generate_keys P-256", [16, 256])
+def bench_ecdh_keys(count, rng):
+    ecdh = ECDHCryptosystem.named("P-256")
+    ecdh.multiply_generator(1)  # builds the fixed-base table outside the measurement
+    return lambda: list(ecdh.generate_keys(count, rng=rng))
+
+
+def run(seed: int = 0, repeat: int = 5, name_filter: str = None) -> dict:
+    """Runs the registered benchmarks.
+
+    Args:
+        seed (int, optional): Seed of the input generation. Defaults to 0.
+        repeat (int, optional): Number of timed runs per case. Defaults to 5.
+        name_filter (str, optional): Only run benchmarks whose name contains this string.
+
+    Returns:
+        dict: Metadata and a list of results with per-call timings in seconds and peak memory in bytes
+    """
+    results = []
+    for name, sizes, setup in BENCHMARKS:
+        if name_filter and name_filter not in name:
+            continue
+        for size in sizes:
+            func = setup(size, SeededRNG(seed, size))
+            timer = timeit.Timer(func)
+            number, _ = timer.autorange()
+            timings = [elapsed / number for elapsed in timer.repeat(repeat, number)]
+            tracemalloc.start()
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results.append(
+                {
+                    "name": name,
+                    "size": size,
+                    "min": min(timings),
+                    "median": statistics.median(timings),
+                    "peak_memory": peak,
+                }
+            )
+            print(f"{name:<42} {size:>6} {min(timings):>12.9f}s {peak:>12}B", file=sys.stderr)
+    return {
+        "version": __version__,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "seed": seed,
+        "results": results,
+    }
+
+
+def compare(old: dict, new: dict, threshold: float = 0.2) -> tuple:
+    """Compares two benchmark runs.
+
+    Args:
+        old (dict): Baseline run
+        new (dict): Current run
+        threshold (float, optional): Relative slowdown of the fastest run reported as a regression. Defaults to 0.2.
+
+    Returns:
+        (tuple): tuple containing:
+
+            - str: Human readable report
+            - int: Number of regressions
+    """
+    baseline = {(r["name"], r["size"]): r for r in old["results"]}
+    lines = [
+        f"Comparing {old['version']} (python {old['python']}) with {new['version']} (python {new['python']})",
+        f"{'benchmark':<42} {'size':>6} {'old':>12} {'new':>12} {'ratio':>7} {'memory':>7}",
+    ]
+    regressions = 0
+    for result in new["results"]:
+        before = baseline.get((result["name"], result["size"]))
+        if before is None:
+            lines.append(f"{result['name']:<42} {result['size']:>6} {'-':>12} {result['min']:>12.9f}    new")
+            continue
+        ratio = result["min"] / before["min"] if before["min"] else float("inf")
+        memory = result["peak_memory"] / before["peak_memory"] if before["peak_memory"] else 1.0
+        status = ""
+        if ratio > 1 + threshold:
+            status = "REGRESSION"
+            regressions += 1
+        elif ratio < 1 - threshold:
+            status = "improved"
+        lines.append(
+            f"{result['name']:<42} {result['size']:>6} {before['min']:>12.9f} {result['min']:>12.9f} "
+            f"{ratio:>7.2f} {memory:>7.2f} {status}"
+        )
+    lines.append(f"{regressions} regression(s) above {threshold:.0%}")
+    return "\n".join(lines), regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--filter", dest="name_filter")
+    parser.add_argument("--output", help="File to write the results to as JSON")
+    parser.add_argument("--compare", help="Results of a previous run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    results = run(args.seed, args.repeat, args.name_filter)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            report, regressions = compare(json.load(file), results, args.threshold)
+        print(report)  # noqa: T001
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,11 @@
 from . import cryptography  # noqa: F401
 from . import math  # noqa: F401
+from . import instrumentation  # noqa: F401
+from . import backend  # noqa: F401
+from . import serialization  # noqa: F401
+from . import export  # noqa: F401
+from . import reference  # noqa: F401
+from . import verification  # noqa: F401
+from . import dispatch  # noqa: F401
 
 __version__ = "0.3.2"
@@ -0,0 +1,213 @@
+"""Asyncio counterparts of the long-running functions.
+
+The work runs in shared executors, so awaiting it does not block the event loop.
+CPU-bound solvers run in a process pool because CPython keeps the GIL during big integer arithmetic.
+Functions that mostly wait, such as :meth:`DHCracker.brute_force` waiting for its own processes,
+run in a thread pool.
+
+Cancelling the awaiting task sets a cancellation token that the solver checks in batches,
+so the worker process stops and frees its slot in the pool instead of running to the end.
+
+Example::
+
+    from mathcrypto import aio
+
+    aio.configure(process_workers=4, max_concurrency=16)
+    prime = await aio.get_prime(1024)
+    factors = await aio.factorize(prime - 1, timeout=10)
+"""
+import asyncio
+import functools
+import multiprocessing
+import os
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from .cryptography.control import CancellationToken, SolverControl
+from .cryptography.diffie_hellman import DHCracker
+from .cryptography.primes import Primes
+
+_config = {"thread_workers": None, "process_workers": None, "max_concurrency": None}
+_lock = threading.Lock()
+_thread_executor = None
+_process_executor = None
+_manager = None
+_semaphores = weakref.WeakKeyDictionary()
+
+
+def configure(thread_workers: int = None, process_workers: int = None, max_concurrency: int = None):
+    """Configures the shared executors. Running executors are shut down and recreated on next use.
+
+    Args:
+        thread_workers (int, optional): Size of the thread pool. Defaults to the ``ThreadPoolExecutor`` default.
+        process_workers (int, optional): Size of the process pool. Defaults to the number of CPUs.
+        max_concurrency (int, optional): Maximum number of calls running at once per event loop. \
+            Further calls wait for a free slot. Defaults to no limit.
+    """
+    shutdown()
+    _config.update(
+        thread_workers=thread_workers, process_workers=process_workers, max_concurrency=max_concurrency
+    )
+
+
+def shutdown(wait: bool = False):
+    """Shuts down the shared executors
+
+    Args:
+        wait (bool, optional): Whether to wait for running calls to finish. Defaults to False.
+    """
+    global _thread_executor, _process_executor, _manager
+    with _lock:
+        if _thread_executor is not None:
+            _thread_executor.shutdown(wait=wait)
+        if _process_executor is not None:
+            _process_executor.shutdown(wait=wait)
+        if _manager is not None:
+            _manager.shutdown()
+        _thread_executor = _process_executor = _manager = None
+        _semaphores.clear()
+
+
+def _get_thread_executor() -> ThreadPoolExecutor:
+    global _thread_executor
+    with _lock:
+        if _thread_executor is None:
+            _thread_executor = ThreadPoolExecutor(max_workers=_config["thread_workers"])
+        return _thread_executor
+
+
+def _get_process_executor() -> ProcessPoolExecutor:
+    global _process_executor
+    with _lock:
+        if _process_executor is None:
+            _process_executor = ProcessPoolExecutor(max_workers=_config["process_workers"] or os.cpu_count())
+        return _process_executor
+
+
+def _get_event():
+    """Creates an event shared with the worker processes"""
+    global _manager
+    with _lock:
+        if _manager is None:
+            _manager = multiprocessing.Manager()
+        return _manager.Event()
+
+
+def _get_semaphore():
+    if _config["max_concurrency"] is None:
+        return None
+    loop = asyncio.get_running_loop()
+    if loop not in _semaphores:
+        _semaphores[loop] = asyncio.Semaphore(_config["max_concurrency"])
+    return _semaphores[loop]
+
+
+def _run_controlled(func, args: tuple, event, timeout: float):
+    """Runs ``func`` with a SolverControl built from the parts that can cross the process boundary"""
+    return func(*args, control=SolverControl(timeout=timeout, token=CancellationToken(event)))
+
+
+async def _run(executor, func, *args):
+    loop = asyncio.get_running_loop()
+    semaphore = _get_semaphore()
+    if semaphore is None:
+        return await loop.run_in_executor(executor, func, *args)
+    async with semaphore:
+        return await loop.run_in_executor(executor, func, *args)
+
+
+async def _run_cancellable(executor, func, args: tuple, timeout: float = None, event=None):
+    event = event if event is not None else _get_event()
+    try:
+        return await _run(executor, _run_controlled, func, args, event, timeout)
+    except asyncio.CancelledError:
+        event.set()
+        raise
+
+
+async def run_in_thread(func, *args, **kwargs):
+    """Runs any function in the shared thread pool
+
+    Args:
+        func (callable): Function to run
+        *args: Positional arguments of ``func``
+        **kwargs: Keyword arguments of ``func``
+
+    Returns:
+        Whatever ``func`` returns
+    """
+    return await _run(_get_thread_executor(), functools.partial(func, *args, **kwargs))
+
+
+async def run_in_process(func, *args, **kwargs):
+    """Runs any picklable function in the shared process pool
+
+    Args:
+        func (callable): Function to run
+        *args: Positional arguments of ``func``
+        **kwargs: Keyword arguments of ``func``
+
+    Returns:
+        Whatever ``func`` returns
+    """
+    return await _run(_get_process_executor(), functools.partial(func, *args, **kwargs))
+
+
+async def get_prime(bit_length: int, rng=None) -> int:
+    """Async :meth:`Primes.get_prime`, runs in the process pool"""
+    return await run_in_process(Primes.get_prime, bit_length, rng=rng)
+
+
+async def factorize(num: int, timeout: float = None) -> list:
+    """Async :meth:`Primes.factorize`, runs in the process pool
+
+    Args:
+        num (int): Number to factorize
+        timeout (float, optional): Seconds after which the worker stops
+
+    Raises:
+        SolverInterrupted: If the timeout passed
+
+    Returns:
+        list: List of factors including duplicates
+    """
+    return await _run_cancellable(_get_process_executor(), Primes.factorize, (num,), timeout)
+
+
+async def baby_step(crack_me, timeout: float = None) -> int or None:
+    """Async :meth:`DHCracker.baby_step`, runs in the process pool. Only the public values are sent to it.
+
+    Args:
+        crack_me (DHCryptosystem object): Object containing the publicly know values of the cryptosystem.
+        timeout (float, optional): Seconds after which the worker stops
+
+    Raises:
+        SolverInterrupted: If the timeout passed
+
+    Returns:
+        int or None: int if a key was found, else None
+    """
+    return await _run_cancellable(_get_process_executor(), DHCracker.baby_step, (crack_me.public(),), timeout)
+
+
+async def brute_force(crack_me, num_cpus: int, timeout: float = None) -> int or None:
+    """Async :meth:`DHCracker.brute_force`
+
+    Waiting for the cracking processes happens in the thread pool.
+    Cancelling the task terminates the cracking processes.
+
+    Args:
+        crack_me (DHCryptosystem object): Needs to be containing the publicly known values of the cryptosystem.
+        num_cpus (int): Number of processes to spawn
+        timeout (float, optional): Seconds after which the processes are terminated
+
+    Raises:
+        SolverInterrupted: If the timeout passed
+
+    Returns:
+        int or None: int if a key was found, else None
+    """
+    return await _run_cancellable(
+        _get_thread_executor(), DHCracker.brute_force, (crack_me, num_cpus), timeout, threading.Event()
+    )
@@ -0,0 +1,205 @@
+"""Big integer arithmetic backend.
+
+The number theoretic primitives of the library go through the functions of this module:
+:func:`powmod`, :func:`invert`, :func:`gcd`, :func:`isqrt`, :func:`is_prime` and :func:`next_prime`.
+Long computations on huge numbers, like product trees, convert their inputs with :func:`native`
+to keep the intermediate values in the backend's own integer type.
+The pure Python backend uses the built-in ``pow`` and ``math`` functions.
+If `gmpy2 <https://pypi.org/project/gmpy2/>`_ is installed, the GMP backend is selected at import time,
+which is several times faster for numbers of thousands of bits.
+
+Both backends return plain ``int`` objects and the same results, so switching changes only the speed.
+The backend is chosen with the ``MATHCRYPTO_BACKEND`` environment variable (``python`` or ``gmpy2``)
+or at runtime::
+
+    from mathcrypto import backend
+
+    backend.set_backend("python")
+"""
+import math
+import os
+
+try:
+    import gmpy2
+except ImportError:  # pragma: no cover - depends on the environment
+    gmpy2 = None
+
+# Deterministic Miller-Rabin bases for every n below 3.3 * 10^24, used as the first rounds above it too
+_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+_DETERMINISTIC_LIMIT = 3317044064679887385961981
+# Fewer bases suffice for smaller numbers, (limit, bases) in ascending order
+_SMALL_BASES = ((4759123141, (2, 7, 61)), (341550071728321, (2, 3, 5, 7, 11, 13, 17)))
+# Bases of the rounds added above the deterministic limit, the same for every backend
+_EXTRA_BASES = (43, 47, 53, 59, 61, 67, 71, 73, 79, 83, 89, 97)
+
+
+def _is_strong_probable_prime(n: int, base: int, d: int, s: int, powmod) -> bool:
+    x = powmod(base, d, n)
+    if x == 1 or x == n - 1:
+        return True
+    for _ in range(s - 1):
+        x = x * x % n
+        if x == n - 1:
+            return True
+    return False
+
+
+def _miller_rabin(n: int, powmod) -> bool:
+    """Miller-Rabin with fixed bases, exact below 3.3 * 10^24 and identical for every backend above it"""
+    if n < 2:
+        return False
+    for prime in _BASES:
+        if n % prime == 0:
+            return n == prime
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d >>= 1
+        s += 1
+    bases = _BASES if n < _DETERMINISTIC_LIMIT else _BASES + _EXTRA_BASES
+    for limit, small_bases in _SMALL_BASES:
+        if n < limit:
+            bases = small_bases
+            break
+    # bases that are multiples of n say nothing about it, and n is above 41 here
+    return all(_is_strong_probable_prime(n, base, d, s, powmod) for base in bases if base % n)
+
+
+class PythonBackend:
+    """Backend on the built-in integer arithmetic"""
+
+    name = "python"
+
+    @staticmethod
+    def powmod(base: int, exponent: int, modulus: int) -> int:
+        """``base^exponent mod modulus``, negative exponents invert ``base`` first"""
+        return pow(base, exponent, modulus)
+
+    @staticmethod
+    def invert(num: int, modulus: int) -> int:
+        """Inverse of ``num`` modulo ``modulus``
+
+        Raises:
+            ValueError: If ``num`` is not invertible
+        """
+        return pow(num, -1, modulus)
+
+    gcd = staticmethod(math.gcd)
+    isqrt = staticmethod(math.isqrt)
+    native = int
+
+    @classmethod
+    def is_prime(cls, num: int) -> bool:
+        """Miller-Rabin test, exact below 3.3 * 10^24"""
+        return _miller_rabin(num, pow)
+
+    @classmethod
+    def next_prime(cls, num: int) -> int:
+        """Smallest prime greater than ``num``"""
+        if num < 2:
+            return 2
+        candidate = num + 1 + (num % 2)
+        while not cls.is_prime(candidate):
+            candidate += 2
+        return candidate
+
+
+class GMPBackend:
+    """Backend on GMP through gmpy2, converting the results back to ``int``"""
+
+    name = "gmpy2"
+
+    @staticmethod
+    def powmod(base: int, exponent: int, modulus: int) -> int:
+        """``base^exponent mod modulus``, negative exponents invert ``base`` first"""
+        try:
+            return int(gmpy2.powmod(base, exponent, modulus))
+        except ZeroDivisionError:
+            raise ValueError("base is not invertible for the given modulus")
+
+    @staticmethod
+    def invert(num: int, modulus: int) -> int:
+        """Inverse of ``num`` modulo ``modulus``
+
+        Raises:
+            ValueError: If ``num`` is not invertible
+        """
+        try:
+            return int(gmpy2.invert(num, modulus))
+        except ZeroDivisionError:
+            raise ValueError("base is not invertible for the given modulus")
+
+    @staticmethod
+    def gcd(*nums: int) -> int:
+        """Greatest common divisor"""
+        return int(gmpy2.gcd(*nums)) if nums else 0
+
+    @staticmethod
+    def isqrt(num: int) -> int:
+        """Integer square root"""
+        return int(gmpy2.isqrt(num))
+
+    @staticmethod
+    def native(num: int):
+        """``num`` as an ``mpz``, for long chains of products that should stay in GMP"""
+        return gmpy2.mpz(num)
+
+    @classmethod
+    def is_prime(cls, num: int) -> bool:
+        """Miller-Rabin test with the same bases as the Python backend, on GMP arithmetic"""
+        return _miller_rabin(num, cls.powmod)
+
+    @classmethod
+    def next_prime(cls, num: int) -> int:
+        """Smallest prime greater than ``num``"""
+        if num < 2:
+            return 2
+        candidate = num + 1 + (num % 2)
+        while not cls.is_prime(candidate):
+            candidate += 2
+        return candidate
+
+
+BACKENDS = {PythonBackend.name: PythonBackend, GMPBackend.name: GMPBackend}
+
+_current = None
+powmod = invert = gcd = isqrt = is_prime = next_prime = native = None
+
+
+def available() -> list:
+    """Names of the backends usable in this environment"""
+    return [name for name in BACKENDS if name != GMPBackend.name or gmpy2 is not None]
+
+
+def get_backend():
+    """The backend in use
+
+    Returns:
+        PythonBackend or GMPBackend: The backend class
+    """
+    return _current
+
+
+def set_backend(name: str):
+    """Selects the backend used by the whole library
+
+    Args:
+        name (str): ``"python"`` or ``"gmpy2"``
+
+    Raises:
+        ValueError: If the backend is unknown or its library is not installed
+    """
+    global _current, powmod, invert, gcd, isqrt, is_prime, next_prime, native
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend {name}, choose one of {list(BACKENDS)}.")
+    if name not in available():
+        raise ValueError(f"The {name} backend is not available, install {name} to use it.")
+    _current = BACKENDS[name]
+    if _current is PythonBackend:
+        # the built-ins themselves, so the default backend adds no call overhead
+        powmod, invert, gcd, isqrt = pow, PythonBackend.invert, math.gcd, math.isqrt
+    else:
+        powmod, invert, gcd, isqrt = _current.powmod, _current.invert, _current.gcd, _current.isqrt
+    is_prime, next_prime, native = _current.is_prime, _current.next_prime, _current.native
+
+
+set_backend(os.environ.get("MATHCRYPTO_BACKEND") or ("gmpy2" if gmpy2 is not None else "python"))
@@ -0,0 +1,313 @@
+"""Command-line tool running the library over streams of records.
+
+Records are read from JSON lines or CSV files, or standard input, in chunks that are processed
+on a pool of ``--workers`` processes. Results are written as soon as their chunk is done,
+in input order or, with ``--unordered``, in completion order. At most ``--max-in-flight`` chunks
+are read ahead, so memory stays flat however large the input is.
+
+Every output record is the input record with the result fields added, or an ``error`` field
+if the record could not be processed. A JSON line can also be a bare number, or an array
+of the command's fields in order.
+
+Example::
+
+    $ seq 2 1000000 | mathcrypto factorize --workers 8 > factors.jsonl
+    $ mathcrypto phi --range 1 100 --output-format csv
+    $ mathcrypto dlog keys.csv --method pollard-rho --workers 4 --unordered
+"""
+import argparse
+import csv
+import functools
+import itertools
+import json
+import sys
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from . import __version__
+from .cryptography.diffie_hellman import DHCracker, DHCryptosystem
+from .cryptography.elliptic_curves import EllipticCurve
+from .cryptography.primes import Primes
+from .math.funcs import MathFunctions
+from .math.groups import MultiplicativeGroup
+
+
+@functools.lru_cache(maxsize=16)
+def _group(mod: int) -> MultiplicativeGroup:
+    """Groups are shared by the records of a worker with the same modulus"""
+    return MultiplicativeGroup(mod, compact=True)
+
+
+def _factorize(n: int, options: dict) -> dict:
+    return {"factors": Primes.factorize(n)}
+
+
+def _phi(n: int, options: dict) -> dict:
+    return {"phi": MathFunctions.phi(n)}
+
+
+def _is_prime(n: int, options: dict) -> dict:
+    return {"prime": Primes.is_prime(n)}
+
+
+def _element_order(mod: int, element: int, options: dict) -> dict:
+    return {"order": _group(mod).get_element_order(element)}
+
+
+def _curve_order(field: int, a: int, b: int, options: dict) -> dict:
+    return {"order": EllipticCurve(1, 0, 0, 1, 0, a, b, field).get_curve_order()}
+
+
+def _dlog(prime: int, generator: int, alice_sends: int, bob_sends: int, options: dict) -> dict:
+    crack_me = DHCryptosystem(prime=prime, generator=generator, alice_sends=alice_sends, bob_sends=bob_sends)
+    method = options["method"]
+    if method == "baby-step":
+        key = DHCracker.baby_step(crack_me)
+    elif method == "pollard-rho":
+        key = DHCracker.pollard_rho(crack_me)
+    else:
+        key = DHCracker.index_calculus(crack_me)
+    return {"key": key}
+
+
+# command name to (function, input fields, result fields, help)
+COMMANDS = {
+    "factorize": (_factorize, ("n",), ("factors",), "Prime factors of n, see Primes.factorize"),
+    "phi": (_phi, ("n",), ("phi",), "Euler's totient of n, see MathFunctions.phi"),
+    "is-prime": (_is_prime, ("n",), ("prime",), "Primality of n, see Primes.is_prime"),
+    "element-order": (
+        _element_order,
+        ("mod", "element"),
+        ("order",),
+        "Order of an element modulo mod, see MultiplicativeGroup.get_element_order",
+    ),
+    "curve-order": (
+        _curve_order,
+        ("field", "a", "b"),
+        ("order",),
+        "Number of points of y^2 = x^3 + a*x + b, see EllipticCurve.get_curve_order",
+    ),
+    "dlog": (
+        _dlog,
+        ("prime", "generator", "alice_sends", "bob_sends"),
+        ("key",),
+        "Shared key of a Diffie-Hellman exchange from its public values, see DHCracker",
+    ),
+}
+
+
+def _run_chunk(command: str, records: list, options: dict) -> list:
+    """Processes a chunk of records. Runs inside the worker processes."""
+    function, fields, _, _ = COMMANDS[command]
+    results = []
+    for record in records:
+        if "error" in record:
+            results.append(record)
+            continue
+        try:
+            values = [record[field] for field in fields]
+        except KeyError as error:
+            results.append({**record, "error": f"missing field {error}"})
+            continue
+        try:
+            results.append({**record, **function(*map(int, values), options)})
+        except Exception as error:  # one bad record must not stop the stream
+            results.append({**record, "error": f"{type(error).__name__}: {error}"})
+    return results
+
+
+def _read_records(files: list, input_format: str, fields: tuple):
+    """Yields the records of all files, ``-`` is standard input"""
+    for name in files:
+        file = sys.stdin if name == "-" else open(name, newline="")
+        try:
+            file_format = input_format or ("csv" if name.endswith(".csv") else "jsonl")
+            if file_format == "csv":
+                yield from _read_csv(file, fields)
+            else:
+                yield from _read_jsonl(file, fields)
+        finally:
+            if file is not sys.stdin:
+                file.close()
+
+
+def _read_jsonl(file, fields: tuple):
+    for line in file:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            value = json.loads(line)
+        except ValueError:
+            yield {"line": line, "error": "invalid JSON"}
+            continue
+        if isinstance(value, dict):
+            yield value
+        elif isinstance(value, list):
+            yield dict(zip(fields, value))
+        else:
+            yield {fields[0]: value}
+
+
+def _read_csv(file, fields: tuple):
+    rows = csv.reader(file)
+    header = next(rows, None)
+    if header is None:
+        return
+    if all(cell.strip().lstrip("-").isdigit() for cell in header):
+        # no header, the columns are the command's fields
+        rows = itertools.chain([header], rows)
+        header = fields
+    for row in rows:
+        if row:
+            yield dict(zip(header, row))
+
+
+class _Writer:
+    """Writes output records as JSON lines or CSV, flushing after every chunk"""
+
+    def __init__(self, file, output_format: str, result_fields: tuple):
+        self.file = file
+        self.output_format = output_format
+        self.result_fields = result_fields
+        self._csv = None
+        self.errors = 0
+
+    def write(self, records: list):
+        for record in records:
+            if "error" in record:
+                self.errors += 1
+            if self.output_format == "jsonl":
+                self.file.write(json.dumps(record) + "\n")
+                continue
+            if self._csv is None:
+                columns = [key for key in record if key not in self.result_fields and key != "error"]
+                columns += [*self.result_fields, "error"]
+                self._csv = csv.DictWriter(self.file, columns, extrasaction="ignore", lineterminator="\n")
+                self._csv.writeheader()
+            self._csv.writerow(
+                {
+                    key: " ".join(map(str, value)) if isinstance(value, list) else value
+                    for key, value in record.items()
+                }
+            )
+        self.file.flush()
+
+
+def _process(
+    command: str, records, options: dict, workers: int, chunk_size: int, max_in_flight: int, ordered: bool
+):
+    """Yields the processed chunks, at most ``max_in_flight`` chunks are submitted and not yet yielded"""
+    chunks = iter(lambda: list(itertools.islice(records, chunk_size)), [])
+    if workers <= 1:
+        for chunk in chunks:
+            yield _run_chunk(command, chunk, options)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+
+        def submit(chunk):
+            return executor.submit(_run_chunk, command, chunk, options)
+
+        if ordered:
+            pending = deque(map(submit, itertools.islice(chunks, max_in_flight)))
+            while pending:
+                result = pending.popleft().result()
+                pending.extend(map(submit, itertools.islice(chunks, 1)))
+                yield result
+            return
+
+        pending = set(map(submit, itertools.islice(chunks, max_in_flight)))
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.update(map(submit, itertools.islice(chunks, 1)))
+                yield future.result()
+
+
+def _positive(value: str) -> int:
+    """argparse type of counts that must be at least 1"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, not {number}")
+    return number
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="mathcrypto", description="Runs mathcrypto over streams of records")
+    parser.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
+    subparsers = parser.add_subparsers(dest="command", required=True, metavar="command")
+    for name, (_, fields, result_fields, help_text) in COMMANDS.items():
+        subparser = subparsers.add_parser(name, help=help_text, description=help_text)
+        subparser.add_argument(
+            "files", nargs="*", default=["-"], help="Input files, - or none for standard input"
+        )
+        subparser.add_argument(
+            "--input-format", choices=["jsonl", "csv"], help="Input format, csv for .csv files by default"
+        )
+        subparser.add_argument(
+            "--output-format", choices=["jsonl", "csv"], default="jsonl", help="Format of the output (jsonl)"
+        )
+        subparser.add_argument("--output", "-o", help="Output file. Defaults to standard output.")
+        subparser.add_argument(
+            "--workers", "-w", type=_positive, default=1, help="Number of worker processes (1)"
+        )
+        subparser.add_argument(
+            "--chunk-size", type=_positive, default=256, help="Records per worker task (256)"
+        )
+        subparser.add_argument(
+            "--max-in-flight", type=_positive, help="Chunks submitted ahead of the output (2 * workers)"
+        )
+        subparser.add_argument(
+            "--unordered", action="store_true", help="Write results as they complete, not in input order"
+        )
+        if fields == ("n",):
+            subparser.add_argument(
+                "--range",
+                nargs=2,
+                type=int,
+                metavar=("START", "STOP"),
+                help="Process n in range(START, STOP) instead of reading records",
+            )
+        if name == "dlog":
+            subparser.add_argument(
+                "--method",
+                choices=["baby-step", "pollard-rho", "index-calculus"],
+                default="baby-step",
+                help="Discrete logarithm solver (baby-step)",
+            )
+        subparser.set_defaults(fields=fields, result_fields=result_fields)
+    return parser
+
+
+def main(argv: list = None) -> int:
+    """Runs the command-line tool
+
+    Args:
+        argv (list, optional): Arguments without the program name. Defaults to ``sys.argv[1:]``.
+
+    Returns:
+        int: Exit status, 1 if any record failed
+    """
+    args = _parser().parse_args(argv)
+    if getattr(args, "range", None):
+        records = ({"n": n} for n in range(*args.range))
+    else:
+        records = _read_records(args.files, args.input_format, args.fields)
+    options = {"method": getattr(args, "method", None)}
+    max_in_flight = args.max_in_flight or 2 * max(1, args.workers)
+
+    output = open(args.output, "w", newline="") if args.output else sys.stdout
+    try:
+        writer = _Writer(output, args.output_format, args.result_fields)
+        chunks = _process(
+            args.command, records, options, args.workers, args.chunk_size, max_in_flight, not args.unordered
+        )
+        for chunk in chunks:
+            writer.write(chunk)
+    except BrokenPipeError:
+        return 0
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 1 if writer.errors else 0
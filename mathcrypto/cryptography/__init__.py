@@ -1,3 +1,13 @@
 from .primes import Primes  # noqa: F401
-from .diffie_hellman import DHCryptosystem, DHCracker  # noqa: F401
+from .diffie_hellman import DHCryptosystem, DHCracker, DHSession  # noqa: F401
 from .elliptic_curves import EllipticCurve  # noqa: F401
+from .rng import SeededRNG, SystemRNG  # noqa: F401
+from .control import CancellationToken, SolverControl, SolverInterrupted  # noqa: F401
+from .pollard_rho import PollardRho, MemoryStore, SQLiteStore  # noqa: F401
+from .index_calculus import IndexCalculus  # noqa: F401
+from .table_cache import TableCache  # noqa: F401
+from .curve_search import CurveCandidate, CurveSearch  # noqa: F401
+from .batch_gcd import BatchGCD  # noqa: F401
+from .rsa import RSA, RSAPrivateKey, RSAPublicKey  # noqa: F401
+from .ecdh import ECDHCryptosystem  # noqa: F401
+from .certificates import PrimalityCertificate  # noqa: F401
@@ -0,0 +1,119 @@
+from .. import backend, instrumentation
+from ..math.trees import ProductTree
+from .control import SolverControl
+
+
+class BatchGCD:
+    """Bernstein's batch GCD, finds the moduli sharing a factor with any other modulus of a collection
+
+    Comparing every pair of n moduli takes n^2 / 2 gcd computations. Batch GCD builds the
+    :class:`ProductTree` of the moduli, reduces the product P modulo the square of every modulus
+    with the remainder tree and takes one gcd per modulus: ``gcd(N, (P mod N^2) / N)``
+    is the product of the factors N shares with the other moduli.
+
+    Example::
+
+        # RSA moduli generated with a weak random source
+        for factor, indexes in BatchGCD.shared_factors(moduli, num_cpus=8).items():
+            print(f"moduli {indexes} are divisible by {factor}")
+    """
+
+    @classmethod
+    def gcds(
+        cls,
+        moduli,
+        num_cpus: int = 1,
+        spill_directory: str = None,
+        control: SolverControl = None,
+    ) -> list:
+        """For every modulus, the product of the factors it shares with the other moduli
+
+        Args:
+            moduli (iterable of int): Moduli to audit, above 1
+            num_cpus (int, optional): Number of processes building the trees. Defaults to 1.
+            spill_directory (str, optional): Directory to store the product tree levels in, \
+                see :class:`ProductTree`
+            control (SolverControl, optional): Cancellation and progress, \
+                one step per level of the remainder tree
+
+        Raises:
+            SolverInterrupted: If ``control`` stopped the computation
+
+        Returns:
+            list: The gcd of every modulus with the product of the others, 1 if it shares nothing. \
+                A modulus equal to another one or covered by the others' factors gets itself.
+        """
+        moduli = list(moduli)
+        if len(moduli) < 2:
+            return [1] * len(moduli)
+        with instrumentation.span("batch_gcd"):
+            with ProductTree(moduli, num_cpus=num_cpus, spill_directory=spill_directory) as tree:
+                remainders = tree.remainders(tree.root, squares=True, control=control)
+            if instrumentation.ENABLED:
+                instrumentation.count("gcd", len(moduli))
+            return [
+                backend.gcd(remainder // modulus, modulus) for remainder, modulus in zip(remainders, moduli)
+            ]
+
+    @classmethod
+    def shared_factors(
+        cls,
+        moduli,
+        num_cpus: int = 1,
+        spill_directory: str = None,
+        control: SolverControl = None,
+    ) -> dict:
+        """Which moduli share which factors
+
+        After :meth:`gcds`, the few moduli sharing something are compared pairwise, which also splits
+        moduli whose every factor is shared, and the factors found are refined until they are coprime.
+
+        Args:
+            moduli (iterable of int): Moduli to audit, above 1
+            num_cpus (int, optional): Number of processes building the trees. Defaults to 1.
+            spill_directory (str, optional): Directory to store the product tree levels in
+            control (SolverControl, optional): Cancellation and progress of the remainder tree
+
+        Returns:
+            dict: Shared factor to the sorted list of indexes of the moduli it divides. \
+                Factors are pairwise coprime and usually prime. Identical moduli that share \
+                nothing else are reported with the modulus itself as the factor.
+        """
+        moduli = list(moduli)
+        gcds = cls.gcds(moduli, num_cpus=num_cpus, spill_directory=spill_directory, control=control)
+        weak = [index for index, common in enumerate(gcds) if common != 1]
+        found = set()
+        for position, index in enumerate(weak):
+            if gcds[index] != moduli[index]:
+                found.add(gcds[index])
+                found.add(moduli[index] // gcds[index])
+                continue
+            for other in weak[:position] + weak[position + 1 :]:
+                common = backend.gcd(moduli[index], moduli[other])
+                if common != 1:
+                    found.add(common)
+                    if common != moduli[index]:
+                        found.add(moduli[index] // common)
+        result = {}
+        for factor in cls._refine(found):
+            indexes = [index for index in weak if moduli[index] % factor == 0]
+            if len(indexes) > 1:
+                result[factor] = indexes
+        return result
+
+    @classmethod
+    def _refine(cls, numbers) -> list:
+        """Pairwise coprime numbers above 1 whose products give back every number"""
+        refined = []
+        pending = [number for number in numbers if number > 1]
+        while pending:
+            number = pending.pop()
+            for position, other in enumerate(refined):
+                common = backend.gcd(number, other)
+                if common != 1:
+                    del refined[position]
+                    pending.extend(n for n in (common, number // common, other // common) if n > 1)
+                    break
+            else:
+                refined.append(number)
+        return sorted(set(refined))
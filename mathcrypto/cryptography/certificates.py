@@ -0,0 +1,379 @@
+from .. import backend, instrumentation, serialization
+from ..backend import _DETERMINISTIC_LIMIT
+from .primes import _SMALL_PRIMES_PRODUCT, Primes
+from .rng import get_rng
+from .table_cache import TableCache
+
+_TRIAL_PRIMES = Primes.sieve(1 << 14)
+_RHO_ITERATIONS = 1 << 17
+_RHO_ATTEMPTS = 4
+_MAX_WITNESS = 1000
+
+
+def _rho_split(n: int, rng, iterations: int = _RHO_ITERATIONS) -> int or None:
+    """Non-trivial factor of the odd composite ``n`` with Brent's variant of Pollard's rho, or None"""
+    for _ in range(_RHO_ATTEMPTS):
+        y, c = rng.randrange(1, n), rng.randrange(1, n)
+        x = saved = y
+        common = product = step = 1
+        while common == 1 and step <= iterations:
+            x = y
+            for _ in range(step):
+                y = (y * y + c) % n
+            done = 0
+            while done < step and common == 1:
+                saved = y
+                for _ in range(min(128, step - done)):
+                    y = (y * y + c) % n
+                    product = product * (x - y) % n
+                common = backend.gcd(product, n)
+                done += 128
+            step *= 2
+        if common == n:
+            # the batch overshot, retrace it one gcd at a time
+            common = 1
+            while common == 1:
+                saved = (saved * saved + c) % n
+                common = backend.gcd(x - saved, n)
+        if 1 < common < n:
+            return common
+    return None
+
+
+def _partial_factors(n: int, known, rng) -> dict:
+    """Prime factors ``q: e`` of ``n - 1`` whose product is above ``sqrt(n)``
+
+    Known factors and small primes are divided out first, all of them, so smooth numbers are factored
+    completely. The rest is split with Pollard's rho until the factored part is large enough,
+    and may stay composite.
+
+    Raises:
+        ValueError: If a known factor is below 2 or ``n - 1`` could not be factored far enough
+    """
+    known = sorted(set(known or ()))
+    if known and known[0] < 2:
+        raise ValueError(f"Known factors must be at least 2, not {known[0]}.")
+    remaining = n - 1
+    factors = {}
+    factored = 1
+    for q in [*known, *_TRIAL_PRIMES]:
+        while remaining % q == 0:
+            remaining //= q
+            factors[q] = factors.get(q, 0) + 1
+            factored *= q
+
+    pending = [remaining] if remaining > 1 else []
+    while pending and factored * factored <= n:
+        piece = pending.pop()
+        for q in factors:
+            while piece % q == 0:
+                piece //= q
+        if piece == 1:
+            continue
+        if backend.is_prime(piece):
+            while remaining % piece == 0:
+                remaining //= piece
+                factors[piece] = factors.get(piece, 0) + 1
+                factored *= piece
+            continue
+        divisor = _rho_split(piece, rng)
+        if divisor is None:
+            continue
+        pending += [divisor, piece // divisor]
+    if factored * factored <= n:
+        raise ValueError(f"{n} - 1 could not be factored far enough for a certificate, pass its factors.")
+    return factors
+
+
+def _witnesses(n: int, factors) -> tuple:
+    """Smallest witness ``a`` for every prime factor q, in the order of ``factors``
+
+    ``a^(n - 1) = 1 (mod n)`` and ``gcd(a^((n - 1) / q) - 1, n) = 1``.
+
+    Raises:
+        ValueError: If ``n`` is not prime or no witness below the search limit was found
+    """
+    witnesses = {}
+    for a in range(2, _MAX_WITNESS):
+        if backend.powmod(a, n - 1, n) != 1:
+            raise ValueError(f"{n} is not prime.")
+        for q in factors:
+            if q not in witnesses and backend.gcd(backend.powmod(a, (n - 1) // q, n) - 1, n) == 1:
+                witnesses[q] = a
+        if len(witnesses) == len(factors):
+            return tuple(witnesses[q] for q in factors)
+    raise ValueError(f"No Pocklington witness found for {n}.")
+
+
+class PrimalityCertificate:
+    """Proof that a number is prime, checked by :meth:`verify` in milliseconds
+
+    The certificate is a chain of Pocklington steps. A step for the prime p lists prime factors
+    q^e of ``p - 1`` whose product F is above ``sqrt(p)`` and a witness a for every q with
+    ``a^(p - 1) = 1 (mod p)`` and ``gcd(a^((p - 1) / q) - 1, p) = 1``. Every prime factor of p is then
+    ``1 mod F``, so above ``sqrt(p)``, and p is prime. Every q needs its own step, except primes below
+    3.3 * 10^24, where the Miller-Rabin test of :meth:`Primes.is_prime` is exact. Above that bound it is
+    only probable, so larger factors always get a step.
+    A step with ``p - 1`` completely factored is a Pratt certificate.
+
+    :meth:`prove` certifies a given prime when ``p - 1`` factors easily: by trial division,
+    Pollard's rho, or the factors passed. For other primes, elliptic curve proofs (ECPP) would be needed,
+    which are not implemented. :meth:`generate` creates primes together with their certificates,
+    safe primes included, by building ``p - 1`` from a certified prime, so proving costs nothing extra.
+
+    Example::
+
+        certificate = PrimalityCertificate.generate(2048, safe=True)
+        dh.generate_from(prime=certificate.prime, primitive_root=True)
+
+        cache = TableCache("~/.cache/mathcrypto")
+        PrimalityCertificate.prove(prime, cache=cache)  # proves once, verifies the cached proof later
+
+    Args:
+        prime (int): The certified number
+        steps (dict, optional): Prime p to ``(factors, witnesses)``, with ``factors`` a tuple of ``(q, e)`` \
+            pairs and ``witnesses`` a tuple of one witness per pair. Defaults to no steps.
+    """
+
+    __slots__ = ("prime", "steps")
+
+    cache_kind = "prime_certificate"
+
+    def __init__(self, prime: int, steps: dict = None):
+        self.prime = prime
+        self.steps = steps if steps is not None else {}
+
+    def __repr__(self):
+        return f'<PrimalityCertificate prime="{self.prime}" method="{self.method}" steps="{len(self.steps)}">'
+
+    def __reduce__(self):
+        return PrimalityCertificate, (self.prime, self.steps)
+
+    @property
+    def method(self) -> str:
+        """``"miller-rabin"`` below 3.3 * 10^24, ``"pratt"`` if ``prime - 1`` is fully factored, \
+            else ``"pocklington"``"""
+        if self.prime not in self.steps:
+            return "miller-rabin"
+        factors, _ = self.steps[self.prime]
+        factored = 1
+        for q, e in factors:
+            factored *= q ** e
+        return "pratt" if factored == self.prime - 1 else "pocklington"
+
+    def verify(self) -> bool:
+        """Checks every step of the certificate
+
+        Returns:
+            bool: True if the certificate proves that :attr:`prime` is prime
+        """
+        if instrumentation.ENABLED:
+            instrumentation.count("certificate.verify")
+        for p, (factors, witnesses) in self.steps.items():
+            if p < 3 or len(factors) != len(witnesses):
+                return False
+            factored = 1
+            for q, e in factors:
+                factored *= q ** e
+            if (p - 1) % factored or factored * factored <= p:
+                return False
+            full_powers = set()
+            for (q, _), a in zip(factors, witnesses):
+                if q not in self.steps and not (q < _DETERMINISTIC_LIMIT and backend.is_prime(q)):
+                    return False
+                if a not in full_powers:
+                    if backend.powmod(a, p - 1, p) != 1:
+                        return False
+                    full_powers.add(a)
+                if backend.gcd(backend.powmod(a, (p - 1) // q, p) - 1, p) != 1:
+                    return False
+        if self.prime in self.steps:
+            return True
+        return self.prime < _DETERMINISTIC_LIMIT and backend.is_prime(self.prime)
+
+    def _columns(self) -> dict:
+        """The steps as columns of non-negative integers, see :meth:`_from_columns`"""
+        columns = {"primes": [], "counts": [], "factors": [], "exponents": [], "witnesses": []}
+        for p, (factors, witnesses) in self.steps.items():
+            columns["primes"].append(p)
+            columns["counts"].append(len(factors))
+            columns["factors"] += [q for q, _ in factors]
+            columns["exponents"] += [e for _, e in factors]
+            columns["witnesses"] += witnesses
+        return columns
+
+    @classmethod
+    def _from_columns(cls, prime: int, columns: dict):
+        steps = {}
+        position = 0
+        factors = list(columns["factors"])
+        exponents = list(columns["exponents"])
+        witnesses = list(columns["witnesses"])
+        for p, count in zip(columns["primes"], columns["counts"]):
+            end = position + count
+            steps[p] = (
+                tuple(zip(factors[position:end], exponents[position:end])),
+                tuple(witnesses[position:end]),
+            )
+            position = end
+        return cls(prime, steps)
+
+    def to_bytes(self) -> bytes:
+        """Compact binary form, see :meth:`from_bytes` and :mod:`mathcrypto.serialization`"""
+        columns = self._columns()
+        return serialization.encode(b"cert", [self.prime], columns.values())
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Reads a certificate written by :meth:`to_bytes`. Call :meth:`verify` before trusting it.
+
+        Args:
+            data (bytes, bytearray or memoryview): The binary form
+
+        Raises:
+            ValueError: If ``data`` is not a certificate written by :meth:`to_bytes`
+
+        Returns:
+            PrimalityCertificate: The certificate
+        """
+        values, arrays = serialization.decode(data, b"cert")
+        if len(values) != 1 or len(arrays) != 5:
+            raise ValueError("The data does not hold a certificate.")
+        names = ("primes", "counts", "factors", "exponents", "witnesses")
+        return cls._from_columns(values[0], dict(zip(names, arrays)))
+
+    @classmethod
+    def cached(cls, prime: int, cache: TableCache):
+        """Certificate of ``prime`` from ``cache`` if it is there and verifies
+
+        Args:
+            prime (int): The prime
+            cache (TableCache): Cache the certificates are stored in
+
+        Returns:
+            PrimalityCertificate or None: The verified certificate, None if missing or invalid
+        """
+        table = cache.get(cls.cache_kind, (prime,))
+        if table is None:
+            return None
+        try:
+            certificate = cls._from_columns(prime, table.columns)
+        finally:
+            table.close()
+        return certificate if certificate.verify() else None
+
+    def store(self, cache: TableCache):
+        """Stores the certificate in ``cache``, keyed by :attr:`prime`"""
+        if self.steps:
+            cache.put(self.cache_kind, (self.prime,), self._columns(), {"method": self.method}).close()
+
+    @classmethod
+    def prove(cls, prime: int, factors=None, cache: TableCache = None, rng=None):
+        """Certifies a prime whose ``prime - 1`` factors easily
+
+        Args:
+            prime (int): The number to certify
+            factors (iterable of int, optional): Known prime factors of ``prime - 1``, \
+                they are certified too. Needed when ``prime - 1`` has several factors too large for Pollard's rho.
+            cache (TableCache, optional): Certificates of ``prime`` and of the factors are looked up here \
+                and verified instead of proven again, and the new certificate is stored
+            rng (SeededRNG or SystemRNG, optional): Random source of Pollard's rho. \
+                Defaults to the shared ``SystemRNG``.
+
+        Raises:
+            ValueError: If ``prime`` is not prime, a known factor is below 2 \
+                or ``prime - 1`` could not be factored far enough
+
+        Returns:
+            PrimalityCertificate: The verified certificate
+        """
+        with instrumentation.span("prove_prime"):
+            if cache is not None:
+                certificate = cls.cached(prime, cache)
+                if certificate is not None:
+                    return certificate
+            steps = {}
+            cls._prove(prime, factors, steps, cache, get_rng(rng))
+            certificate = cls(prime, steps)
+            if cache is not None:
+                certificate.store(cache)
+            return certificate
+
+    @classmethod
+    def _prove(cls, n: int, known, steps: dict, cache: TableCache, rng):
+        if n in steps:
+            return
+        if not backend.is_prime(n):
+            raise ValueError(f"{n} is not prime.")
+        if n < _DETERMINISTIC_LIMIT:
+            return
+        if cache is not None and known is None:
+            certificate = cls.cached(n, cache)
+            if certificate is not None:
+                steps.update(certificate.steps)
+                return
+        factors = _partial_factors(n, known, rng)
+        for q in factors:
+            cls._prove(q, None, steps, cache, rng)
+        factors = tuple(sorted(factors.items()))
+        steps[n] = (factors, _witnesses(n, [q for q, _ in factors]))
+
+    @classmethod
+    def generate(cls, bit_length: int, safe: bool = False, rng=None):
+        """Generates a prime of exactly ``bit_length`` bits with its certificate
+
+        Like Maurer's algorithm, a certified prime s of a little more than half the size is generated first
+        and candidates ``2 * R * s + 1`` are tested, so the certificate of the result is one step on top of
+        that of s. A safe prime ``p = 2q + 1`` has q built like that and a step ``p - 1 = 2q`` on top.
+
+        Args:
+            bit_length (int): Bit size of the prime, at least 3
+            safe (bool, optional): Whether to generate a safe prime. Defaults to False.
+            rng (SeededRNG or SystemRNG, optional): Random source. Defaults to the shared ``SystemRNG``.
+
+        Returns:
+            PrimalityCertificate: The certificate, the prime is :attr:`prime`
+        """
+        with instrumentation.span("generate_certified_prime"):
+            steps = {}
+            prime = cls._generate(bit_length, safe, steps, get_rng(rng))
+            return cls(prime, steps)
+
+    @classmethod
+    def _generate(cls, bit_length: int, safe: bool, steps: dict, rng) -> int:
+        if 1 << bit_length <= _DETERMINISTIC_LIMIT:
+            # proven by Primes.is_prime alone
+            while True:
+                if safe:
+                    prime = Primes.get_safe_prime(bit_length, rng=rng)
+                    if backend.is_prime(prime) and backend.is_prime(prime // 2):
+                        return prime
+                    continue
+                prime = rng.getrandbits(bit_length) | (1 << (bit_length - 1)) | 1
+                if backend.is_prime(prime):
+                    return prime
+
+        target = bit_length - 1 if safe else bit_length
+        s = cls._generate(target // 2 + 2, False, steps, rng)
+        low = -(-(1 << (target - 1)) // (2 * s))
+        high = ((1 << target) - 2) // (2 * s)
+        while True:
+            q = 2 * rng.randint(low, high) * s + 1
+            candidate = 2 * q + 1 if safe else q
+            if backend.gcd(q * candidate, _SMALL_PRIMES_PRODUCT) != 1:
+                # no candidate is below the small primes limit here
+                continue
+            # one Fermat test each rules out almost every composite before the full tests
+            if backend.powmod(2, q - 1, q) != 1 or backend.powmod(2, candidate - 1, candidate) != 1:
+                continue
+            if not backend.is_prime(q) or not backend.is_prime(candidate):
+                continue
+            try:
+                q_step = (((s, 1),), _witnesses(q, [s]))
+                candidate_step = (((q, 1),), _witnesses(candidate, [q])) if safe else None
+            except ValueError:
+                continue
+            steps[q] = q_step
+            if safe:
+                steps[candidate] = candidate_step
+            return candidate
@@ -0,0 +1,145 @@
+import threading
+import time
+
+
+class SolverInterrupted(Exception):
+    """Raised when a solver stops because of its :class:`SolverControl`
+
+    Attributes:
+        reason (str): ``"cancelled"``, ``"deadline"`` or ``"budget"``
+        checkpoint (dict or None): State to resume from, see :attr:`SolverControl.checkpoint`
+    """
+
+    def __init__(self, reason: str, checkpoint: dict = None):
+        super().__init__(f"Solver interrupted: {reason}")
+        self.reason = reason
+        self.checkpoint = checkpoint
+
+
+class CancellationToken:
+    """Flag used to ask a running solver to stop
+
+    Args:
+        event (optional): Object with ``set()`` and ``is_set()`` methods backing the token. \
+            Pass ``multiprocessing.Manager().Event()`` to share the token with other processes. \
+            Defaults to a new ``threading.Event``.
+    """
+
+    def __init__(self, event=None):
+        self._event = event if event is not None else threading.Event()
+
+    def __repr__(self):
+        return f'<CancellationToken cancelled="{self.cancelled}">'
+
+    def cancel(self):
+        """Asks the solvers using this token to stop"""
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        """bool: True if :meth:`cancel` was called"""
+        return self._event.is_set()
+
+
+class SolverControl:
+    """Limits, progress reporting and cancellation for long-running solvers
+
+    Solvers call :meth:`step` once per batch of iterations. That is where the progress callback
+    is invoked and where the cancellation token, the deadline and the iteration budget are checked.
+    When a solver is stopped, it raises :class:`SolverInterrupted` carrying a checkpoint.
+    The checkpoint is a dict of plain values, so it can be stored as JSON and passed back
+    through ``checkpoint`` to resume the computation.
+
+    Args:
+        timeout (float, optional): Seconds the solver may run, counted from the creation of this object
+        deadline (float, optional): Absolute ``time.time()`` after which the solver stops. Overrides ``timeout``.
+        max_iterations (int, optional): Iteration budget
+        progress (callable, optional): Called as ``progress(iterations, total)``. ``total`` is None \
+            if the solver cannot tell.
+        progress_every (int, optional): Iterations between two progress calls. Defaults to 100000.
+        token (CancellationToken, optional): Token checked by the solver
+        checkpoint (dict, optional): Checkpoint to resume from
+        check_every (int, optional): Iterations between two checks of the limits. Defaults to 4096.
+    """
+
+    def __init__(
+        self,
+        timeout: float = None,
+        deadline: float = None,
+        max_iterations: int = None,
+        progress=None,
+        progress_every: int = 100000,
+        token: CancellationToken = None,
+        checkpoint: dict = None,
+        check_every: int = 4096,
+    ):
+        if deadline is None and timeout is not None:
+            deadline = time.time() + timeout
+        self.deadline = deadline
+        self.max_iterations = max_iterations
+        self.progress = progress
+        self.progress_every = progress_every
+        self.token = token
+        self.checkpoint = checkpoint
+        self.check_every = check_every
+        self.iterations = 0
+        self.total = None
+        self._next_progress = progress_every
+
+    def __repr__(self):
+        return (
+            f'<SolverControl iterations="{self.iterations}" total="{self.total}" '
+            f'deadline="{self.deadline}" max_iterations="{self.max_iterations}">'
+        )
+
+    def resume(self, solver: str) -> dict or None:
+        """Returns the checkpoint if it belongs to ``solver``
+
+        Args:
+            solver (str): Name of the solver asking
+
+        Raises:
+            ValueError: If the checkpoint was made by a different solver
+
+        Returns:
+            dict or None: The checkpoint or None if there is none
+        """
+        if self.checkpoint is None:
+            return None
+        if self.checkpoint.get("solver") != solver:
+            raise ValueError(f"Checkpoint of {self.checkpoint.get('solver')} cannot resume {solver}.")
+        return self.checkpoint
+
+    def start(self, total: int = None):
+        """Called by the solver before its main loop
+
+        Args:
+            total (int, optional): Expected number of iterations, if known
+        """
+        self.total = total
+
+    def step(self, iterations: int = 0, state: dict = None):
+        """Records finished iterations and checks the limits
+
+        Args:
+            iterations (int, optional): Iterations done since the previous call. Defaults to 0.
+            state (dict, optional): Current state of the solver, stored as the checkpoint if it stops
+
+        Raises:
+            SolverInterrupted: If the token was cancelled, the deadline passed or the budget was used up
+        """
+        self.iterations += iterations
+        if self.progress is not None and self.iterations >= self._next_progress:
+            self.progress(self.iterations, self.total)
+            self._next_progress = self.iterations + self.progress_every
+
+        reason = None
+        if self.token is not None and self.token.cancelled:
+            reason = "cancelled"
+        elif self.deadline is not None and time.time() >= self.deadline:
+            reason = "deadline"
+        elif self.max_iterations is not None and self.iterations >= self.max_iterations:
+            reason = "budget"
+        if reason is not None:
+            self.checkpoint = state
+            raise SolverInterrupted(reason, state)
@@ -0,0 +1,224 @@
+import functools
+import itertools
+import math
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from .. import instrumentation
+from ..math.fields import GF
+from .control import SolverControl
+from .elliptic_curves import EllipticCurve, count_points
+from .primes import Primes
+
+
+class CurveCandidate:
+    """Curve ``y^2 = x^3 + a*x + b`` found by :meth:`CurveSearch.search`
+
+    Attributes:
+        field (int): Prime of the field
+        a (int): Coefficient of x
+        b (int): Constant coefficient
+        order (int): Number of points of the curve
+        twist (bool): Whether the curve is the quadratic twist of a scanned candidate
+    """
+
+    __slots__ = ("field", "a", "b", "order", "twist")
+
+    def __init__(self, field: int, a: int, b: int, order: int, twist: bool = False):
+        self.field = field
+        self.a = a
+        self.b = b
+        self.order = order
+        self.twist = twist
+
+    def __repr__(self):
+        return (
+            f'<CurveCandidate field="{self.field}" a="{self.a}" b="{self.b}" order="{self.order}" '
+            f'twist="{self.twist}">'
+        )
+
+    def __reduce__(self):
+        return CurveCandidate, (self.field, self.a, self.b, self.order, self.twist)
+
+    def __eq__(self, other):
+        if not isinstance(other, CurveCandidate):
+            return NotImplemented
+        return self.__reduce__() == other.__reduce__()
+
+    def curve(self) -> EllipticCurve:
+        """The candidate as an EllipticCurve"""
+        return EllipticCurve(1, 0, 0, 1, 0, self.a, self.b, self.field)
+
+
+class CurveSearch:
+    """Scans many short Weierstrass curves ``y^2 = x^3 + a*x + b`` for orders with wanted properties
+
+    Candidates are counted on a process pool with :func:`count_points`, one pass over the field each,
+    instead of listing the points like :meth:`EllipticCurve.get_curve_order`. Cheap checks run first:
+    singular curves are skipped, and when an odd cofactor is wanted, curves with a point of order 2
+    (a root of ``x^3 + a*x + b``, found with one polynomial gcd) have an even order and are skipped too.
+    Every count also gives the order ``2p + 2 - n`` of the quadratic twist for free.
+
+    Example::
+
+        # curves over primes near 10^4 of prime order with embedding degree above 20
+        for candidate in CurveSearch.search(
+            range(10007, 10100),
+            range(0, 50),
+            range(1, 50),
+            prime_order=True,
+            predicate=lambda c: CurveSearch.embedding_degree(c.field, c.order, 20) is None,
+            num_workers=4,
+        ):
+            print(candidate)
+    """
+
+    @classmethod
+    def embedding_degree(cls, field: int, order: int, max_degree: int = 50) -> int or None:
+        """Smallest k with ``field^k = 1 (mod order)``, the embedding degree of a subgroup of prime ``order``
+
+        Args:
+            field (int): Prime of the field
+            order (int): Prime order of the subgroup
+            max_degree (int, optional): Largest degree tried. Defaults to 50.
+
+        Returns:
+            int or None: The embedding degree or None if it is above ``max_degree``
+        """
+        power = 1
+        for k in range(1, max_degree + 1):
+            power = power * field % order
+            if power == 1:
+                return k
+        return None
+
+    @classmethod
+    def _scan(cls, candidates: list, cofactor: int, embedding_degree: int, twists: bool) -> tuple:
+        """Counts the candidates and keeps the matches. Runs in the worker processes.
+
+        Returns:
+            (tuple): tuple containing:
+
+                - list: Matching ``(field, a, b, order, twist)`` tuples
+                - int: Number of candidates scanned
+        """
+        matches = []
+        for field, a, b in candidates:
+            a %= field
+            b %= field
+            if (4 * a * a * a + 27 * b * b) % field == 0:
+                continue
+            # an odd cofactor means an odd order once the prime part is above 2,
+            # so a point of order 2 rules the curve out
+            if cofactor is not None and cofactor % 2 and 2 * cofactor < field + 1 - 2 * math.isqrt(field) - 2:
+                if GF(field).has_root((b, a, 0, 1)):
+                    if instrumentation.ENABLED:
+                        instrumentation.count("curve_search.skipped")
+                    continue
+            order = count_points(field, 0, a, b)
+            if cls._check(field, order, cofactor, embedding_degree):
+                matches.append((field, a, b, order, False))
+            if twists:
+                twist_order = 2 * field + 2 - order
+                if cls._check(field, twist_order, cofactor, embedding_degree):
+                    d = cls._non_residue(field)
+                    matches.append((field, a * d * d % field, b * d * d * d % field, twist_order, True))
+        return matches, len(candidates)
+
+    @classmethod
+    def _check(cls, field: int, order: int, cofactor: int, embedding_degree: int) -> bool:
+        """Whether ``order`` has the wanted cofactor and the prime subgroup the wanted embedding degree"""
+        subgroup = order
+        if cofactor is not None:
+            if order % cofactor or not Primes.is_prime(order // cofactor):
+                return False
+            subgroup = order // cofactor
+        if embedding_degree is not None:
+            if cls.embedding_degree(field, subgroup, embedding_degree) != embedding_degree:
+                return False
+        return True
+
+    @classmethod
+    @functools.lru_cache(maxsize=64)
+    def _non_residue(cls, field: int) -> int:
+        """Smallest quadratic non-residue, the twisting factor"""
+        legendre = GF(field).legendre
+        return next(d for d in itertools.count(2) if legendre(d) == -1)
+
+    @classmethod
+    def search(
+        cls,
+        fields,
+        a_values,
+        b_values,
+        predicate=None,
+        prime_order: bool = False,
+        cofactor: int = None,
+        embedding_degree: int = None,
+        twists: bool = False,
+        num_workers: int = 1,
+        chunk_size: int = 64,
+        control: SolverControl = None,
+    ):
+        """Yields the curves whose order has the wanted properties, as soon as they are found
+
+        Args:
+            fields (int or iterable of int): Fields to scan, numbers that are not odd primes are skipped
+            a_values (iterable of int): Values of the coefficient a
+            b_values (iterable of int): Values of the coefficient b
+            predicate (callable, optional): Further filter called with every :class:`CurveCandidate` \
+                in this process, so it does not need to be picklable
+            prime_order (bool, optional): Only curves of prime order. Same as ``cofactor=1``.
+            cofactor (int, optional): Only curves of order ``cofactor * q`` with q prime
+            embedding_degree (int, optional): Only curves whose prime-order subgroup \
+                (the whole group unless ``cofactor`` is set) has exactly this embedding degree
+            twists (bool, optional): Also check the quadratic twist of every candidate. Defaults to False.
+            num_workers (int, optional): Number of counting processes. ``1`` counts in this process. Defaults to 1.
+            chunk_size (int, optional): Candidates per task of the process pool. Defaults to 64.
+            control (SolverControl, optional): Limits, progress and cancellation, counted in candidates
+
+        Raises:
+            SolverInterrupted: If ``control`` stopped the search. Curves yielded before stay valid.
+
+        Yields:
+            CurveCandidate: Matching curves. With several workers, in the order their chunks finish.
+        """
+        if prime_order:
+            cofactor = 1
+        fields = [fields] if isinstance(fields, int) else fields
+        fields = (field for field in fields if field > 2 and Primes.is_prime(field))
+        a_values, b_values = list(a_values), list(b_values)
+        candidates = itertools.product(fields, a_values, b_values)
+        chunks = iter(lambda: list(itertools.islice(candidates, chunk_size)), [])
+        options = (cofactor, embedding_degree, twists)
+        if control is not None:
+            control.start()
+
+        def matching(result):
+            matches, scanned = result
+            for match in matches:
+                candidate = CurveCandidate(*match)
+                if predicate is None or predicate(candidate):
+                    yield candidate
+            if control is not None:
+                control.step(scanned, {"solver": "curve_search"})
+
+        if num_workers <= 1:
+            for chunk in chunks:
+                yield from matching(cls._scan(chunk, *options))
+            return
+
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            pending = {
+                executor.submit(cls._scan, chunk, *options)
+                for chunk in itertools.islice(chunks, 2 * num_workers)
+            }
+            try:
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        for chunk in itertools.islice(chunks, 1):
+                            pending.add(executor.submit(cls._scan, chunk, *options))
+                        yield from matching(future.result())
+            finally:
+                for future in pending:
+                    future.cancel()
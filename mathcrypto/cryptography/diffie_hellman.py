@@ -1,11 +1,99 @@
-import math
 import multiprocessing
-from random import randint
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from .. import backend, instrumentation, serialization
+from ..math.groups import MultiplicativeGroup
+from .control import SolverControl
+from .index_calculus import IndexCalculus
+from .pollard_rho import PollardRho
 from .primes import Primes
+from .rng import get_rng
+from .table_cache import IntMap, TableCache
+
+
+class DHSession:
+    """Compact record of a single Diffie-Hellman exchange.
+
+    The prime and generator are shared by every session of a batch, so only the per-exchange values are stored.
+    """
+
+    __slots__ = ("alice_secret", "bob_secret", "alice_sends", "bob_sends", "alice_key", "bob_key")
+
+    def __init__(
+        self,
+        alice_secret: int,
+        bob_secret: int,
+        alice_sends: int,
+        bob_sends: int,
+        alice_key: int,
+        bob_key: int,
+    ):
+        self.alice_secret = alice_secret
+        self.bob_secret = bob_secret
+        self.alice_sends = alice_sends
+        self.bob_sends = bob_sends
+        self.alice_key = alice_key
+        self.bob_key = bob_key
+
+    def __repr__(self):
+        return (
+            f'<DHSession alice_secret="{self.alice_secret}" bob_secret="{self.bob_secret}" '
+            f'alice_sends="{self.alice_sends}" bob_sends="{self.bob_sends}" '
+            f'alice_key="{self.alice_key}" bob_key="{self.bob_key}">'
+        )
+
+
+def _generate_session_chunk(prime: int, generator: int, count: int, rng) -> list:
+    """Generates ``count`` exchanges as plain tuples. Runs inside the worker processes.
+
+    Every chunk gets its own stream spawned from the caller's random source,
+    so forked workers never share random state.
+    """
+    sessions = []
+    for _ in range(count):
+        alice_secret = rng.randint(2, prime - 2)
+        bob_secret = rng.randint(2, prime - 2)
+        alice_sends = backend.powmod(generator, alice_secret, prime)
+        bob_sends = backend.powmod(generator, bob_secret, prime)
+        sessions.append(
+            (
+                alice_secret,
+                bob_secret,
+                alice_sends,
+                bob_sends,
+                backend.powmod(bob_sends, alice_secret, prime),
+                backend.powmod(alice_sends, bob_secret, prime),
+            )
+        )
+    return sessions
+
+
+def _restore_dh(prime, generator, alice_secret, bob_secret, alice_sends, bob_sends, alice_key, bob_key):
+    """Unpickles a DHCryptosystem from its values"""
+    dh = DHCryptosystem(prime, generator, alice_secret, bob_secret, alice_sends, bob_sends)
+    dh.alice_key = alice_key
+    dh.bob_key = bob_key
+    return dh
 
 
 class DHCryptosystem:
-    """Object containing all values of the cryptosystem"""
+    """Object containing all values of the cryptosystem
+
+    Pickles as a plain tuple of its values, and :meth:`to_bytes` gives a compact binary form
+    for storage, see :mod:`mathcrypto.serialization`. Pass :meth:`public` to code that should not see
+    the secrets, such as worker processes of a cracker.
+    """
+
+    _FIELDS = (
+        "prime",
+        "generator",
+        "alice_secret",
+        "bob_secret",
+        "alice_sends",
+        "bob_sends",
+        "alice_key",
+        "bob_key",
+    )
 
     def __init__(
         self,
@@ -26,12 +114,18 @@ class DHCryptosystem:
         self.alice_key = key  # only Alice knows this    Both keys should be the same
         self.bob_key = key  # only Bob knows this        Both keys should be the same
 
-    def generate_from(self, bit_length: int = None, prime: int = None):
+    def generate_from(
+        self, bit_length: int = None, prime: int = None, rng=None, primitive_root: bool = False
+    ):
         """Generates the DHCryptosystem values (If not passed == if they are None) or assigns them
 
         Args:
             bit_size (int, optional): Bit size of the prime. Not necessary if prime also passed.
             prime (int, optional): Prime number base of the cryptosystem.
+            rng (SeededRNG or SystemRNG, optional): Random source. Defaults to the shared ``SystemRNG``.
+            primitive_root (bool, optional): Whether the generator must generate the whole group. \
+                A generated prime is then a safe prime, so ``prime - 1`` is quick to factor. \
+                Defaults to False, any element is used.
 
         Raises:
             ValueError: If neither ``bit_size`` or ``prime`` is passed. At least one of these is required.
@@ -39,63 +133,203 @@ class DHCryptosystem:
         if prime is None and bit_length is None:
             raise ValueError("Either prime or bit_size must be specified")
 
-        self.prime = prime if prime is not None else Primes.get_prime(bit_length)
-        self.generator = randint(1, self.prime - 1)  # nosec
-        self.alice_secret = randint(1, self.prime)  # nosec
-        self.bob_secret = randint(1, self.prime)  # nosec
-        self.alice_sends = pow(self.generator, self.alice_secret, self.prime)
-        self.bob_sends = pow(self.generator, self.bob_secret, self.prime)
-        self.alice_key = pow(self.bob_sends, self.alice_secret, self.prime)
-        self.bob_key = pow(self.alice_sends, self.bob_secret, self.prime)
+        rng = get_rng(rng)
+        if prime is not None:
+            self.prime = prime
+        elif primitive_root:
+            self.prime = Primes.get_safe_prime(bit_length, rng=rng)
+        else:
+            self.prime = Primes.get_prime(bit_length, rng=rng)
+        if primitive_root:
+            self.generator = MultiplicativeGroup.find_primitive_root(self.prime, rng=rng)
+        else:
+            self.generator = rng.randint(1, self.prime - 1)
+        self.alice_secret = rng.randint(1, self.prime)
+        self.bob_secret = rng.randint(1, self.prime)
+        self.alice_sends = backend.powmod(self.generator, self.alice_secret, self.prime)
+        self.bob_sends = backend.powmod(self.generator, self.bob_secret, self.prime)
+        self.alice_key = backend.powmod(self.bob_sends, self.alice_secret, self.prime)
+        self.bob_key = backend.powmod(self.alice_sends, self.bob_secret, self.prime)
+
+    def check_generator(self, factors=None) -> bool:
+        """Checks whether the generator generates the whole group modulo the prime
+
+        A generator of a small subgroup makes the exchanged keys easy to find.
+
+        Args:
+            factors (iterable of int, optional): Known prime factors of ``prime - 1``. \
+                Not needed for safe primes or when ``prime - 1`` has small factors only.
+
+        Returns:
+            bool: True if the generator is a primitive root
+        """
+        return MultiplicativeGroup.is_primitive_root(self.generator, self.prime, factors=factors)
 
-    def generate_rest(self):
+    def generate_rest(self, rng=None):
         """Generates the missing attributes of the DHCryptosystem attributes if possible.
 
+        Args:
+            rng (SeededRNG or SystemRNG, optional): Random source. Defaults to the shared ``SystemRNG``.
+
         Raises:
             ValueError: If the attributes that were already in the DHCryptosystem object are calculated\
                 from values that were autogenerated. Then you wouldn't have a valid DHCryptosystem.
         """
+        rng = get_rng(rng)
         was_generated = []
         if self.generator is None:
-            self.generator = randint(1, self.prime - 1)  # nosec
+            self.generator = rng.randint(1, self.prime - 1)
             was_generated.append(True)
 
         if self.alice_secret is None:
-            self.alice_secret = randint(1, self.prime)  # nosec
+            self.alice_secret = rng.randint(1, self.prime)
             was_generated.append(True)
         elif not (1 < self.alice_secret and self.alice_secret < self.prime):
             raise ValueError("You can't generate a valid DHCryptosystem like that.")
 
         if self.bob_secret is None:
-            self.bob_secret = randint(1, self.prime)  # nosec
+            self.bob_secret = rng.randint(1, self.prime)
             was_generated.append(True)
         elif not (1 < self.bob_secret and self.bob_secret < self.prime):
             raise ValueError("You can't generate a valid DHCryptosystem like that.")
 
         if self.alice_sends is None:
-            self.alice_sends = pow(self.generator, self.alice_secret, self.prime)
+            self.alice_sends = backend.powmod(self.generator, self.alice_secret, self.prime)
             was_generated.append(True)
         elif True in was_generated:
             raise ValueError("You can't generate a valid DHCryptosystem like that.")
 
         if self.bob_sends is None:
-            self.bob_sends = pow(self.generator, self.bob_secret, self.prime)
+            self.bob_sends = backend.powmod(self.generator, self.bob_secret, self.prime)
             was_generated.append(True)
         elif True in was_generated:
             raise ValueError("You can't generate a valid DHCryptosystem like that.")
 
         if self.alice_key is None:
-            self.alice_key = pow(self.bob_sends, self.alice_secret, self.prime)
+            self.alice_key = backend.powmod(self.bob_sends, self.alice_secret, self.prime)
             was_generated.append(True)
         elif True in was_generated:
             raise ValueError("You can't generate a valid DHCryptosystem like that.")
 
         if self.bob_key is None:
-            self.bob_key = pow(self.alice_sends, self.bob_secret, self.prime)
+            self.bob_key = backend.powmod(self.alice_sends, self.bob_secret, self.prime)
             was_generated.append(True)
         elif True in was_generated:
             raise ValueError("You can't generate a valid DHCryptosystem like that.")
 
+    def generate_sessions(self, count: int, num_cpus: int = 1, chunk_size: int = 1024, rng=None):
+        """Generates ``count`` complete exchanges sharing this cryptosystem's prime and generator.
+
+        Sessions are produced in chunks spread over a process pool and yielded as soon as a chunk is done,
+        in the order the chunks were submitted. At most ``2 * num_cpus`` chunks are in flight at once.
+
+        Args:
+            count (int): Number of sessions to generate
+            num_cpus (int, optional): Number of worker processes. ``1`` generates in this process. Defaults to 1.
+            chunk_size (int, optional): Number of sessions generated per worker task. Defaults to 1024.
+            rng (SeededRNG or SystemRNG, optional): Random source. Every chunk draws from its own spawned \
+                stream, so a ``SeededRNG`` gives the same sessions regardless of ``num_cpus``. \
+                Defaults to the shared ``SystemRNG``.
+
+        Raises:
+            ValueError: If the prime or generator is not set, the prime is below 5 \
+                (there are no secrets in ``[2, prime - 2]``) or ``chunk_size`` is below 1.
+
+        Yields:
+            DHSession: generated session
+        """
+        if self.prime is None or self.generator is None:
+            raise ValueError("Both prime and generator must be set to generate sessions.")
+        if self.prime < 5:
+            raise ValueError(f"The prime must be at least 5 to draw secrets, not {self.prime}.")
+        if chunk_size < 1:
+            raise ValueError(f"The chunk size must be at least 1, not {chunk_size}.")
+
+        rng = get_rng(rng)
+        sizes = [chunk_size] * (count // chunk_size)
+        if count % chunk_size:
+            sizes.append(count % chunk_size)
+        chunks = [(self.prime, self.generator, size, rng.spawn(i)) for i, size in enumerate(sizes)]
+
+        if num_cpus <= 1:
+            for chunk in chunks:
+                for session in _generate_session_chunk(*chunk):
+                    yield DHSession(*session)
+            return
+
+        with ProcessPoolExecutor(max_workers=num_cpus) as executor:
+            pending = deque()
+            chunks = iter(chunks)
+            for chunk in chunks:
+                pending.append(executor.submit(_generate_session_chunk, *chunk))
+                if len(pending) >= 2 * num_cpus:
+                    break
+            while pending:
+                result = pending.popleft().result()
+                for chunk in chunks:
+                    pending.append(executor.submit(_generate_session_chunk, *chunk))
+                    break
+                for session in result:
+                    yield DHSession(*session)
+
+    def verify_sessions(self, sessions, recompute: bool = False) -> list:
+        """Checks a batch of sessions generated under this cryptosystem's parameters.
+
+        Args:
+            sessions (iterable of DHSession): Sessions to verify
+            recompute (bool, optional): Whether to also recompute the sent values and keys from the secrets. \
+                Defaults to False, which only compares ``alice_key`` with ``bob_key``.
+
+        Returns:
+            list: Indexes of the sessions that failed the check. Empty if all sessions are valid.
+        """
+        failed = []
+        for index, session in enumerate(sessions):
+            if session.alice_key != session.bob_key:
+                failed.append(index)
+            elif recompute and (
+                session.alice_sends != backend.powmod(self.generator, session.alice_secret, self.prime)
+                or session.bob_sends != backend.powmod(self.generator, session.bob_secret, self.prime)
+                or session.alice_key != backend.powmod(session.bob_sends, session.alice_secret, self.prime)
+            ):
+                failed.append(index)
+        return failed
+
+    def __reduce__(self):
+        return _restore_dh, tuple(getattr(self, field) for field in self._FIELDS)
+
+    def public(self):
+        """Copy holding only the publicly known values: prime, generator and the sent values
+
+        Returns:
+            DHCryptosystem: The copy, with secrets and keys set to None
+        """
+        return DHCryptosystem(
+            prime=self.prime, generator=self.generator, alice_sends=self.alice_sends, bob_sends=self.bob_sends
+        )
+
+    def to_bytes(self) -> bytes:
+        """Compact binary form of all values, unset ones included, see :meth:`from_bytes`"""
+        return serialization.encode(b"dh", (getattr(self, field) for field in self._FIELDS))
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Reads a cryptosystem written by :meth:`to_bytes`
+
+        Args:
+            data (bytes, bytearray or memoryview): The binary form
+
+        Raises:
+            ValueError: If ``data`` is not a cryptosystem written by :meth:`to_bytes`
+
+        Returns:
+            DHCryptosystem: The cryptosystem
+        """
+        values, _ = serialization.decode(data, b"dh")
+        if len(values) != len(cls._FIELDS):
+            raise ValueError("The data does not hold the values of a cryptosystem.")
+        return _restore_dh(*values)
+
     def __repr__(self):
         return (
             f'<DHCryptosystem prime="{self.prime}" generator="{self.generator}" '
@@ -123,7 +357,7 @@ class DHCracker:
         chunks = []
         for i in range(num_chunks):
             this_chunk_start = prev_chunk
-            remaining = prime - chunk_size
+            remaining = prime - this_chunk_start
             if remaining < chunk_size:
                 chunks.append(range(this_chunk_start, this_chunk_start + remaining + 1))
             else:
@@ -133,12 +367,16 @@ class DHCracker:
         return chunks
 
     @classmethod
-    def _multi_cracking(cls, crack_me, chunks: list) -> int or None:
+    def _multi_cracking(cls, crack_me, chunks: list, control: SolverControl = None) -> int or None:
         """Used for spawning cracker process for each subrange if the prime
 
         Args:
             crack_me (CrackMeDH object): Object containing the publicly know values of the cryptosystem.
             chunks (list): List of iterators
+            control (SolverControl, optional): Limits checked while waiting for the processes
+
+        Raises:
+            SolverInterrupted: If ``control`` stopped the search. The processes are terminated first.
 
         Returns:
             int or None: Key (int) if it was found, else None
@@ -146,91 +384,350 @@ class DHCracker:
 
         jobs = []
         key = multiprocessing.Value("i", -1)
+        # the workers get the four public values, never the secrets
+        task = (crack_me.prime, crack_me.generator, crack_me.alice_sends, crack_me.bob_sends)
         for chunk in chunks:
-            process = multiprocessing.Process(target=cls._cracker, args=(crack_me, chunk, key))
+            process = multiprocessing.Process(target=cls._cracker, args=(task, chunk, key))
             process.start()
             jobs.append(process)
-        for process in jobs:
-            process.join()
+        if control is not None:
+            control.start(crack_me.prime)
+        try:
+            for process in jobs:
+                while process.is_alive():
+                    process.join(0.1 if control is not None else None)
+                    if control is not None:
+                        control.step()
+        finally:
+            for process in jobs:
+                if process.is_alive():
+                    process.terminate()
+                    process.join()
         return key.value if not key.value == -1 else None
 
     @classmethod
-    def _cracker(cls, crack_me, chunk: range, key: multiprocessing.Value):
+    def _cracker(cls, task: tuple, chunk: range, key: multiprocessing.Value):
         """Where the magic of brute force happens
 
         Args:
-            crack_me (CrackMeDH object): Object containing the publicly know values of the cryptosystem.
+            task (tuple): Prime, generator, alice_sends and bob_sends of the cryptosystem
             chunk (range): list containing the start value and end+1 from whixh we create range
             key (multiprocessing.Value): thread safe variable used to save the foud key
         """
 
+        prime, generator, alice_sends, bob_sends = task
         for i in chunk:
             if key.value != -1:
                 return
 
-            test = pow(crack_me.generator, i, crack_me.prime)
-            if test == crack_me.alice_sends:
+            test = backend.powmod(generator, i, prime)
+            if test == alice_sends:
                 with key.get_lock():
-                    key.value = pow(crack_me.bob_sends, i, crack_me.prime)
+                    key.value = backend.powmod(bob_sends, i, prime)
                 break
-            if test == crack_me.bob_sends:
+            if test == bob_sends:
                 with key.get_lock():
-                    key.value = pow(crack_me.alice_sends, i, crack_me.prime)
+                    key.value = backend.powmod(alice_sends, i, prime)
                 break
 
     @classmethod
-    def brute_force(cls, crack_me, num_cpus: int) -> int or None:
+    def brute_force(cls, crack_me, num_cpus: int, control: SolverControl = None) -> int or None:
         """Calculates the DHCryptosystem key by utilizing multiprocessing enhanced brute force. CPU and time intensive.
 
         Args:
             crack_me (DHCryptosystem object): Needs to be containing the publicly known values of the cryptosystem.
             num_cpus (int): Number of CPU cores to utilize.\
             Do not exceed the number of logical cores your CPU has, this will result in slower execution.
+            control (SolverControl, optional): Deadline and cancellation token, checked every 0.1 s.
+
+        Raises:
+            SolverInterrupted: If ``control`` stopped the search.
 
         Returns:
             int or None: int if a key was found, else None
         """
 
-        chunks = cls._chunker(num_cpus, crack_me.prime)
-        key = cls._multi_cracking(crack_me, chunks)
+        with instrumentation.span("brute_force"):
+            chunks = cls._chunker(num_cpus, crack_me.prime)
+            key = cls._multi_cracking(crack_me, chunks, control)
 
         return key
 
     @classmethod
-    def baby_step(cls, crack_me) -> int or None:
+    def baby_step(cls, crack_me, control: SolverControl = None, cache: TableCache = None) -> int or None:
         """Discrete logarithm problem solution using the Baby-step Giant-step algorithm. RAM intensive.
 
         Args:
             crack_me (DHCryptosystem object): Object containing the publicly know values of the cryptosystem.
+            control (SolverControl, optional): Limits, progress and cancellation of the giant steps. \
+                A checkpoint stores the giant-step position, resuming rebuilds the baby-step table \
+                and continues from there.
+            cache (TableCache, optional): Cache of baby-step tables. The table for the prime and generator \
+                is memory-mapped from the cache if present, otherwise it is built and stored there. \
+                Cached lookups use binary search instead of hashing but skip the whole baby-step phase.
+
+        Raises:
+            SolverInterrupted: If ``control`` stopped the search.
 
         Returns:
             int or None: int if a key was found, else None
         """
-        N = math.isqrt(crack_me.prime) + 1
+        with instrumentation.span("baby_step"):
+            return cls._baby_step(crack_me, control, cache)
+
+    @classmethod
+    def _baby_step_table(cls, prime: int, generator: int, size: int, cache: TableCache = None):
+        """Table of ``generator^i: i`` for i up to ``size``, kept in ``cache`` if given"""
+        if cache is not None:
+            cached = cache.get("bsgs", (prime, generator, size))
+            if cached is not None:
+                return IntMap(cached["values"], cached["indexes"])
 
         baby_steps_tabulka = {}
         baby_step = 1
-        for i in range(N + 1):
+        for i in range(size + 1):
             baby_steps_tabulka[baby_step] = i
-            baby_step = (baby_step * crack_me.generator) % crack_me.prime
+            baby_step = (baby_step * generator) % prime
+
+        if cache is None:
+            return baby_steps_tabulka
+        values = sorted(baby_steps_tabulka)
+        stored = cache.put(
+            "bsgs",
+            (prime, generator, size),
+            {"values": values, "indexes": [baby_steps_tabulka[value] for value in values]},
+            {"prime": str(prime), "generator": str(generator), "size": size},
+        )
+        return IntMap(stored["values"], stored["indexes"])
 
-        inverzni_k_N = pow(crack_me.generator, (crack_me.prime - 2) * N, crack_me.prime)
-        giant_step = crack_me.alice_sends
+    @classmethod
+    def _baby_step(cls, crack_me, control: SolverControl = None, cache: TableCache = None) -> int or None:
+        N = backend.isqrt(crack_me.prime) + 1
+        if instrumentation.ENABLED:
+            instrumentation.count("bsgs.table_size", N + 1)
+
+        baby_steps_tabulka = cls._baby_step_table(crack_me.prime, crack_me.generator, N, cache)
 
-        for j in range(N + 1):
+        inverzni_k_N = backend.powmod(crack_me.generator, (crack_me.prime - 2) * N, crack_me.prime)
+        giant_step = crack_me.alice_sends
+        start = 0
+
+        if control is not None:
+            checkpoint = control.resume("baby_step")
+            if checkpoint is not None:
+                if (checkpoint["prime"], checkpoint["generator"], checkpoint["target"]) != (
+                    crack_me.prime,
+                    crack_me.generator,
+                    crack_me.alice_sends,
+                ):
+                    raise ValueError("The checkpoint was made for a different DHCryptosystem.")
+                start = checkpoint["j"]
+                giant_step = checkpoint["giant_step"]
+            control.start(N + 1)
+
+        for j in range(start, N + 1):
+            if control is not None and (j - start) % control.check_every == 0 and j != start:
+                control.step(
+                    control.check_every,
+                    {
+                        "solver": "baby_step",
+                        "prime": crack_me.prime,
+                        "generator": crack_me.generator,
+                        "target": crack_me.alice_sends,
+                        "j": j,
+                        "giant_step": giant_step,
+                    },
+                )
             if giant_step in baby_steps_tabulka:
+                if instrumentation.ENABLED:
+                    instrumentation.count("bsgs.giant_steps", j + 1)
                 temp = (j * N) + baby_steps_tabulka[giant_step]
-                log = pow(crack_me.generator, temp, crack_me.prime)
+                log = backend.powmod(crack_me.generator, temp, crack_me.prime)
                 if log == crack_me.alice_sends:
-                    cracked_key = pow(crack_me.bob_sends, temp, crack_me.prime)
+                    cracked_key = backend.powmod(crack_me.bob_sends, temp, crack_me.prime)
                     return int(cracked_key)
                 if log == crack_me.bob_sends:
-                    cracked_key = pow(crack_me.alice_sends, temp, crack_me.prime)
+                    cracked_key = backend.powmod(crack_me.alice_sends, temp, crack_me.prime)
                     return int(cracked_key)
             else:
                 giant_step = (giant_step * inverzni_k_N) % crack_me.prime
         return None
 
+    @classmethod
+    def baby_step_many(
+        cls,
+        prime: int,
+        generator: int,
+        targets,
+        order: int = None,
+        control: SolverControl = None,
+        cache: TableCache = None,
+    ):
+        """Baby-step Giant-step for many targets sharing one prime and generator
+
+        The baby-step table holds about ``sqrt(order * k)`` entries for k targets and is built once.
+        One sweep of ``order / table size`` giant steps then advances every unsolved target,
+        which costs about ``sqrt(order / k)`` steps per target instead of ``sqrt(order)``.
+        Logarithms are yielded as soon as they are found.
+
+        Args:
+            prime (int): Prime modulus
+            generator (int): Base of the logarithms
+            targets (iterable of int): Elements whose logarithms are searched for, \
+                for example the ``alice_sends`` values of many sessions
+            order (int, optional): Order of ``generator``. Defaults to ``prime - 1``.
+            control (SolverControl, optional): Limits, progress and cancellation of the giant steps. \
+                A checkpoint stores the sweep position and the targets not solved yet.
+            cache (TableCache, optional): Cache of baby-step tables, see :meth:`baby_step`
+
+        Raises:
+            SolverInterrupted: If ``control`` stopped the search. Logarithms yielded before stay valid.
+
+        Yields:
+            tuple: ``(index of the target, logarithm)`` in the order they are found, \
+                then ``(index, None)`` for every target outside the group generated by ``generator``
+        """
+        order = order if order is not None else prime - 1
+        targets = [target % prime for target in targets]
+        pending = {}
+        for index, target in enumerate(targets):
+            pending.setdefault(target, []).append(index)
+        size = min(order, backend.isqrt(order * max(1, len(pending))) + 1)
+        giant_steps = order // size + 1
+        start = 0
+
+        if control is not None:
+            checkpoint = control.resume("baby_step_many")
+            if checkpoint is not None:
+                if (checkpoint["prime"], checkpoint["generator"], checkpoint["targets"]) != (
+                    prime,
+                    generator,
+                    targets,
+                ):
+                    raise ValueError("The checkpoint was made for different targets.")
+                start = checkpoint["j"]
+                pending = {int(value): list(indexes) for value, indexes in checkpoint["pending"]}
+            control.start(giant_steps)
+        if instrumentation.ENABLED:
+            instrumentation.count("bsgs.table_size", size + 1)
+
+        table = cls._baby_step_table(prime, generator, size, cache)
+        giant_factor = backend.powmod(generator, -size, prime)
+
+        # counted once per call, also when the search is interrupted or the caller stops early
+        steps = 0
+        try:
+            for j in range(start, giant_steps):
+                if not pending:
+                    break
+                if control is not None and (j - start) % control.check_every == 0 and j != start:
+                    control.step(
+                        control.check_every,
+                        {
+                            "solver": "baby_step_many",
+                            "prime": prime,
+                            "generator": generator,
+                            "targets": targets,
+                            "j": j,
+                            # pairs instead of a dict, JSON would turn the int keys into strings
+                            "pending": [[value, indexes] for value, indexes in pending.items()],
+                        },
+                    )
+                steps += len(pending)
+                advanced = {}
+                for value, indexes in pending.items():
+                    if value in table:
+                        log = (j * size + table[value]) % order
+                        for index in indexes:
+                            yield index, log
+                    else:
+                        advanced.setdefault(value * giant_factor % prime, []).extend(indexes)
+                pending = advanced
+        finally:
+            if instrumentation.ENABLED:
+                instrumentation.count("bsgs.giant_steps", steps)
+
+        for indexes in pending.values():
+            for index in indexes:
+                yield index, None
+
+    @classmethod
+    def pollard_rho(
+        cls,
+        crack_me,
+        num_workers: int = 1,
+        store=None,
+        order: int = None,
+        rng=None,
+        control: SolverControl = None,
+    ) -> int:
+        """Calculates the DHCryptosystem key using parallel Pollard rho with distinguished points. \
+        Uses little memory, the work is spread over ``num_workers`` processes.
+
+        Args:
+            crack_me (DHCryptosystem object): Object containing the publicly know values of the cryptosystem.
+            num_workers (int, optional): Number of walking processes. Defaults to 1.
+            store (MemoryStore or SQLiteStore, optional): Where the distinguished points are collected. \
+                Use an SQLiteStore to keep them between runs.
+            order (int, optional): Order of the generator. Defaults to ``prime - 1``.
+            rng (SeededRNG or SystemRNG, optional): Random source of the walks.
+            control (SolverControl, optional): Limits, progress and cancellation.
+
+        Raises:
+            SolverInterrupted: If ``control`` stopped the search.
+
+        Returns:
+            int: The key
+        """
+        secret = PollardRho.discrete_log(
+            crack_me.prime,
+            crack_me.generator,
+            crack_me.alice_sends,
+            order=order,
+            num_workers=num_workers,
+            store=store,
+            rng=rng,
+            control=control,
+        )
+        return backend.powmod(crack_me.bob_sends, secret, crack_me.prime)
+
+    @classmethod
+    def index_calculus(
+        cls,
+        crack_me,
+        num_workers: int = 1,
+        bound: int = None,
+        order_factors: list = None,
+        cache: TableCache = None,
+        rng=None,
+    ) -> int:
+        """Calculates the DHCryptosystem key using index calculus. Sub-exponential, \
+        the generator should be a primitive root.
+
+        Args:
+            crack_me (DHCryptosystem object): Object containing the publicly know values of the cryptosystem.
+            num_workers (int, optional): Processes collecting relations. Defaults to 1.
+            bound (int, optional): Smoothness bound of the factor base.
+            order_factors (list, optional): Prime factors of ``prime - 1`` including duplicates, if known.
+            cache (TableCache or str, optional): Cache, or directory of a cache, \
+                of the factor base logarithms, so further systems with the same prime and generator are cracked with the descent step only.
+            rng (SeededRNG or SystemRNG, optional): Random source.
+
+        Returns:
+            int: The key
+        """
+        secret = IndexCalculus.discrete_log(
+            crack_me.prime,
+            crack_me.generator,
+            crack_me.alice_sends,
+            order_factors=order_factors,
+            bound=bound,
+            num_workers=num_workers,
+            cache=cache,
+            rng=rng,
+        )
+        return backend.powmod(crack_me.bob_sends, secret, crack_me.prime)
+
     @classmethod
     def mov_attack(cls, secret: int, g: int, order: int) -> int or None:
         """The MOV attack on Elliptic curve DH.
@@ -0,0 +1,426 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from .. import instrumentation
+from ..math.fields import GF
+from .elliptic_curves import EllipticCurve
+from .rng import get_rng
+
+# (p, a, b, generator x, generator y, order of the generator) of y^2 = x^3 + a*x + b
+CURVES = {
+    "secp256k1": (
+        2**256 - 2**32 - 977,
+        0,
+        7,
+        0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798,
+        0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8,
+        0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141,
+    ),
+    "P-256": (
+        2**256 - 2**224 + 2**192 + 2**96 - 1,
+        -3,
+        0x5AC635D8AA3A93E7B3EBBD55769886BC651D06B0CC53B0F63BCE3C3E27D2604B,
+        0x6B17D1F2E12C4247F8BCE6E563A440F277037D812DEB33A0F4A13945D898C296,
+        0x4FE342E2FE1A7F9B8EE7EB4A7C0F9E162BCE33576B315ECECBB6406837BF51F5,
+        0xFFFFFFFF00000000FFFFFFFFFFFFFFFFBCE6FAADA7179E84F3B9CAC2FC632551,
+    ),
+}
+
+
+def _double(point: tuple, a: int, p: int) -> tuple:
+    """Doubles a point in Jacobian coordinates ``(X, Y, Z)`` with ``x = X / Z^2``, ``y = Y / Z^3``
+
+    Z = 0 is the point at infinity.
+    """
+    x, y, z = point
+    if y == 0 or z == 0:
+        return (1, 1, 0)
+    yy = y * y % p
+    s = 4 * x * yy % p
+    zz = z * z % p
+    m = (3 * x * x + a * zz * zz) % p
+    x3 = (m * m - 2 * s) % p
+    return x3, (m * (s - x3) - 8 * yy * yy) % p, 2 * y * z % p
+
+
+def _add_affine(point: tuple, affine: tuple, a: int, p: int) -> tuple:
+    """Adds an affine point ``(x, y)`` to a point in Jacobian coordinates, the cheapest addition"""
+    x1, y1, z1 = point
+    if z1 == 0:
+        return affine[0], affine[1], 1
+    zz = z1 * z1 % p
+    h = (affine[0] * zz - x1) % p
+    r = (affine[1] * zz * z1 - y1) % p
+    if h == 0:
+        return _double(point, a, p) if r == 0 else (1, 1, 0)
+    hh = h * h % p
+    hhh = h * hh % p
+    v = x1 * hh % p
+    x3 = (r * r - hhh - 2 * v) % p
+    return x3, (r * (v - x3) - y1 * hhh) % p, z1 * h % p
+
+
+def _to_affine(points: list, p: int) -> list:
+    """Affine ``(x, y)`` of Jacobian points with one field inversion for all, None for infinity"""
+    finite = [point for point in points if point[2] != 0]
+    inverses = iter(GF(p).batch_inverse([point[2] for point in finite]) if finite else [])
+    result = []
+    for x, y, z in points:
+        if z == 0:
+            result.append(None)
+            continue
+        z_inv = next(inverses)
+        zz_inv = z_inv * z_inv % p
+        result.append((x * zz_inv % p, y * zz_inv * z_inv % p))
+    return result
+
+
+def _multiply(point: tuple, scalar: int, a: int, p: int, window: int = 4) -> tuple or None:
+    """``scalar * point`` of an affine point, fixed window over affine multiples of the point"""
+    multiples = [(point[0], point[1], 1)]
+    for _ in range((1 << window) - 2):
+        multiples.append(_add_affine(multiples[-1], point, a, p))
+    table = [None] + _to_affine(multiples, p)
+    result = (1, 1, 0)
+    for shift in range((scalar.bit_length() + window - 1) // window * window - window, -1, -window):
+        for _ in range(window):
+            result = _double(result, a, p)
+        digit = (scalar >> shift) & ((1 << window) - 1)
+        if digit and table[digit] is not None:
+            result = _add_affine(result, table[digit], a, p)
+    return _to_affine([result], p)[0]
+
+
+def _fixed_base_table(point: tuple, bits: int, a: int, p: int, window: int) -> list:
+    """``table[i][j - 1] = j * 2^(window * i) * point`` in affine coordinates, None for infinity"""
+    width = (1 << window) - 1
+    entries = []
+    base = point
+    for _ in range((bits + window - 1) // window):
+        if base is None:
+            entries.extend([(1, 1, 0)] * width)
+            continue
+        multiple = (base[0], base[1], 1)
+        entries.append(multiple)
+        for _ in range(width - 1):
+            multiple = _add_affine(multiple, base, a, p)
+            entries.append(multiple)
+        base = _to_affine([_add_affine(multiple, base, a, p)], p)[0]
+    entries = _to_affine(entries, p)
+    return [entries[i : i + width] for i in range(0, len(entries), width)]
+
+
+def _multiply_fixed(table: list, scalar: int, a: int, p: int, window: int) -> tuple or None:
+    """``scalar * point`` below ``2^(window * len(table))`` from the fixed-base table, additions only"""
+    result = (1, 1, 0)
+    mask = (1 << window) - 1
+    for row in table:
+        digit = scalar & mask
+        if digit and row[digit - 1] is not None:
+            result = _add_affine(result, row[digit - 1], a, p)
+        scalar >>= window
+    return _to_affine([result], p)[0]
+
+
+def _generate_key_chunk(table: list, a: int, p: int, window: int, order: int, count: int, rng) -> list:
+    """Generates ``count`` key pairs as plain tuples. Runs inside the worker processes."""
+    keys = []
+    for _ in range(count):
+        secret = rng.randint(1, order - 1)
+        keys.append((secret, _multiply_fixed(table, secret, a, p, window)))
+    if instrumentation.ENABLED:
+        instrumentation.count("ecdh.fixed_base_multiplications", count)
+    return keys
+
+
+class ECDHCryptosystem:
+    """Elliptic curve Diffie-Hellman on a short Weierstrass curve over a prime field
+
+    Mirrors :class:`DHCryptosystem`, with points ``[x, y]`` instead of powers of the generator.
+    Multiples of the generator are looked up in a fixed-base table computed once per cryptosystem,
+    so a key pair costs about ``bits / window`` point additions and no doublings.
+    Curves of the form ``y^2 = x^3 + a4*x^2 + a5*x + a6`` are moved to the short form internally.
+
+    Args:
+        curve (EllipticCurve, optional): Curve over a prime field above 3 without the y*x and y terms
+        generator (list, optional): Generator point ``[x, y]``. Defaults to point P of the curve.
+        order (int, optional): Order of the generator, computed by counting for small curves if missing
+        window (int, optional): Bits of the scalar handled per table row. Defaults to 4.
+    """
+
+    def __init__(
+        self,
+        curve: EllipticCurve = None,
+        generator: list = None,
+        order: int = None,
+        alice_secret: int = None,
+        bob_secret: int = None,
+        alice_sends: list = None,
+        bob_sends: list = None,
+        key: list = None,
+        window: int = 4,
+    ):
+        self.curve = curve  # publicly known
+        self.generator = generator  # publicly known
+        self.order = order  # publicly known
+        self.alice_secret = alice_secret  # only Alice knows this
+        self.bob_secret = bob_secret  # only Bob knows this
+        self.alice_sends = alice_sends  # publicly known
+        self.bob_sends = bob_sends  # publicly known
+        self.alice_key = key  # only Alice knows this    Both keys should be the same
+        self.bob_key = key  # only Bob knows this        Both keys should be the same
+        self.window = window
+        self._table = None
+        self._table_for = None
+
+    def __repr__(self):
+        return (
+            f'<ECDHCryptosystem curve="{self.curve.attributes if self.curve else None}" '
+            f'field="{self.curve.field if self.curve else None}" generator="{self.generator}" '
+            f'order="{self.order}" alice_secret="{self.alice_secret}" bob_secret="{self.bob_secret}" '
+            f'alice_sends="{self.alice_sends}" bob_sends="{self.bob_sends}" '
+            f'alice_key="{self.alice_key}" bob_key="{self.bob_key}">'
+        )
+
+    @classmethod
+    def named(cls, name: str, **kwargs):
+        """Cryptosystem on a standard curve, see :data:`CURVES`
+
+        Args:
+            name (str): ``"secp256k1"`` or ``"P-256"``
+            **kwargs: Further arguments of the constructor
+
+        Raises:
+            ValueError: If the curve is unknown
+        """
+        if name not in CURVES:
+            raise ValueError(f"Unknown curve {name}, choose one of {list(CURVES)}.")
+        p, a, b, x, y, order = CURVES[name]
+        curve = EllipticCurve(1, 0, 0, 1, 0, a % p, b, p, x, y)
+        return cls(curve, [x, y], order, **kwargs)
+
+    @property
+    def _short_form(self) -> tuple:
+        """``(p, a, shift)`` of the short form ``y^2 = x^3 + a*x + b`` reached by ``x -> x + shift``"""
+        if self.curve is None:
+            raise ValueError("The curve must be set.")
+        _, a1, a2, _, a4, a5, _ = self.curve.attributes
+        p = self.curve.field
+        if not isinstance(p, int) or p <= 3 or a1 % p or a2 % p or not self.curve.is_elliptic_curve():
+            raise ValueError("ECDH needs a curve y^2 = x^3 + a4*x^2 + a5*x + a6 over a prime field above 3.")
+        shift = a4 * GF(p).inverse(3) % p
+        return p, (a5 - a4 * shift) % p, shift
+
+    def _to_short(self, point: list) -> tuple:
+        p, _, shift = self._short_form
+        return (point[0] + shift) % p, point[1] % p
+
+    def _from_short(self, point: tuple) -> list:
+        p, _, shift = self._short_form
+        return [(point[0] - shift) % p, point[1]]
+
+    @property
+    def table(self) -> list:
+        """Fixed-base table of the generator, computed on first use and again if the generator changes"""
+        key = (self.curve.field, tuple(self.curve.attributes), tuple(self.generator), self.order, self.window)
+        if self._table_for != key:
+            p, a, _ = self._short_form
+            with instrumentation.span("ecdh_table"):
+                self._table = _fixed_base_table(
+                    self._to_short(self.generator), self.order.bit_length(), a, p, self.window
+                )
+            self._table_for = key
+        return self._table
+
+    def multiply_generator(self, scalar: int) -> list:
+        """``scalar * generator`` with the fixed-base table
+
+        Returns:
+            list: The point ``[x, y]`` or ``"[∞,∞]"``
+        """
+        p, a, _ = self._short_form
+        point = _multiply_fixed(self.table, scalar % self.order, a, p, self.window)
+        return "[∞,∞]" if point is None else self._from_short(point)
+
+    def multiply(self, point: list, scalar: int) -> list:
+        """``scalar * point`` for any point of the curve, a negative scalar multiplies ``-point``
+
+        Raises:
+            ValueError: If the point is not on the curve
+
+        Returns:
+            list: The point ``[x, y]`` or ``"[∞,∞]"``
+        """
+        if not self.curve.is_point_on_elliptic_curve(*point):
+            raise ValueError(f"{point} is not on the curve.")
+        p, a, _ = self._short_form
+        x, y = self._to_short(point)
+        if scalar < 0:
+            # the point need not lie in the group of the generator, so the scalar is not reduced by its order
+            y, scalar = -y % p, -scalar
+        result = _multiply((x, y), scalar, a, p, self.window) if scalar else None
+        return "[∞,∞]" if result is None else self._from_short(result)
+
+    def compress(self, point: list) -> bytes:
+        """SEC 1 compressed form of a point, the parity of y and x as big-endian bytes
+
+        Raises:
+            ValueError: If the point is not on the curve
+        """
+        if not self.curve.is_point_on_elliptic_curve(*point):
+            raise ValueError(f"{point} is not on the curve.")
+        p = self.curve.field
+        x, y = point[0] % p, point[1] % p
+        return bytes([2 | (y & 1)]) + x.to_bytes((p.bit_length() + 7) // 8, "big")
+
+    def decompress(self, data: bytes) -> list:
+        """Point of a compressed form made by :meth:`compress`
+
+        Raises:
+            ValueError: If ``data`` is not a compressed point of the curve
+        """
+        p = self.curve.field
+        if len(data) != 1 + (p.bit_length() + 7) // 8 or data[0] not in (2, 3):
+            raise ValueError("Not a compressed point of this curve.")
+        x = int.from_bytes(data[1:], "big")
+        _, _, _, _, a4, a5, a6 = self.curve.attributes
+        root = GF(p).sqrt((((x + a4) * x + a5) * x + a6) % p) if x < p else None
+        if root is None:
+            raise ValueError("Not a compressed point of this curve.")
+        return [x, root if root & 1 == data[0] & 1 else (p - root) % p]
+
+    def _check_point(self, point: list):
+        if point == "[∞,∞]" or not self.curve.is_point_on_elliptic_curve(*point):
+            raise ValueError(f"{point} is not a valid public key.")
+
+    def generate_from(self, curve: EllipticCurve = None, generator: list = None, order: int = None, rng=None):
+        """Generates the ECDHCryptosystem values (If not passed == if they are None) or assigns them
+
+        Args:
+            curve (EllipticCurve, optional): Curve of the cryptosystem. Not necessary if already set.
+            generator (list, optional): Generator point. Defaults to point P of the curve.
+            order (int, optional): Order of the generator. Counted point by point if missing, \
+                which only works for small curves.
+            rng (SeededRNG or SystemRNG, optional): Random source. Defaults to the shared ``SystemRNG``.
+
+        Raises:
+            ValueError: If no curve is passed or set, or no generator is known.
+        """
+        self.curve = curve if curve is not None else self.curve
+        if self.curve is None:
+            raise ValueError("The curve must be specified.")
+        if generator is not None:
+            self.generator = generator
+        elif self.generator is None:
+            if None in self.curve.point_p:
+                raise ValueError("Either generator or point P of the curve must be specified.")
+            self.generator = list(self.curve.point_p)
+        self.order = order if order is not None else self.order
+        if self.order is None:
+            self.order = self.curve.get_point_order(*self.generator)
+
+        rng = get_rng(rng)
+        self.alice_secret = rng.randint(1, self.order - 1)
+        self.bob_secret = rng.randint(1, self.order - 1)
+        self.alice_sends = self.multiply_generator(self.alice_secret)
+        self.bob_sends = self.multiply_generator(self.bob_secret)
+        self.alice_key = self.multiply(self.bob_sends, self.alice_secret)
+        self.bob_key = self.multiply(self.alice_sends, self.bob_secret)
+
+    def generate_rest(self, rng=None):
+        """Generates the missing attributes of the ECDHCryptosystem if possible.
+
+        Args:
+            rng (SeededRNG or SystemRNG, optional): Random source. Defaults to the shared ``SystemRNG``.
+
+        Raises:
+            ValueError: If the curve, generator and order are not set, if a secret is out of range \
+                or a public key is not on the curve, or if the attributes that were already set \
+                would have to be calculated from autogenerated values.
+        """
+        if self.curve is None or self.generator is None or self.order is None:
+            raise ValueError("The curve, generator and order must be set.")
+        rng = get_rng(rng)
+        was_generated = False
+        for name in ("alice", "bob"):
+            secret = getattr(self, f"{name}_secret")
+            if secret is None:
+                setattr(self, f"{name}_secret", rng.randint(1, self.order - 1))
+                was_generated = True
+            elif not 0 < secret < self.order:
+                raise ValueError("You can't generate a valid ECDHCryptosystem like that.")
+
+        for name in ("alice", "bob"):
+            sends = getattr(self, f"{name}_sends")
+            if sends is None:
+                setattr(self, f"{name}_sends", self.multiply_generator(getattr(self, f"{name}_secret")))
+                was_generated = True
+            elif was_generated:
+                raise ValueError("You can't generate a valid ECDHCryptosystem like that.")
+            else:
+                self._check_point(sends)
+
+        for name, other in (("alice", "bob"), ("bob", "alice")):
+            if getattr(self, f"{name}_key") is None:
+                key = self.multiply(getattr(self, f"{other}_sends"), getattr(self, f"{name}_secret"))
+                setattr(self, f"{name}_key", key)
+                was_generated = True
+            elif was_generated:
+                raise ValueError("You can't generate a valid ECDHCryptosystem like that.")
+
+    def generate_keys(self, count: int, num_cpus: int = 1, chunk_size: int = 1024, rng=None):
+        """Generates ``count`` key pairs on the generator
+
+        Key pairs are produced in chunks spread over a process pool and yielded as soon as a chunk is done,
+        in the order the chunks were submitted. At most ``2 * num_cpus`` chunks are in flight at once.
+
+        Args:
+            count (int): Number of key pairs to generate
+            num_cpus (int, optional): Number of worker processes. ``1`` generates in this process. Defaults to 1.
+            chunk_size (int, optional): Number of key pairs generated per worker task. Defaults to 1024.
+            rng (SeededRNG or SystemRNG, optional): Random source. Every chunk draws from its own spawned \
+                stream, so a ``SeededRNG`` gives the same keys regardless of ``num_cpus``. \
+                Defaults to the shared ``SystemRNG``.
+
+        Raises:
+            ValueError: If the curve, generator or order is not set, or ``chunk_size`` is below 1.
+
+        Yields:
+            (tuple): tuple containing:
+
+                - int: Secret scalar
+                - list: Public point
+        """
+        if self.curve is None or self.generator is None or self.order is None:
+            raise ValueError("The curve, generator and order must be set to generate keys.")
+        if chunk_size < 1:
+            raise ValueError(f"The chunk size must be at least 1, not {chunk_size}.")
+
+        p, a, _ = self._short_form
+        rng = get_rng(rng)
+        sizes = [chunk_size] * (count // chunk_size)
+        if count % chunk_size:
+            sizes.append(count % chunk_size)
+        arguments = (self.table, a, p, self.window, self.order)
+        chunks = [(*arguments, size, rng.spawn(i)) for i, size in enumerate(sizes)]
+
+        if num_cpus <= 1:
+            for chunk in chunks:
+                for secret, point in _generate_key_chunk(*chunk):
+                    yield secret, self._from_short(point)
+            return
+
+        with ProcessPoolExecutor(max_workers=num_cpus) as executor:
+            pending = deque()
+            chunks = iter(chunks)
+            for chunk in chunks:
+                pending.append(executor.submit(_generate_key_chunk, *chunk))
+                if len(pending) >= 2 * num_cpus:
+                    break
+            while pending:
+                result = pending.popleft().result()
+                for chunk in chunks:
+                    pending.append(executor.submit(_generate_key_chunk, *chunk))
+                    break
+                for secret, point in result:
+                    yield secret, self._from_short(point)
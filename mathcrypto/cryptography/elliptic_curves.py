@@ -5,14 +5,85 @@
 
     I want to thank them for allowing me to use their code.
 """
+import functools
+
+from .. import instrumentation, serialization, verification
+from ..math.fields import GF
+from .control import SolverControl
+from .primes import Primes
+
+_TABLE_LIMIT = 1 << 24
+
+
+@functools.lru_cache(maxsize=4)
+def _points_per_value(field: int) -> bytes:
+    """Number of y with ``y^2 = v`` for every v of the field: 2 for non-zero squares, 1 for zero, else 0"""
+    table = bytearray(field)
+    table[0] = 1
+    square = 0
+    for y in range(1, (field + 1) // 2):
+        # (y + 1)^2 = y^2 + 2y + 1, so no multiplication is needed
+        square = (square + 2 * y - 1) % field
+        table[square] = 2
+    return bytes(table)
+
+
+def count_points(field: int, a4: int, a5: int, a6: int) -> int:
+    """Number of points of ``y^2 = x^3 + a4*x^2 + a5*x + a6`` over the prime field, the point at infinity included
+
+    Every x contributes ``1 + legendre(f(x))`` points, so counting takes one pass over the field.
+    For fields below 2^24 the Legendre symbols come from a table of squares,
+    above that each costs a modular exponentiation.
+
+    Args:
+        field (int): Odd prime
+        a4 (int): Coefficient of x^2
+        a5 (int): Coefficient of x
+        a6 (int): Constant coefficient
+
+    Returns:
+        int: Order of the curve
+    """
+    if instrumentation.ENABLED:
+        instrumentation.count("point_counting")
+    return 1 + _count_range(field, a4, a5, a6, 0, field, field < _TABLE_LIMIT)
+
+
+def _count_range(field: int, a4: int, a5: int, a6: int, start: int, stop: int, table: bool) -> int:
+    """Affine points with x in ``[start, stop)``, from the table of squares or from Legendre symbols"""
+    if not table:
+        legendre = GF(field).legendre
+        return sum(1 + legendre(((x + a4) * x + a5) * x + a6) for x in range(start, stop))
+
+    points = _points_per_value(field)
+    # f(x + 1) - f(x) is quadratic in x, stepping with finite differences needs additions only
+    value = (((start + a4) * start + a5) * start + a6) % field
+    first = ((3 * start + 3 + 2 * a4) * start + 1 + a4 + a5) % field
+    second = (6 * start + 6 + 2 * a4) % field
+    total = 0
+    for _ in range(start, stop):
+        total += points[value]
+        value = (value + first) % field
+        first = (first + second) % field
+        second = (second + 6) % field
+    return total
 
 
 class EllipticCurve:
     """Elliptic curve objects
 
+    Curves pickle as their constructor arguments. Over a prime field, :meth:`to_bytes` gives a compact
+    binary form of the curve and :meth:`points_to_bytes` of a list of its points,
+    see :mod:`mathcrypto.serialization`.
+
+    Arithmetic on points goes through the field of the curve, see :mod:`mathcrypto.math.fields`.
+    ``field`` is usually a prime, but can also be a :class:`~mathcrypto.math.fields.ExtensionField`
+    for curves over GF(p^k). Points on those are passed and returned as field elements, and only the point
+    arithmetic (:meth:`is_point_on_elliptic_curve`, :meth:`add_point`, :meth:`get_point_order`) is supported.
+
     Args:
         a0-a6 (int): Curve attributes (using the equation a0*y^2 + a1*y + a2*y*x = a3*x^3 + a4*x^2 + a5*x+a6)
-        field (int, optional): The curves field
+        field (int or ExtensionField, optional): The curves field
         point_px (int, optional): X coordinate of point P
         point_py (int, optional): Y coordinate of point P"""
 
@@ -33,6 +104,90 @@ class EllipticCurve:
         self.point_p = [point_px, point_py]
         self.field = field
 
+    def __reduce__(self):
+        return EllipticCurve, (*self.attributes, self.field, *self.point_p)
+
+    def _check_prime_field(self):
+        if self.field is not None and not isinstance(self.field, int):
+            raise ValueError("Only curves over a prime field have a binary form.")
+
+    def to_bytes(self) -> bytes:
+        """Compact binary form of the attributes, field and point P, see :meth:`from_bytes`
+
+        Raises:
+            ValueError: If the field is an extension field
+        """
+        self._check_prime_field()
+        return serialization.encode(b"curve", [*self.attributes, self.field, *self.point_p])
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Reads a curve written by :meth:`to_bytes`
+
+        Args:
+            data (bytes, bytearray or memoryview): The binary form
+
+        Raises:
+            ValueError: If ``data`` is not a curve written by :meth:`to_bytes`
+
+        Returns:
+            EllipticCurve: The curve
+        """
+        values, _ = serialization.decode(data, b"curve")
+        if len(values) != 10:
+            raise ValueError("The data does not hold the values of a curve.")
+        return cls(*values)
+
+    def points_to_bytes(self, points) -> bytes:
+        """Packs points of the curve, such as the list of :meth:`get_curve_order`, into two fixed-width arrays
+
+        Coordinates are stored reduced modulo the field, so ``[x, -y]`` comes back as ``[x, field - y]``.
+        The point at infinity is stored with ``x = field``.
+
+        Args:
+            points (iterable): Points ``[x, y]`` and ``"[∞,∞]"``
+
+        Raises:
+            ValueError: If the field is not set or is an extension field
+
+        Returns:
+            bytes: The packed points, see :meth:`points_from_bytes`
+        """
+        self._check_prime_field()
+        if self.field is None:
+            raise ValueError("Field is needed for this.")
+        xs, ys = [], []
+        for point in points:
+            if point == "[∞,∞]":
+                xs.append(self.field)
+                ys.append(0)
+            else:
+                xs.append(point[0] % self.field)
+                ys.append(point[1] % self.field)
+        return serialization.encode(b"points", [self.field], [xs, ys])
+
+    def points_from_bytes(self, data) -> list:
+        """Unpacks points written by :meth:`points_to_bytes` for a curve over the same field
+
+        Args:
+            data (bytes, bytearray or memoryview): The packed points
+
+        Raises:
+            ValueError: If ``data`` does not hold points over the field of this curve
+
+        Returns:
+            list: Points ``[x, y]`` and ``"[∞,∞]"``
+        """
+        (field,), (xs, ys) = serialization.decode(data, b"points")
+        if field != self.field:
+            raise ValueError(f"The points are over the field {field}, not {self.field}.")
+        return ["[∞,∞]" if x == field else [x, y] for x, y in zip(xs, ys)]
+
+    @property
+    def _field(self):
+        """Field object of the curve, shared by all curves over the same prime"""
+        return GF(self.field) if isinstance(self.field, int) else self.field
+
     @classmethod
     def _divisors(cls, number: int):
         list_of_divisors = []
@@ -52,6 +207,10 @@ class EllipticCurve:
 
     @classmethod
     def _find_sqrt_ec(self, x, field):
+        root = GF(field).sqrt(x)
+        if root is not None and root * root % field == x % field:
+            return root
+        # Tonelli-Shanks needs a prime field, other moduli are searched
         for i in range(0, field):
             result = (i * i) % field
             if result == x:
@@ -59,10 +218,10 @@ class EllipticCurve:
 
     @classmethod
     def _find_inverse(cls, num, mod):
-        for i in range(1, int(mod)):
-            if (i * num) % mod == 1:
-                return i
-        return False
+        try:
+            return GF(mod).inverse(num)
+        except (ZeroDivisionError, ValueError):
+            return False
 
     def is_elliptic_curve(self):
         """Checks if the curve is elliptic
@@ -99,6 +258,11 @@ class EllipticCurve:
         if self.attributes[2] != 0:
             print("Not supported type of EC")
             return False
+        if not get_points and self.field > 3 and Primes.is_prime(self.field):
+            order = count_points(self.field, *self.attributes[4:])
+            if verification.RATE:
+                verification.check("EllipticCurve.get_curve_order", (self.field, *self.attributes[4:]), order)
+            return order
 
         line_points = []
         y_2_points = []
@@ -147,11 +311,49 @@ class EllipticCurve:
                     list_of_points.append(line[4][1])
                     order += 2
 
+        if verification.RATE:
+            verification.check("EllipticCurve.get_curve_order", (self.field, *self.attributes[4:]), order)
         if not get_points:
             return order
         else:
             return order, list_of_points
 
+    def iter_points(self):
+        """Yields the points of the curve without building a list, for fields of any size
+
+        The values of the right-hand side are stepped like in :func:`count_points`, and roots are only
+        computed for squares. Memory stays flat apart from the table of squares for fields below 2^24.
+
+        Raises:
+            ValueError: If the field is not an odd prime or the curve is not supported, \
+                see :meth:`get_curve_order`
+
+        Yields:
+            list: Points ``[x, y]`` in ascending x, the smaller y first, and ``"[∞,∞]"`` last
+        """
+        if not isinstance(self.field, int) or self.field < 3 or not Primes.is_prime(self.field):
+            raise ValueError("Points are only enumerated over odd prime fields.")
+        if not self.is_elliptic_curve() or self.attributes[2] % self.field:
+            raise ValueError("This is not an elliptic curve of a supported type.")
+        p = self.field
+        a4, a5, a6 = self.attributes[4:]
+        field = GF(p)
+        points = _points_per_value(p) if p < _TABLE_LIMIT else None
+        value = a6 % p
+        first = (1 + a4 + a5) % p
+        second = (6 + 2 * a4) % p
+        for x in range(p):
+            if value == 0:
+                yield [x, 0]
+            elif (points[value] if points is not None else field.legendre(value)) > 0:
+                root = field.sqrt(value)
+                yield [x, root]
+                yield [x, p - root]
+            value = (value + first) % p
+            first = (first + second) % p
+            second = (second + 6) % p
+        yield "[∞,∞]"
+
     def is_point_on_elliptic_curve(self, x: int, y: int):
         """Checks if point of given coordinates is on the curve.
 
@@ -170,8 +372,19 @@ class EllipticCurve:
         if not self.is_elliptic_curve():
             raise ValueError("This is not an elliptic curve!")
 
-        a = (y ** 2 + self.attributes[1] * y + self.attributes[2] * x * y) % self.field
-        b = (x ** 3 + self.attributes[4] * x ** 2 + self.attributes[5] * x + self.attributes[6]) % self.field
+        _, a1, a2, _, a4, a5, a6 = self.attributes
+        if isinstance(self.field, int):
+            p = self.field
+            x %= p
+            y %= p
+            # Horner's scheme, reducing after every step instead of building x^3 first
+            a = (y + a1 + a2 * x) * y % p
+            b = (((x + a4) * x + a5) % p * x + a6) % p
+        else:
+            x = self.field(x)
+            y = self.field(y)
+            a = (y + a1 + x * a2) * y
+            b = ((x + a4) * x + a5) * x + a6
 
         if a == b:
             return True
@@ -197,8 +410,12 @@ class EllipticCurve:
             raise ValueError("Field is needed for this.")
         if self.point_p is None:
             raise ValueError("Point P is needed for this.")
-        point_p = [self.point_p[0] % self.field, self.point_p[1] % self.field]
-        point_q = [point_qx % self.field, point_qy % self.field]
+        if isinstance(self.field, int):
+            point_p = [self.point_p[0] % self.field, self.point_p[1] % self.field]
+            point_q = [point_qx % self.field, point_qy % self.field]
+        else:
+            point_p = [self.field(self.point_p[0]), self.field(self.point_p[1])]
+            point_q = [self.field(point_qx), self.field(point_qy)]
 
         if not (
             self.is_point_on_elliptic_curve(point_p[0], point_p[1])
@@ -206,27 +423,40 @@ class EllipticCurve:
         ):
             raise ValueError(f"One or Two points, which were given, are not on E[F{str(self.field)}].")
 
-        if point_p[0] != point_q[0]:
-            a = point_q[1] - point_p[1]
-            b = self._find_inverse(point_q[0] - point_p[0], self.field)
-
-            lambdas = a * b % self.field
-
-            x_r = (lambdas ** 2 - point_q[0] - point_p[0]) % self.field
-            r = [x_r, (lambdas * (point_p[0] - x_r) - point_p[1]) % self.field]
-
-        elif point_p[0] == point_q[0] and point_p[1] == point_q[1] and point_p[1] != 0:
-            a = (3 * point_p[0] ** 2 + self.attributes[5]) % self.field
-            b = self._find_inverse(2 * point_p[1], self.field)
-
-            lambdas = a * b % self.field
-            x_r = (lambdas ** 2 - 2 * point_p[0]) % self.field
-            r = [x_r, (lambdas * (point_p[0] - x_r) - point_p[1]) % self.field]
-
+        if point_p[0] != point_q[0] or (point_p[1] == point_q[1] and point_p[1] != 0):
+            point_r = self._add_affine(point_p, point_q)
         else:
-            r = "[∞,∞]"
+            point_r = "[∞,∞]"
+        if verification.RATE and isinstance(self.field, int):
+            args = (self.field, *self.attributes[4:6], point_p, point_q)
+            verification.check("EllipticCurve.add_point", args, point_r)
+        return point_r
+
+    def _add_affine(self, point_p: list, point_q: list) -> list:
+        """Sum of two affine points that is not the point at infinity
+
+        The terms with a4 make this valid for the whole supported form y^2 = x^3 + a4*x^2 + a5*x + a6.
+        Over a prime field the coordinates are ints reduced after every operation,
+        over an extension field they are field elements.
+        """
+        a4, a5 = self.attributes[4], self.attributes[5]
+        field = self._field
+        if isinstance(self.field, int):
+            p = self.field
+            if point_p[0] != point_q[0]:
+                lambdas = (point_q[1] - point_p[1]) * field.inverse(point_q[0] - point_p[0]) % p
+            else:
+                numerator = ((3 * point_p[0] + 2 * a4) * point_p[0] + a5) % p
+                lambdas = numerator * field.inverse(2 * point_p[1]) % p
+            x_r = (lambdas * lambdas - a4 - point_p[0] - point_q[0]) % p
+            return [x_r, (lambdas * (point_p[0] - x_r) - point_p[1]) % p]
 
-        return r
+        if point_p[0] != point_q[0]:
+            lambdas = (point_q[1] - point_p[1]) / (point_q[0] - point_p[0])
+        else:
+            lambdas = ((point_p[0] * 3 + a4 * 2) * point_p[0] + a5) / (point_p[1] * 2)
+        x_r = lambdas * lambdas - a4 - point_p[0] - point_q[0]
+        return [x_r, lambdas * (point_p[0] - x_r) - point_p[1]]
 
     def get_point_order(self, point_x: int = None, point_y: int = None):
         """Gets the order of point of given coordinates or point P if set. Given coordinates take precedence.
@@ -259,11 +489,16 @@ class EllipticCurve:
             if help_point == "[∞,∞]":
                 return order
 
-    def get_all_point_order(self):
+    def get_all_point_order(self, control: SolverControl = None):
         """Gets orders of all points on the curve
 
+        Args:
+            control (SolverControl, optional): Limits, progress and cancellation, checked per point. \
+                A checkpoint stores the orders found so far and the index of the next point.
+
         Raises:
             ValueError: If field is not set
+            SolverInterrupted: If ``control`` stopped the computation.
 
         Returns:
             list of lists: list of lists[order, point]
@@ -281,7 +516,28 @@ class EllipticCurve:
         for order in list_of_orders:
             list_of_point_orders.append([order])
 
-        for point in points:
+        start = 0
+        if control is not None:
+            checkpoint = control.resume("get_all_point_order")
+            if checkpoint is not None:
+                if checkpoint["curve"] != [*self.attributes, self.field]:
+                    raise ValueError("The checkpoint was made for a different curve.")
+                start = checkpoint["index"]
+                list_of_point_orders = [list(orders) for orders in checkpoint["orders"]]
+            control.start(len(points))
+
+        for index in range(start, len(points)):
+            point = points[index]
+            if control is not None and index != start:
+                control.step(
+                    1,
+                    {
+                        "solver": "get_all_point_order",
+                        "curve": [*self.attributes, self.field],
+                        "index": index,
+                        "orders": [list(orders) for orders in list_of_point_orders],
+                    },
+                )
             if point == "[∞,∞]":
                 order = 1
             else:
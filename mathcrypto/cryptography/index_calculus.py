@@ -0,0 +1,312 @@
+import heapq
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+from .. import backend, instrumentation
+from .pollard_rho import PollardRho
+from .primes import Primes
+from .rng import get_rng
+from .table_cache import TableCache
+
+
+def _smooth_exponents(value: int, factor_base: list, factor_base_product: int) -> dict or None:
+    """Factors ``value`` over the factor base
+
+    Returns:
+        dict or None: ``{index in factor base: exponent}`` or None if ``value`` is not smooth
+    """
+    remaining = value
+    common = backend.gcd(remaining, factor_base_product)
+    while common > 1:
+        remaining //= common
+        common = backend.gcd(remaining, common)
+    if remaining != 1:
+        return None
+
+    exponents = {}
+    for index, prime in enumerate(factor_base):
+        if value == 1:
+            break
+        while value % prime == 0:
+            value //= prime
+            exponents[index] = exponents.get(index, 0) + 1
+    return exponents
+
+
+def _collect_relations(prime: int, generator: int, order: int, factor_base: list, attempts: int, rng) -> list:
+    """Keeps the random exponents k with a smooth ``generator^k``. Runs in the worker processes."""
+    factor_base_product = math.prod(factor_base)
+    relations = []
+    for _ in range(attempts):
+        k = rng.randrange(1, order)
+        exponents = _smooth_exponents(backend.powmod(generator, k, prime), factor_base, factor_base_product)
+        if exponents is not None:
+            relations.append((k, exponents))
+    return relations
+
+
+class IndexCalculus:
+    """Index calculus discrete logarithm solver for prime fields
+
+    The order of the generator is split into prime powers and the logarithm is solved for each of them:
+
+        - Large prime factors q use index calculus. Relations ``generator^k = p1^e1 * ... * pm^em``
+          between random powers of the generator and small primes of the factor base are collected
+          on a process pool. Solving the sparse linear system ``k = e1*log(p1) + ... + em*log(pm) (mod q)``
+          gives the logarithms of the factor base, then a descent step writes ``target * generator^k``
+          over the factor base.
+        - Small prime powers use Pohlig-Hellman, solving each digit with Baby-step Giant-step
+          (or Pollard rho for large primes dividing the order more than once).
+
+    The partial results are combined with the Chinese remainder theorem.
+    The logarithms of the factor base do not depend on the target, so they can be kept in a :class:`TableCache`
+    and reused for every target under the same prime and generator.
+    The generator should be a primitive root, otherwise the small primes may lie outside its group.
+    """
+
+    small_prime_bound = 1 << 24
+
+    @classmethod
+    def default_bound(cls, prime: int) -> int:
+        """Smoothness bound L(p)^(1/2) = exp(1/2 * sqrt(ln p * ln ln p)), at least 50"""
+        log_p = math.log(prime)
+        return max(50, int(math.exp(0.5 * math.sqrt(log_p * math.log(log_p)))))
+
+    @classmethod
+    def _subgroup_log(cls, prime: int, base: int, target: int, order: int) -> int:
+        """Logarithm in the subgroup of prime order ``order`` generated by ``base``"""
+        if order > cls.small_prime_bound:
+            return PollardRho.discrete_log(prime, base, target, order=order)
+        m = backend.isqrt(order) + 1
+        table = {}
+        value = 1
+        for i in range(m):
+            table.setdefault(value, i)
+            value = value * base % prime
+        factor = backend.powmod(base, -m, prime)
+        value = target
+        for j in range(m + 1):
+            if value in table:
+                return (j * m + table[value]) % order
+            value = value * factor % prime
+        raise ValueError(f"{target} is not in the subgroup generated by {base}.")
+
+    @classmethod
+    def _pohlig_hellman(cls, prime: int, generator: int, target: int, order: int, q: int, e: int) -> int:
+        """Logarithm of ``target`` modulo ``q^e``"""
+        gamma = backend.powmod(generator, order // q, prime)
+        inverse = backend.invert(generator, prime)
+        x = 0
+        for k in range(e):
+            h_k = backend.powmod(target * pow(inverse, x, prime) % prime, order // q ** (k + 1), prime)
+            x += cls._subgroup_log(prime, gamma, h_k, q) * q ** k
+        return x
+
+    @classmethod
+    def _solve_mod(cls, relations: list, q: int) -> dict:
+        """Sparse Gaussian elimination of the relations modulo the prime q
+
+        Returns:
+            dict: ``{index in factor base: log modulo q}`` for every unknown the relations determine
+        """
+        pivots = []
+        pivot_rows = {}
+        for k, exponents in relations:
+            row = {index: exponent % q for index, exponent in exponents.items() if exponent % q}
+            rhs = k % q
+            # pivot rows only contain pivots created after them, so reducing in creation order never loops
+            reducible = [(pivot_rows[column][2], column) for column in row if column in pivot_rows]
+            heapq.heapify(reducible)
+            while reducible:
+                _, column = heapq.heappop(reducible)
+                coefficient = row.pop(column, 0)
+                if not coefficient:
+                    continue
+                pivot_row, pivot_rhs, _ = pivot_rows[column]
+                for other, value in pivot_row.items():
+                    if other == column:
+                        continue
+                    updated = (row.get(other, 0) - coefficient * value) % q
+                    if updated:
+                        if other not in row and other in pivot_rows:
+                            heapq.heappush(reducible, (pivot_rows[other][2], other))
+                        row[other] = updated
+                    else:
+                        row.pop(other, None)
+                rhs = (rhs - coefficient * pivot_rhs) % q
+            if not row:
+                continue
+            column = min(row, key=lambda c: (row[c] != 1, c))
+            inverse = backend.invert(row[column], q)
+            row = {other: value * inverse % q for other, value in row.items()}
+            pivot_rows[column] = (row, rhs * inverse % q, len(pivots))
+            pivots.append(column)
+
+        logs = {}
+        for column in reversed(pivots):
+            row, rhs, _ = pivot_rows[column]
+            value = rhs
+            for other, coefficient in row.items():
+                if other == column:
+                    continue
+                if other not in logs:
+                    break
+                value -= coefficient * logs[other]
+            else:
+                logs[column] = value % q
+        return logs
+
+    @classmethod
+    def _relations(
+        cls, prime: int, generator: int, order: int, factor_base: list, count: int, num_workers: int, rng
+    ) -> list:
+        relations = []
+        batch = max(100, 20 * len(factor_base))
+        if num_workers <= 1:
+            stream = 0
+            while len(relations) < count:
+                relations += _collect_relations(
+                    prime, generator, order, factor_base, batch, rng.spawn(stream)
+                )
+                stream += 1
+            return relations
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            stream = 0
+            while len(relations) < count:
+                futures = [
+                    executor.submit(
+                        _collect_relations, prime, generator, order, factor_base, batch, rng.spawn(stream + i)
+                    )
+                    for i in range(num_workers)
+                ]
+                stream += num_workers
+                for future in futures:
+                    relations += future.result()
+        return relations
+
+    @classmethod
+    def factor_base_logs(
+        cls,
+        prime: int,
+        generator: int,
+        q: int,
+        order: int = None,
+        bound: int = None,
+        num_workers: int = 1,
+        cache=None,
+        rng=None,
+    ) -> dict:
+        """Computes the logarithms of the factor base modulo a prime factor q of the order of the generator
+
+        Args:
+            prime (int): Prime modulus
+            generator (int): Base of the logarithms
+            q (int): Prime factor of ``order``
+            order (int, optional): Order of ``generator``. Defaults to ``prime - 1``.
+            bound (int, optional): Smoothness bound, the factor base contains all primes up to it. \
+                Defaults to :meth:`default_bound`.
+            num_workers (int, optional): Processes collecting relations. Defaults to 1.
+            cache (TableCache or str, optional): Cache, or directory of a cache, where the logarithms \
+                and the factor base are stored and looked up
+            rng (SeededRNG or SystemRNG, optional): Random source of the relation search
+
+        Returns:
+            dict: ``{factor base prime: log modulo q}`` for every factor base prime the relations determine
+        """
+        order = order if order is not None else prime - 1
+        bound = bound if bound is not None else cls.default_bound(prime)
+        if isinstance(cache, str):
+            cache = TableCache(cache)
+        if cache is not None:
+            cached = cache.get("index_calculus", (prime, generator, q, bound))
+            if cached is not None:
+                with cached:
+                    return dict(zip(cached["primes"], cached["logs"]))
+
+        rng = get_rng(rng)
+        factor_base = list(Primes.sieve(bound, cache=cache))
+        with instrumentation.span("index_calculus.relations"):
+            relations = cls._relations(
+                prime, generator, order, factor_base, len(factor_base) + 20, num_workers, rng
+            )
+        with instrumentation.span("index_calculus.linear_algebra"):
+            solved = cls._solve_mod(relations, q)
+        logs = {factor_base[index]: log for index, log in sorted(solved.items())}
+
+        if cache is not None:
+            cache.put(
+                "index_calculus",
+                (prime, generator, q, bound),
+                {"primes": list(logs), "logs": list(logs.values())},
+                {"prime": str(prime), "generator": str(generator), "q": str(q), "bound": bound},
+            ).close()
+        return logs
+
+    @classmethod
+    def _descent(cls, prime: int, generator: int, target: int, order: int, q: int, logs: dict, rng) -> int:
+        """Logarithm of ``target`` modulo q from the factor base logarithms"""
+        factor_base = sorted(logs)
+        factor_base_product = math.prod(factor_base)
+        while True:
+            k = rng.randrange(0, order)
+            value = target * backend.powmod(generator, k, prime) % prime
+            exponents = _smooth_exponents(value, factor_base, factor_base_product)
+            if exponents is not None:
+                return (sum(e * logs[factor_base[i]] for i, e in exponents.items()) - k) % q
+
+    @classmethod
+    def discrete_log(
+        cls,
+        prime: int,
+        generator: int,
+        target: int,
+        order: int = None,
+        order_factors: list = None,
+        bound: int = None,
+        num_workers: int = 1,
+        cache=None,
+        rng=None,
+    ) -> int:
+        """Finds x such that ``generator^x = target (mod prime)``
+
+        Args:
+            prime (int): Prime modulus
+            generator (int): Base of the logarithm
+            target (int): Element of the group generated by ``generator``
+            order (int, optional): Order of ``generator``. Defaults to ``prime - 1``.
+            order_factors (list, optional): Prime factors of ``order`` including duplicates. \
+                Defaults to ``Primes.factorize(order)``.
+            bound (int, optional): Smoothness bound of the factor base. Defaults to :meth:`default_bound`.
+            num_workers (int, optional): Processes collecting relations. Defaults to 1.
+            cache (TableCache or str, optional): Cache, or directory of a cache, of the factor base logarithms
+            rng (SeededRNG or SystemRNG, optional): Random source
+
+        Raises:
+            ValueError: If no logarithm was found, ``target`` is not in the group generated by ``generator``.
+
+        Returns:
+            int: The logarithm, reduced modulo ``order``
+        """
+        order = order if order is not None else prime - 1
+        rng = get_rng(rng)
+        target %= prime
+        factors = {}
+        for factor in order_factors if order_factors is not None else Primes.factorize(order):
+            factors[factor] = factors.get(factor, 0) + 1
+
+        residues = []
+        with instrumentation.span("index_calculus"):
+            for q, e in sorted(factors.items()):
+                if e == 1 and q > cls.small_prime_bound:
+                    logs = cls.factor_base_logs(prime, generator, q, order, bound, num_workers, cache, rng)
+                    residues.append((cls._descent(prime, generator, target, order, q, logs, rng), q))
+                else:
+                    residues.append((cls._pohlig_hellman(prime, generator, target, order, q, e), q ** e))
+
+        x, modulus = 0, 1
+        for residue, factor_modulus in residues:
+            x += modulus * ((residue - x) * backend.invert(modulus, factor_modulus) % factor_modulus)
+            modulus *= factor_modulus
+        if backend.powmod(generator, x, prime) != target:
+            raise ValueError(f"{target} is not in the group generated by {generator}.")
+        return x
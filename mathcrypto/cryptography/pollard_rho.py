@@ -0,0 +1,255 @@
+import multiprocessing
+import queue
+import sqlite3
+
+from .. import backend, instrumentation
+from .control import SolverControl
+from .rng import get_rng
+
+_PARTITIONS = 20
+
+
+class MemoryStore:
+    """Distinguished point store kept in the memory of the coordinating process"""
+
+    def __init__(self):
+        self._points = {}
+
+    def __repr__(self):
+        return f'<MemoryStore points="{len(self)}">'
+
+    def __len__(self):
+        return len(self._points)
+
+    def add(self, problem: tuple, point: int, a: int, b: int) -> tuple or None:
+        """Stores a distinguished point
+
+        Args:
+            problem (tuple): ``(prime, generator, target, order)`` the point belongs to
+            point (int): The distinguished point ``generator^a * target^b``
+            a (int): Exponent of the generator
+            b (int): Exponent of the target
+
+        Returns:
+            tuple or None: ``(a, b)`` of a previously stored walk that reached the same point, else None
+        """
+        key = (problem, point)
+        if key in self._points:
+            return self._points[key]
+        self._points[key] = (a, b)
+        return None
+
+    def close(self):
+        """Releases the resources of the store"""
+
+
+class SQLiteStore:
+    """Distinguished point store persisted in an SQLite file
+
+    Points survive the process, so an interrupted search resumes with everything found so far,
+    and several coordinators can share a file.
+
+    Args:
+        path (str): Path of the database file
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS distinguished_points "
+            "(problem TEXT, point TEXT, a TEXT, b TEXT, PRIMARY KEY (problem, point))"
+        )
+        self._connection.commit()
+
+    def __repr__(self):
+        return f'<SQLiteStore path="{self.path}">'
+
+    def __len__(self):
+        return self._connection.execute("SELECT COUNT(*) FROM distinguished_points").fetchone()[0]
+
+    def add(self, problem: tuple, point: int, a: int, b: int) -> tuple or None:
+        """Stores a distinguished point, see :meth:`MemoryStore.add`"""
+        key = (":".join(map(str, problem)), str(point))
+        with self._connection:
+            row = self._connection.execute(
+                "SELECT a, b FROM distinguished_points WHERE problem = ? AND point = ?", key
+            ).fetchone()
+            if row is not None:
+                return int(row[0]), int(row[1])
+            self._connection.execute(
+                "INSERT INTO distinguished_points VALUES (?, ?, ?, ?)", (*key, str(a), str(b))
+            )
+        return None
+
+    def close(self):
+        """Closes the database connection"""
+        self._connection.close()
+
+
+class PollardRho:
+    """Parallel Pollard rho with distinguished points (van Oorschot and Wiener)
+
+    Every worker runs independent random walks through the group generated by ``generator``.
+    Walk elements are kept as ``generator^a * target^b``. A walk stops when it hits a distinguished point,
+    an element whose lowest ``distinguished_bits`` bits are zero, and the point is sent to the coordinator.
+    Two walks reaching the same distinguished point with different exponents give the logarithm.
+    """
+
+    @classmethod
+    def _multipliers(cls, prime: int, generator: int, target: int, order: int) -> list:
+        """Fixed steps of the r-adding walk, derived from the problem so every worker walks the same way"""
+        multipliers = []
+        u, v = 1, 0
+        for _ in range(_PARTITIONS):
+            u = (u * 6364136223846793005 + 1442695040888963407) % order
+            v = (v * 6364136223846793005 + 1442695040888963407) % order
+            multiplier = backend.powmod(generator, u, prime) * backend.powmod(target, v, prime) % prime
+            multipliers.append((multiplier, u, v))
+        return multipliers
+
+    @classmethod
+    def _walks(cls, prime: int, generator: int, target: int, order: int, distinguished_bits: int, rng):
+        """Yields ``(point, a, b)`` for every distinguished point reached by consecutive random walks"""
+        multipliers = cls._multipliers(prime, generator, target, order)
+        mask = (1 << distinguished_bits) - 1
+        max_length = 20 << distinguished_bits
+        while True:
+            a = rng.randrange(0, order)
+            b = rng.randrange(0, order)
+            point = backend.powmod(generator, a, prime) * backend.powmod(target, b, prime) % prime
+            for _ in range(max_length):
+                if point & mask == 0:
+                    yield point, a, b
+                    break
+                multiplier, u, v = multipliers[point % _PARTITIONS]
+                point = point * multiplier % prime
+                a = (a + u) % order
+                b = (b + v) % order
+
+    @classmethod
+    def _worker(cls, problem: tuple, distinguished_bits: int, rng, points: multiprocessing.Queue, stop):
+        """Runs walks in a worker process until the coordinator sets ``stop``"""
+        for found in cls._walks(*problem, distinguished_bits, rng):
+            if stop.is_set():
+                return
+            points.put(found)
+
+    @classmethod
+    def _solve_collision(cls, problem: tuple, first: tuple, second: tuple) -> int or None:
+        """Solves ``a1 + x*b1 = a2 + x*b2 (mod order)`` for x and checks the candidates"""
+        prime, generator, target, order = problem
+        a = (first[0] - second[0]) % order
+        b = (second[1] - first[1]) % order
+        d = backend.gcd(b, order)
+        if b == 0 or a % d != 0 or d > 1 << 16:
+            return None
+        step = order // d
+        x = (a // d) * backend.invert(b // d, step) % step
+        for k in range(d):
+            candidate = x + k * step
+            if backend.powmod(generator, candidate, prime) == target:
+                return candidate
+        return None
+
+    @classmethod
+    def discrete_log(
+        cls,
+        prime: int,
+        generator: int,
+        target: int,
+        order: int = None,
+        num_workers: int = 1,
+        store=None,
+        distinguished_bits: int = None,
+        rng=None,
+        control: SolverControl = None,
+    ) -> int:
+        """Finds x such that ``generator^x = target (mod prime)``
+
+        Args:
+            prime (int): Prime modulus
+            generator (int): Base of the logarithm
+            target (int): Element whose logarithm is searched for. \
+                Must lie in the group generated by ``generator``.
+            order (int, optional): Order of ``generator``. Defaults to ``prime - 1``, \
+                which is exact when ``generator`` is a primitive root.
+            num_workers (int, optional): Number of walking processes. ``1`` walks in this process. Defaults to 1.
+            store (MemoryStore or SQLiteStore, optional): Where the distinguished points are collected. \
+                Defaults to a new MemoryStore.
+            distinguished_bits (int, optional): Number of low zero bits of a distinguished point. \
+                Defaults to a quarter of the bit length of ``order``.
+            rng (SeededRNG or SystemRNG, optional): Random source of the walk starting points. \
+                Every worker gets its own spawned stream.
+            control (SolverControl, optional): Limits, progress and cancellation, \
+                checked per distinguished point. The points themselves are the resumable state, \
+                so pass the same SQLiteStore to resume.
+
+        Raises:
+            SolverInterrupted: If ``control`` stopped the search.
+
+        Returns:
+            int: The logarithm
+        """
+        order = order if order is not None else prime - 1
+        target %= prime
+        if target == 1:
+            return 0
+        if distinguished_bits is None:
+            distinguished_bits = max(0, order.bit_length() // 4 - 2)
+        problem = (prime, generator, target, order)
+        store = store if store is not None else MemoryStore()
+        rng = get_rng(rng)
+        if control is not None:
+            control.start(backend.isqrt(order) >> distinguished_bits)
+
+        with instrumentation.span("pollard_rho"):
+            if num_workers <= 1:
+                walks = cls._walks(*problem, distinguished_bits, rng.spawn(0))
+                return cls._coordinate(problem, store, walks, control)
+
+            points = multiprocessing.Queue()
+            stop = multiprocessing.Event()
+            workers = [
+                multiprocessing.Process(
+                    target=cls._worker,
+                    args=(problem, distinguished_bits, rng.spawn(i), points, stop),
+                    daemon=True,
+                )
+                for i in range(num_workers)
+            ]
+            for worker in workers:
+                worker.start()
+            try:
+                return cls._coordinate(problem, store, cls._drain(points, control), control)
+            finally:
+                stop.set()
+                for worker in workers:
+                    worker.terminate()
+                    worker.join()
+                points.close()
+
+    @classmethod
+    def _drain(cls, points: multiprocessing.Queue, control: SolverControl = None):
+        """Yields the points sent by the workers, checking ``control`` while waiting"""
+        while True:
+            try:
+                yield points.get(timeout=0.1)
+            except queue.Empty:
+                if control is not None:
+                    control.step(0, {"solver": "pollard_rho"})
+
+    @classmethod
+    def _coordinate(cls, problem: tuple, store, points, control: SolverControl = None) -> int:
+        for point, a, b in points:
+            if instrumentation.ENABLED:
+                instrumentation.count("rho.distinguished_points")
+            previous = store.add(problem, point, a, b)
+            if previous is not None and previous != (a, b):
+                if instrumentation.ENABLED:
+                    instrumentation.count("rho.collisions")
+                log = cls._solve_collision(problem, previous, (a, b))
+                if log is not None:
+                    return log
+            if control is not None:
+                control.step(1, {"solver": "pollard_rho"})
@@ -1,58 +1,111 @@
 import math
-import random
-from itertools import count, islice
+
+from .. import backend, instrumentation, verification
+from .control import SolverControl
+from .rng import get_rng
+
+_SMALL_PRIMES_LIMIT = 2000
 
 
 class Primes:
     @classmethod
-    def get_prime(cls, bit_length: int) -> int:
+    def get_prime(cls, bit_length: int, rng=None) -> int:
         """Get a n-bit prime
 
         Args:
             bit_length (int): Bit size of the desired prime number
+            rng (SeededRNG or SystemRNG, optional): Random source. Defaults to the shared ``SystemRNG``.
 
         Returns:
             int: desired prime number
         """
-        prime = random.getrandbits(bit_length)  # nosec
-        while not cls.is_probable_prime_fermat(prime):
-            prime = random.getrandbits(bit_length)
+        with instrumentation.span("get_prime"):
+            rng = get_rng(rng)
+            prime = rng.getrandbits(bit_length)
+            while not cls.is_probable_prime_fermat(prime, rng=rng):
+                prime = rng.getrandbits(bit_length)
         return prime
 
+    @classmethod
+    def get_safe_prime(cls, bit_length: int, rng=None) -> int:
+        """Get a n-bit safe prime ``p = 2q + 1`` with q prime
+
+        The factors of ``p - 1`` are known, so generators modulo a safe prime are found and checked
+        with two modular exponentiations, see :meth:`MultiplicativeGroup.find_primitive_root`.
+
+        Args:
+            bit_length (int): Bit size of the desired prime number, at least 3
+            rng (SeededRNG or SystemRNG, optional): Random source. Defaults to the shared ``SystemRNG``.
+
+        Returns:
+            int: desired safe prime
+        """
+        with instrumentation.span("get_safe_prime"):
+            rng = get_rng(rng)
+            while True:
+                q = rng.getrandbits(bit_length - 1) | (1 << (bit_length - 2)) | 1
+                # most candidates have a small factor in q or 2q + 1, one gcd rules them out before any modexp
+                if q > _SMALL_PRIMES_LIMIT and backend.gcd(q * (2 * q + 1), _SMALL_PRIMES_PRODUCT) != 1:
+                    continue
+                # Miller-Rabin, Fermat takes Carmichael numbers such as q = 561 for primes
+                if cls.is_prime(q) and cls.is_prime(2 * q + 1):
+                    return 2 * q + 1
+
     @classmethod
     def is_prime(cls, num: int) -> bool:
-        """Classic number modulus check
+        """Primality check, exact below 3.3 * 10^24 and probable above
 
-        Tests divisibility by 2 and then every odd number up to sqrt(num).
-        Takes longer to compute than Fermat's primality test but has 100% certainty.
-        Cannot handle numbers larger than the system maxint.
+        Miller-Rabin with the first 13 primes as bases,
+        run by the arithmetic backend (see :mod:`mathcrypto.backend`).
+        The answer is exact for every number below 3.3 * 10^24. Above that bound 12 more fixed bases are used,
+        so the answer is only probable: composites constructed to pass these bases are reported as prime.
+        Use :class:`~mathcrypto.cryptography.certificates.PrimalityCertificate` for a proof.
+        The answer never depends on random numbers or on the backend.
 
         Args:
             num (int): Number to test
 
-        Raises:
-            OverflowError: If the number is too large
-
         Returns:
             bool: True if ``num`` is prime
         """
 
-        if num < 2:
-            return False
+        if instrumentation.ENABLED:
+            instrumentation.count("primality_test")
 
-        if (num % 2) == 0:
-            return False
-        try:
-            for number in islice(count(3, 2), int((math.sqrt(num) / 2) - 1)):
-                if num % number == 0:
-                    return False
-        except OverflowError:
-            raise OverflowError("The number is too large to process.")
+        result = backend.is_prime(num)
+        if verification.RATE:
+            verification.check("Primes.is_prime", (num,), result)
+        return result
 
-        return True
+    @classmethod
+    def sieve(cls, limit: int, cache=None) -> list:
+        """Sieve of Eratosthenes
+
+        Args:
+            limit (int): Upper bound, included
+            cache (TableCache, optional): Cache of prime tables. If given, the primes are memory-mapped \
+                from it, or sieved and stored there, and returned as an ``IntTable``.
+
+        Returns:
+            list: All primes up to ``limit``
+        """
+        if cache is not None:
+            cached = cache.get("primes", (limit,))
+            if cached is None:
+                cached = cache.put("primes", (limit,), {"primes": cls.sieve(limit)}, {"limit": limit})
+            return cached["primes"]
+
+        if limit < 2:
+            return []
+        is_prime = bytearray([1]) * (limit + 1)
+        is_prime[0] = is_prime[1] = 0
+        for number in range(2, backend.isqrt(limit) + 1):
+            if is_prime[number]:
+                is_prime[number * number :: number] = bytes(len(range(number * number, limit + 1, number)))
+        return [number for number, flag in enumerate(is_prime) if flag]
 
     @classmethod
-    def is_probable_prime_fermat(cls, num: int, rounds: int = 5) -> bool:
+    def is_probable_prime_fermat(cls, num: int, rounds: int = 5, rng=None) -> bool:
         """Automatic Fermat's primality test
 
         This test can not provide 100% certainty that the number is indeed prime, \
@@ -64,6 +117,7 @@ class Primes:
         Args:
             num (int): Number to be tested
             rounds (int): How many rounds of testing to perform
+            rng (SeededRNG or SystemRNG, optional): Random source. Defaults to the shared ``SystemRNG``.
             verbose (bool, optional): Whether to return optional \
                 list of [<number it was tested against>: `int`,<result>: `int`]. \
                 Defaults to False.
@@ -89,42 +143,93 @@ class Primes:
         else:
             rounds = rounds
 
+        if instrumentation.ENABLED:
+            instrumentation.count("primality_test")
+
+        rng = get_rng(rng)
         for i in range(rounds):
-            testnum = random.randint(2, num - 1)
-            if pow(testnum, num - 1, num) != 1:
+            testnum = rng.randint(2, num - 1)
+            if instrumentation.ENABLED:
+                instrumentation.count("primality_rounds")
+                instrumentation.count("modexp")
+            if backend.powmod(testnum, num - 1, num) != 1:
                 return False
         return True
 
     @classmethod
-    def factorize(cls, num: int) -> list:
+    def factorize(cls, num: int, control: SolverControl = None) -> list:
         """Classic number factorization
 
         Tests divisibility by 2 and then every odd number up to sqrt(num)\
         while appending the factors. If the number contains multiple instances of a factor,\
         this function returns a list with duplicates.
         Very fast unless the number is a compound of more than one large prime (more than 7 digits, 8 is still acceptable).
+        The cofactors are tested with :meth:`is_prime`, so Carmichael numbers are never taken for primes.
 
         Args:
             num (int): Number to factorize
+            control (SolverControl, optional): Limits, progress and cancellation of the trial division. \
+                A checkpoint stores the factors found so far and the next divisor to try.
+
+        Raises:
+            SolverInterrupted: If ``control`` stopped the factorization.
 
         Returns:
             list: List of factors including duplicates
         """
 
+        with instrumentation.span("factorize"):
+            factors = cls._factorize(num, control)
+        if verification.RATE:
+            verification.check("Primes.factorize", (num,), factors)
+        return factors
+
+    @classmethod
+    def _factorize(cls, num: int, control: SolverControl = None) -> list:
+        original = num
         factors = []
-        if cls.is_probable_prime_fermat(num):
+        start = 2
+        checkpoint = control.resume("factorize") if control is not None else None
+        if checkpoint is not None:
+            if checkpoint["num"] != num:
+                raise ValueError(f"The checkpoint was made for {checkpoint['num']}, not {num}.")
+            factors = list(checkpoint["factors"])
+            num = checkpoint["remaining"]
+            start = checkpoint["divisor"]
+        elif num == 1 or cls.is_prime(num):
+            if instrumentation.ENABLED:
+                instrumentation.count("factorize.prime")
             return [num]
 
-        for number in range(2, math.isqrt(num) + 1):  # isqrt is the integer result of sqrt
+        end = backend.isqrt(num) + 1
+        if control is not None:
+            control.start(end - start)
+        for number in range(start, end):  # isqrt is the integer result of sqrt
+            if control is not None and (number - start) % control.check_every == 0 and number != start:
+                control.step(
+                    control.check_every,
+                    {
+                        "solver": "factorize",
+                        "num": original,
+                        "remaining": num,
+                        "divisor": number,
+                        "factors": list(factors),
+                    },
+                )
             was_in_while = False
             while (num % number) == 0:  # same as (num % number) but faster
                 was_in_while = True
                 factors.append(int(number))
-                num = int(num / number)  # same as int(num / number) but faster
+                num //= number
             if was_in_while:
-                if cls.is_probable_prime_fermat(num) or num == 1:
+                if num == 1 or cls.is_prime(num):
                     break
 
+        if instrumentation.ENABLED:
+            instrumentation.count("factorize.trial_division")
         if num > 1:
             factors.append(int(num))
         return factors
+
+
+_SMALL_PRIMES_PRODUCT = math.prod(Primes.sieve(_SMALL_PRIMES_LIMIT))
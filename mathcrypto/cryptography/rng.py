@@ -0,0 +1,137 @@
+import os
+import random
+import threading
+
+
+class SeededRNG:
+    """Deterministic random number stream for reproducible runs.
+
+    Every ``(seed, worker)`` pair gives an independent stream, so parallel workers
+    can each :meth:`spawn` their own stream and still produce the same results on every run.
+    Not cryptographically secure.
+
+    Args:
+        seed (int, optional): Seed of the stream. Defaults to 0.
+        worker (int, optional): Index of the worker the stream belongs to. Defaults to 0.
+    """
+
+    def __init__(self, seed: int = 0, worker: int = 0):
+        self.seed = seed
+        self.worker = worker
+        self._random = random.Random(f"{seed}:{worker}")  # nosec
+
+    def __repr__(self):
+        return f'<SeededRNG seed="{self.seed}" worker="{self.worker}">'
+
+    def spawn(self, worker: int):
+        """Creates the stream for a worker
+
+        Args:
+            worker (int): Index of the worker
+
+        Returns:
+            SeededRNG: Independent deterministic stream
+        """
+        return SeededRNG(self.seed, (self.worker, worker))
+
+    def getrandbits(self, k: int) -> int:
+        """Gets a random non-negative integer with ``k`` random bits"""
+        return self._random.getrandbits(k)
+
+    def randrange(self, start: int, stop: int) -> int:
+        """Gets a random integer from ``range(start, stop)``"""
+        return self._random.randrange(start, stop)
+
+    def randint(self, a: int, b: int) -> int:
+        """Gets a random integer N such that ``a <= N <= b``"""
+        return self._random.randint(a, b)
+
+
+class SystemRNG:
+    """Cryptographically secure random number source backed by ``os.urandom``.
+
+    Entropy is read from the OS in ``buffer_size`` blocks instead of once per draw.
+    Every thread has its own buffer, so threads sharing a source never get the same bytes.
+    The buffer is discarded when the process id changes, so a forked worker never
+    reuses bytes that its parent has already handed out or will hand out.
+
+    Args:
+        buffer_size (int, optional): Number of bytes fetched from the OS at once. Defaults to 4096.
+    """
+
+    def __init__(self, buffer_size: int = 4096):
+        self.buffer_size = buffer_size
+        self._local = threading.local()
+
+    def __repr__(self):
+        return f'<SystemRNG buffer_size="{self.buffer_size}">'
+
+    def __getstate__(self):
+        return {"buffer_size": self.buffer_size}
+
+    def __setstate__(self, state):
+        self.__init__(state["buffer_size"])
+
+    def spawn(self, worker: int):
+        """Creates the source for a worker
+
+        Args:
+            worker (int): Index of the worker, unused as every source is independent
+
+        Returns:
+            SystemRNG: New source with an empty buffer
+        """
+        return SystemRNG(self.buffer_size)
+
+    def _read(self, num_bytes: int) -> bytes:
+        if num_bytes > self.buffer_size:
+            return os.urandom(num_bytes)
+        local = self._local
+        if getattr(local, "pid", None) != os.getpid() or local.offset + num_bytes > len(local.buffer):
+            local.buffer = os.urandom(self.buffer_size)
+            local.offset = 0
+            local.pid = os.getpid()
+        chunk = local.buffer[local.offset : local.offset + num_bytes]
+        local.offset += num_bytes
+        return chunk
+
+    def getrandbits(self, k: int) -> int:
+        """Gets a random non-negative integer with ``k`` random bits"""
+        if k <= 0:
+            return 0
+        num_bytes = (k + 7) // 8
+        return int.from_bytes(self._read(num_bytes), "big") >> (num_bytes * 8 - k)
+
+    def randrange(self, start: int, stop: int) -> int:
+        """Gets a random integer from ``range(start, stop)``
+
+        Raises:
+            ValueError: If the range is empty
+        """
+        width = stop - start
+        if width <= 0:
+            raise ValueError(f"Empty range for randrange({start}, {stop}).")
+        k = width.bit_length()
+        number = self.getrandbits(k)
+        while number >= width:
+            number = self.getrandbits(k)
+        return start + number
+
+    def randint(self, a: int, b: int) -> int:
+        """Gets a random integer N such that ``a <= N <= b``"""
+        return self.randrange(a, b + 1)
+
+
+_default_rng = SystemRNG()
+
+
+def get_rng(rng=None):
+    """Returns ``rng`` or the shared default source if ``rng`` is None
+
+    Args:
+        rng (SeededRNG or SystemRNG, optional): Explicitly requested source
+
+    Returns:
+        SeededRNG or SystemRNG: Source to draw from
+    """
+    return _default_rng if rng is None else rng
@@ -0,0 +1,254 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from .. import backend, instrumentation
+from .primes import _SMALL_PRIMES_LIMIT, _SMALL_PRIMES_PRODUCT, Primes
+from .rng import get_rng
+
+
+def _encrypt_chunk(n: int, e: int, messages: list) -> list:
+    """Public key operation on every message. Runs inside the worker processes."""
+    for message in messages:
+        if not 0 <= message < n:
+            raise ValueError(f"{message} is not in the range of the modulus.")
+    if instrumentation.ENABLED:
+        instrumentation.count("modexp", len(messages))
+    return [backend.powmod(message, e, n) for message in messages]
+
+
+def _decrypt_chunk(p: int, q: int, dp: int, dq: int, q_inv: int, ciphertexts: list) -> list:
+    """Private key operation on every ciphertext with the CRT. Runs inside the worker processes."""
+    n = p * q
+    results = []
+    for ciphertext in ciphertexts:
+        if not 0 <= ciphertext < n:
+            raise ValueError(f"{ciphertext} is not in the range of the modulus.")
+        m1 = backend.powmod(ciphertext, dp, p)
+        m2 = backend.powmod(ciphertext, dq, q)
+        results.append(m2 + (m1 - m2) * q_inv % p * q)
+    if instrumentation.ENABLED:
+        instrumentation.count("modexp", 2 * len(ciphertexts))
+    return results
+
+
+def _map_chunks(function, arguments: tuple, items, num_cpus: int, chunk_size: int):
+    """Iterator over ``function(*arguments, chunk)`` for chunks of ``items``, in order.
+
+    With ``num_cpus`` above 1 the chunks run on a process pool, at most ``2 * num_cpus`` at once.
+    The arguments are checked here, before the first item is requested.
+
+    Raises:
+        ValueError: If ``num_cpus`` or ``chunk_size`` is below 1
+    """
+    if num_cpus < 1:
+        raise ValueError(f"The number of processes must be at least 1, not {num_cpus}.")
+    if chunk_size < 1:
+        raise ValueError(f"The chunk size must be at least 1, not {chunk_size}.")
+    return _iter_chunks(function, arguments, items, num_cpus, chunk_size)
+
+
+def _iter_chunks(function, arguments: tuple, items, num_cpus: int, chunk_size: int):
+    items = iter(items)
+    chunks = iter(lambda: [item for _, item in zip(range(chunk_size), items)], [])
+    if num_cpus == 1:
+        for chunk in chunks:
+            yield from function(*arguments, chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=num_cpus) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(function, *arguments, chunk))
+            if len(pending) >= 2 * num_cpus:
+                break
+        while pending:
+            result = pending.popleft().result()
+            for chunk in chunks:
+                pending.append(executor.submit(function, *arguments, chunk))
+                break
+            yield from result
+
+
+class RSAPublicKey:
+    """RSA public key
+
+    Attributes:
+        n (int): Modulus
+        e (int): Public exponent
+    """
+
+    __slots__ = ("n", "e")
+
+    def __init__(self, n: int, e: int):
+        self.n = n
+        self.e = e
+
+    def __repr__(self):
+        return f'<RSAPublicKey n="{self.n}" e="{self.e}">'
+
+    def __eq__(self, other):
+        if not isinstance(other, RSAPublicKey):
+            return NotImplemented
+        return (self.n, self.e) == (other.n, other.e)
+
+    def __hash__(self):
+        return hash((self.n, self.e))
+
+    @property
+    def bit_length(self) -> int:
+        """Bit size of the modulus"""
+        return self.n.bit_length()
+
+    def encrypt(self, message: int) -> int:
+        """``message^e mod n``
+
+        Raises:
+            ValueError: If ``message`` is not in ``range(n)``
+        """
+        return _encrypt_chunk(self.n, self.e, [message])[0]
+
+    def verify(self, message: int, signature: int) -> bool:
+        """Whether ``signature`` is the signature of ``message`` made with the private key"""
+        return 0 <= signature < self.n and self.encrypt(signature) == message
+
+    def encrypt_many(self, messages, num_cpus: int = 1, chunk_size: int = 1024):
+        """Encrypts a sequence of messages
+
+        Args:
+            messages (iterable of int): Messages in ``range(n)``
+            num_cpus (int, optional): Number of worker processes. ``1`` encrypts in this process. Defaults to 1.
+            chunk_size (int, optional): Messages per worker task. Defaults to 1024.
+
+        Raises:
+            ValueError: If a message is not in ``range(n)``, or ``num_cpus`` or ``chunk_size`` is below 1
+
+        Yields:
+            int: Ciphertexts in the order of ``messages``
+        """
+        return _map_chunks(_encrypt_chunk, (self.n, self.e), messages, num_cpus, chunk_size)
+
+
+class RSAPrivateKey:
+    """RSA private key with the values of the Chinese remainder theorem precomputed
+
+    A private operation takes two exponentiations modulo p and q with exponents of half the size
+    instead of one modulo n, which is about 3 times faster for 1024 to 2048-bit keys.
+
+    Attributes:
+        n (int): Modulus
+        e (int): Public exponent
+        d (int): Private exponent
+        p (int): First prime factor of n
+        q (int): Second prime factor of n
+        dp (int): ``d mod (p - 1)``
+        dq (int): ``d mod (q - 1)``
+        q_inv (int): ``q^-1 mod p``
+    """
+
+    __slots__ = ("n", "e", "d", "p", "q", "dp", "dq", "q_inv")
+
+    def __init__(self, p: int, q: int, e: int = 65537, d: int = None):
+        if p == q:
+            raise ValueError("The prime factors must be different.")
+        phi = (p - 1) * (q - 1)
+        if d is None:
+            try:
+                d = backend.invert(e, phi)
+            except ValueError:
+                raise ValueError(f"The public exponent {e} is not coprime to phi(n).")
+        self.n = p * q
+        self.e = e
+        self.d = d
+        self.p = p
+        self.q = q
+        self.dp = d % (p - 1)
+        self.dq = d % (q - 1)
+        self.q_inv = backend.invert(q, p)
+
+    def __repr__(self):
+        return f'<RSAPrivateKey bit_length="{self.bit_length}" e="{self.e}">'
+
+    @property
+    def bit_length(self) -> int:
+        """Bit size of the modulus"""
+        return self.n.bit_length()
+
+    @property
+    def public_key(self) -> RSAPublicKey:
+        """The matching public key"""
+        return RSAPublicKey(self.n, self.e)
+
+    def decrypt(self, ciphertext: int) -> int:
+        """``ciphertext^d mod n`` computed with the CRT
+
+        Raises:
+            ValueError: If ``ciphertext`` is not in ``range(n)``
+        """
+        return _decrypt_chunk(self.p, self.q, self.dp, self.dq, self.q_inv, [ciphertext])[0]
+
+    def sign(self, message: int) -> int:
+        """``message^d mod n``, the raw RSA signature of ``message``
+
+        Raises:
+            ValueError: If ``message`` is not in ``range(n)``
+        """
+        return self.decrypt(message)
+
+    def decrypt_many(self, ciphertexts, num_cpus: int = 1, chunk_size: int = 1024):
+        """Decrypts, or signs, a sequence of numbers
+
+        Args:
+            ciphertexts (iterable of int): Numbers in ``range(n)``
+            num_cpus (int, optional): Number of worker processes. ``1`` decrypts in this process. Defaults to 1.
+            chunk_size (int, optional): Numbers per worker task. Defaults to 1024.
+
+        Raises:
+            ValueError: If a number is not in ``range(n)``, or ``num_cpus`` or ``chunk_size`` is below 1
+
+        Yields:
+            int: Results in the order of ``ciphertexts``
+        """
+        arguments = (self.p, self.q, self.dp, self.dq, self.q_inv)
+        return _map_chunks(_decrypt_chunk, arguments, ciphertexts, num_cpus, chunk_size)
+
+    sign_many = decrypt_many
+
+
+class RSA:
+    @classmethod
+    def generate(cls, bit_length: int = 2048, e: int = 65537, rng=None) -> RSAPrivateKey:
+        """Generates a key whose modulus has exactly ``bit_length`` bits
+
+        Args:
+            bit_length (int, optional): Bit size of the modulus, at least 16. Defaults to 2048.
+            e (int, optional): Public exponent, odd and at least 3. Defaults to 65537.
+            rng (SeededRNG or SystemRNG, optional): Random source. Defaults to the shared ``SystemRNG``.
+
+        Raises:
+            ValueError: If ``bit_length`` is below 16 or ``e`` is even or below 3
+
+        Returns:
+            RSAPrivateKey: The generated key
+        """
+        if bit_length < 16:
+            raise ValueError(f"The modulus must have at least 16 bits, not {bit_length}.")
+        # p - 1 is even, so an even e is never coprime to it
+        if e < 3 or e % 2 == 0:
+            raise ValueError(f"The public exponent must be odd and at least 3, not {e}.")
+        with instrumentation.span("rsa_generate"):
+            rng = get_rng(rng)
+            while True:
+                p = cls._get_factor(bit_length - bit_length // 2, e, rng)
+                q = cls._get_factor(bit_length // 2, e, rng)
+                if p != q:
+                    return RSAPrivateKey(p, q, e)
+
+    @classmethod
+    def _get_factor(cls, bit_length: int, e: int, rng) -> int:
+        """Prime with the two top bits set, so the product of two has all bits, and ``p - 1`` coprime to e"""
+        while True:
+            candidate = rng.getrandbits(bit_length) | (3 << (bit_length - 2)) | 1
+            if candidate > _SMALL_PRIMES_LIMIT and backend.gcd(candidate, _SMALL_PRIMES_PRODUCT) != 1:
+                continue
+            if backend.gcd(candidate - 1, e) == 1 and Primes.is_prime(candidate):
+                return candidate
@@ -0,0 +1,316 @@
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import struct
+
+from .. import instrumentation
+
+_MAGIC = b"MCTB"
+_VERSION = 1
+_HEADER = struct.Struct(">4sHI")
+_ALIGNMENT = 8
+
+
+class IntTable:
+    """Read-only sequence of unsigned integers stored as fixed-width big-endian records
+
+    The records are read straight from the underlying buffer, which can be a memory-mapped file,
+    so opening a table does not copy or parse it.
+
+    Args:
+        buffer (bytes, bytearray, memoryview or mmap): Records one after another
+        width (int): Number of bytes per record
+    """
+
+    __slots__ = ("buffer", "width", "_length")
+
+    def __init__(self, buffer, width: int):
+        self.buffer = buffer
+        self.width = width
+        self._length = len(buffer) // width
+
+    @classmethod
+    def pack(cls, values, width: int = None) -> tuple:
+        """Packs integers into fixed-width records
+
+        Args:
+            values (sequence of int): Non-negative integers
+            width (int, optional): Bytes per record. Defaults to the smallest width fitting the largest value.
+
+        Returns:
+            (tuple): tuple containing:
+
+                - bytes: The packed records
+                - int: The width used
+        """
+        values = list(values)
+        if width is None:
+            width = max(1, (max(values, default=0).bit_length() + 7) // 8)
+        return b"".join(value.to_bytes(width, "big") for value in values), width
+
+    def __repr__(self):
+        return f'<IntTable length="{self._length}" width="{self.width}">'
+
+    def __reduce__(self):
+        return IntTable, (bytes(self.buffer[: self._length * self.width]), self.width)
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index: int) -> int:
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("IntTable index out of range")
+        start = index * self.width
+        return int.from_bytes(self.buffer[start : start + self.width], "big")
+
+    def __iter__(self):
+        for start in range(0, self._length * self.width, self.width):
+            yield int.from_bytes(self.buffer[start : start + self.width], "big")
+
+    def index(self, value: int) -> int:
+        """Position of ``value`` in a table sorted in ascending order
+
+        Raises:
+            ValueError: If ``value`` is not in the table
+        """
+        position = bisect.bisect_left(self, value)
+        if position == self._length or self[position] != value:
+            raise ValueError(f"{value} is not in the table")
+        return position
+
+
+class IntMap:
+    """Mapping over two tables of equal length with ``keys`` sorted in ascending order
+
+    Lookups use binary search, so a map opened from a :class:`TableCache` is used without loading it.
+    """
+
+    __slots__ = ("keys", "values")
+
+    def __init__(self, keys: IntTable, values: IntTable):
+        self.keys = keys
+        self.values = values
+
+    def __repr__(self):
+        return f'<IntMap length="{len(self.keys)}">'
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key: int) -> bool:
+        position = bisect.bisect_left(self.keys, key)
+        return position < len(self.keys) and self.keys[position] == key
+
+    def __getitem__(self, key: int) -> int:
+        try:
+            return self.values[self.keys.index(key)]
+        except ValueError:
+            raise KeyError(key)
+
+    @classmethod
+    def from_dict(cls, mapping: dict):
+        """Creates an in-memory map with the same items as ``mapping``"""
+        keys = sorted(mapping)
+        values = [mapping[key] for key in keys]
+        return cls(IntTable(*IntTable.pack(keys)), IntTable(*IntTable.pack(values)))
+
+
+class CachedTable:
+    """Table opened from a :class:`TableCache`, columns are :class:`IntTable` views into the mapped file
+
+    The file stays mapped until the table is closed, with :meth:`close` or by using it as a context manager.
+    Callers must close the tables they get once they no longer use their columns. The cache that opened
+    a table closes it before it replaces or deletes its file, so columns of a table that was evicted
+    or stored again cannot be used anymore.
+
+    Attributes:
+        meta (dict): Metadata stored with the table
+        columns (dict): Column name to IntTable
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, header_length = _HEADER.unpack_from(self._mmap)
+        if magic != _MAGIC or version != _VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a table cache file.")
+        header = json.loads(bytes(self._mmap[_HEADER.size : _HEADER.size + header_length]))
+        self.meta = header["meta"]
+        view = memoryview(self._mmap)
+        # every view has to be released before the file can be unmapped
+        self._views = [view]
+        self.columns = {}
+        for column in header["columns"]:
+            data = view[column["offset"] : column["offset"] + column["size"]]
+            self._views.append(data)
+            self.columns[column["name"]] = IntTable(data, column["width"])
+
+    def __repr__(self):
+        return f'<CachedTable path="{self.path}" columns="{list(self.columns)}">'
+
+    def __getitem__(self, name: str) -> IntTable:
+        return self.columns[name]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._mmap.closed
+
+    def close(self):
+        """Unmaps the file. Columns of the table cannot be used afterwards."""
+        self.columns = {}
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mmap.close()
+
+
+class TableCache:
+    """Directory of precomputed tables keyed by the parameters they were computed for
+
+    Tables are stored in a binary format whose columns are fixed-width integer records,
+    so they are opened with ``mmap`` without copying or rebuilding, also by other processes.
+    When the directory grows above ``max_bytes``, the least recently used tables are deleted.
+
+    The cache keeps track of the tables it opened, :meth:`get` returns the open table of a file
+    instead of mapping it again. Tables are closed before their file is replaced or deleted,
+    and all of them by :meth:`close` or at the end of a ``with`` block.
+
+    Args:
+        directory (str): Directory of the cache, created if missing
+        max_bytes (int, optional): Size limit of the cache. Defaults to no limit.
+    """
+
+    suffix = ".mctb"
+
+    def __init__(self, directory: str, max_bytes: int = None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._tables = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def __repr__(self):
+        return f'<TableCache directory="{self.directory}" max_bytes="{self.max_bytes}">'
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _open(self, path: str) -> CachedTable:
+        table = self._tables.get(path)
+        if table is None or table.closed:
+            table = self._tables[path] = CachedTable(path)
+        return table
+
+    def _release(self, path: str):
+        """Closes the table mapping ``path``, so that the file can be replaced or deleted"""
+        table = self._tables.pop(path, None)
+        if table is not None and not table.closed:
+            table.close()
+
+    def close(self):
+        """Closes every table opened by the cache"""
+        for path in list(self._tables):
+            self._release(path)
+
+    def path(self, kind: str, key: tuple) -> str:
+        """Path of the table of ``kind`` computed for the parameters ``key``"""
+        digest = hashlib.sha256(":".join(map(str, (kind, *key))).encode()).hexdigest()
+        return os.path.join(self.directory, f"{kind}-{digest[:32]}{self.suffix}")
+
+    def get(self, kind: str, key: tuple) -> CachedTable or None:
+        """Opens a cached table
+
+        Args:
+            kind (str): Kind of the table, for example ``"bsgs"``
+            key (tuple): Parameters the table was computed for
+
+        Returns:
+            CachedTable or None: The table or None if it is not cached
+        """
+        path = self.path(kind, key)
+        if not os.path.exists(path):
+            if instrumentation.ENABLED:
+                instrumentation.count(f"{kind}.cache_miss")
+            return None
+        if instrumentation.ENABLED:
+            instrumentation.count(f"{kind}.cache_hit")
+        os.utime(path)
+        return self._open(path)
+
+    def put(self, kind: str, key: tuple, columns: dict, meta: dict = None) -> CachedTable:
+        """Stores a table and opens it
+
+        Args:
+            kind (str): Kind of the table
+            key (tuple): Parameters the table was computed for
+            columns (dict): Column name to sequence of non-negative integers
+            meta (dict, optional): JSON serialisable metadata
+
+        Returns:
+            CachedTable: The stored table
+        """
+        packed = [(name, *IntTable.pack(values)) for name, values in columns.items()]
+        descriptions = []
+        header = b""
+        previous_length = None
+        # the offsets depend on the header length and the other way round
+        while previous_length != len(header):
+            previous_length = len(header)
+            offset = _HEADER.size + len(header)
+            descriptions = []
+            for name, data, width in packed:
+                offset += -offset % _ALIGNMENT
+                descriptions.append({"name": name, "width": width, "offset": offset, "size": len(data)})
+                offset += len(data)
+            header = json.dumps({"meta": meta or {}, "columns": descriptions}).encode()
+            header += b" " * (-(_HEADER.size + len(header)) % _ALIGNMENT)
+
+        path = self.path(kind, key)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as file:
+            file.write(_HEADER.pack(_MAGIC, _VERSION, len(header)))
+            file.write(header)
+            for (_, data, _), description in zip(packed, descriptions):
+                file.write(b"\0" * (description["offset"] - file.tell()))
+                file.write(data)
+        self._release(path)
+        os.replace(temporary, path)
+        self.evict(keep=path)
+        return self._open(path)
+
+    def evict(self, keep: str = None):
+        """Deletes the least recently used tables until the cache fits into ``max_bytes``
+
+        Args:
+            keep (str, optional): Path of a table that is never deleted
+        """
+        if self.max_bytes is None:
+            return
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(self.suffix) and os.path.join(self.directory, name) != keep:
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        if keep is not None:
+            total += os.path.getsize(keep)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._release(os.path.join(self.directory, name))
+            os.remove(os.path.join(self.directory, name))
+            total -= size
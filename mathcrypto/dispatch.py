@@ -0,0 +1,560 @@
+"""Automatic choice of algorithms from a cost model calibrated on the machine.
+
+:class:`Dispatcher` solves a problem with the algorithm and number of worker processes that the
+:class:`Profile` predicts to be the fastest for the input size, among those whose memory fits in what
+is available. The profile holds the cost of one unit of work of every algorithm, measured in a few
+seconds by :meth:`Profile.calibrate`, so the crossovers between algorithms follow the machine:
+a slow process start moves parallelism to larger inputs, a faster backend moves the crossover
+of trial division and Pollard's rho, and so on. Without a calibrated profile, costs measured
+on a typical x86-64 machine are used.
+
+Profiles are stored as JSON in ``$XDG_CACHE_HOME/mathcrypto/profile.json``,
+or where the ``MATHCRYPTO_PROFILE`` environment variable points to::
+
+    Profile.calibrate().save()  # once per machine type, for example at deployment
+
+    key = Dispatcher.solve_dlog(crack_me)
+    factors = Dispatcher.factor(2 ** 64 + 1)
+    Dispatcher.plan("dlog", crack_me.prime)  # ("pollard_rho", 4)
+"""
+import json
+import math
+import multiprocessing
+import os
+import platform
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+from . import backend, instrumentation, verification
+from .cryptography.certificates import _rho_split
+from .cryptography.diffie_hellman import DHCracker, DHCryptosystem
+from .cryptography.elliptic_curves import _TABLE_LIMIT, _count_range, _points_per_value
+from .cryptography.index_calculus import IndexCalculus
+from .cryptography.pollard_rho import PollardRho
+from .cryptography.primes import Primes
+from .cryptography.rng import SeededRNG, get_rng
+from .math.groups import MultiplicativeGroup
+
+_PROFILE_VERSION = 1
+_SMALL_PRIMES = Primes.sieve(1 << 10)
+# brute force shares the key through a C int
+_BRUTE_FORCE_LIMIT = 1 << 31
+# share of the available memory the tables of one call may take
+_MEMORY_SHARE = 0.5
+
+# seconds per unit of work, see Profile.calibrate for what a unit is
+_DEFAULT_UNITS = {
+    "spawn": 4.0e-03,
+    "scan": 4.0e-09,
+    "brute_force": 1.0e-07,
+    "baby_step": 4.8e-07,
+    "baby_step_bytes": 100.0,
+    "pollard_rho": 1.1e-06,
+    "index_calculus": 4.3e-06,
+    "trial_division": 1.3e-07,
+    "rho_split": 7.5e-07,
+    "table_build": 1.2e-07,
+    "table_step": 3.6e-07,
+    "legendre": 7.5e-09,
+}
+
+
+def _power(n: int, exponent: float) -> float:
+    """``n ** exponent`` as a float for integers of any size, saturating instead of overflowing"""
+    return math.exp(min(exponent * math.log(max(n, 2)), 700.0))
+
+
+def _l_function(n: int) -> float:
+    """``L(n) = exp(sqrt(2 * ln n * ln ln n))``, the growth of index calculus"""
+    log = math.log(max(n, 3))
+    return math.exp(min(math.sqrt(2 * log * math.log(log)), 700.0))
+
+
+def _cpu_count() -> int:
+    """CPUs this process may run on"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _spawn(units: dict, workers: int) -> float:
+    return units["spawn"] * workers if workers > 1 else 0.0
+
+
+# problem to algorithm to (seconds(units, n, workers), bytes(units, n, workers) or None, parallel, largest n)
+_MODELS = {
+    "dlog": {
+        "mov_attack": (lambda u, n, w: u["scan"] * _power(n, 2), None, False, None),
+        "brute_force": (
+            lambda u, n, w: u["spawn"] * w + u["brute_force"] * n * n.bit_length() / w,
+            None,
+            True,
+            _BRUTE_FORCE_LIMIT,
+        ),
+        "baby_step": (
+            lambda u, n, w: u["baby_step"] * _power(n, 0.5),
+            lambda u, n, w: u["baby_step_bytes"] * _power(n, 0.5),
+            False,
+            None,
+        ),
+        "pollard_rho": (
+            lambda u, n, w: _spawn(u, w) + u["pollard_rho"] * _power(n, 0.5) / w,
+            None,
+            True,
+            None,
+        ),
+        "index_calculus": (
+            lambda u, n, w: _spawn(u, w) + u["index_calculus"] * _l_function(n) / w,
+            None,
+            True,
+            None,
+        ),
+    },
+    "factor": {
+        "trial_division": (lambda u, n, w: u["trial_division"] * _power(n, 0.5), None, False, None),
+        "pollard_rho": (lambda u, n, w: u["rho_split"] * _power(n, 0.25), None, False, None),
+    },
+    "count_points": {
+        # every worker builds its own table of squares
+        "table": (
+            lambda u, n, w: _spawn(u, w) + u["table_build"] * n + u["table_step"] * n / w,
+            lambda u, n, w: n * w,
+            True,
+            _TABLE_LIMIT,
+        ),
+        "legendre": (
+            lambda u, n, w: _spawn(u, w) + u["legendre"] * n * n.bit_length() ** 2 / w,
+            None,
+            True,
+            None,
+        ),
+    },
+}
+
+
+def _default_path() -> str:
+    if os.environ.get("MATHCRYPTO_PROFILE"):
+        return os.environ["MATHCRYPTO_PROFILE"]
+    cache = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache, "mathcrypto", "profile.json")
+
+
+def _available_memory() -> int or None:
+    """Free physical memory in bytes, None where the system does not tell"""
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def _machine() -> dict:
+    return {
+        "cpus": _cpu_count(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "backend": backend.get_backend().name,
+    }
+
+
+def _fastest(function, repeat: int) -> float:
+    """Shortest of ``repeat`` timings of ``function()``"""
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+class Profile:
+    """Costs of the algorithms on one machine
+
+    The cost of an algorithm is the cost of one unit of its work times the number of units
+    for the input size: candidates for brute force, ``sqrt(n)`` steps for baby-step giant-step
+    and Pollard's rho, ``L(n)`` for index calculus, ``n^(1/4)`` for the rho factorization,
+    one unit per x for point counting, plus the start of the worker processes.
+
+    Args:
+        units (dict, optional): Seconds per unit of work of every algorithm, missing ones take the defaults
+        machine (dict, optional): Description of the machine the units were measured on
+    """
+
+    _default = None
+
+    def __init__(self, units: dict = None, machine: dict = None):
+        self.units = {**_DEFAULT_UNITS, **(units or {})}
+        self.machine = machine or _machine()
+
+    def __repr__(self):
+        return f'<Profile cpus="{self.machine.get("cpus")}" backend="{self.machine.get("backend")}">'
+
+    def estimate(self, problem: str, algorithm: str, size: int, workers: int = 1) -> float:
+        """Predicted seconds of ``algorithm`` on an input of ``size``
+
+        Args:
+            problem (str): ``"dlog"``, ``"factor"`` or ``"count_points"``
+            algorithm (str): Name of the algorithm, see :meth:`rank`
+            size (int): The prime of a discrete logarithm, the number to factor or the field of a curve
+            workers (int, optional): Number of worker processes. Defaults to 1.
+
+        Returns:
+            float: Seconds, ``inf`` if the algorithm cannot handle the input
+        """
+        seconds, _, parallel, limit = _MODELS[problem][algorithm]
+        if (limit is not None and size >= limit) or (workers > 1 and not parallel):
+            return math.inf
+        return seconds(self.units, size, workers)
+
+    def rank(self, problem: str, size: int, max_workers: int = None, memory: int = None) -> list:
+        """Every feasible algorithm with its best number of workers, the fastest first
+
+        Args:
+            problem (str): ``"dlog"``, ``"factor"`` or ``"count_points"``
+            size (int): The prime of a discrete logarithm, the number to factor or the field of a curve
+            max_workers (int, optional): Most worker processes. Defaults to the number of CPUs.
+            memory (int, optional): Bytes the tables may take. Defaults to half of the free memory.
+
+        Raises:
+            ValueError: If the problem is unknown
+
+        Returns:
+            list: ``(seconds, algorithm, workers)`` tuples in ascending time
+        """
+        if problem not in _MODELS:
+            raise ValueError(f"Unknown problem {problem}, choose one of {list(_MODELS)}.")
+        max_workers = max(1, max_workers or _cpu_count())
+        if memory is None:
+            available = _available_memory()
+            memory = available * _MEMORY_SHARE if available is not None else math.inf
+        # powers of two and the maximum itself
+        counts = sorted({1 << k for k in range(max_workers.bit_length())} | {max_workers})
+
+        ranking = []
+        for algorithm, (_, needed, parallel, _) in _MODELS[problem].items():
+            options = []
+            for workers in counts if parallel else (1,):
+                if needed is not None and needed(self.units, size, workers) > memory:
+                    continue
+                seconds = self.estimate(problem, algorithm, size, workers)
+                if seconds < math.inf:
+                    options.append((seconds, algorithm, workers))
+            if options:
+                ranking.append(min(options))
+        return sorted(ranking)
+
+    def crossovers(
+        self, problem: str, max_bits: int = 128, max_workers: int = None, memory: int = None
+    ) -> list:
+        """Input sizes at which the planned algorithm or number of workers changes
+
+        Returns:
+            list: ``(bits, algorithm, workers)`` for the smallest size of every new plan, from 2 bits on
+        """
+        changes = []
+        for bits in range(2, max_bits + 1):
+            ranking = self.rank(problem, 1 << (bits - 1), max_workers, memory)
+            if ranking and (not changes or changes[-1][1:] != ranking[0][1:]):
+                changes.append((bits, *ranking[0][1:]))
+        return changes
+
+    def to_dict(self) -> dict:
+        return {"version": _PROFILE_VERSION, "machine": self.machine, "units": self.units}
+
+    def save(self, path: str = None) -> str:
+        """Writes the profile as JSON
+
+        Args:
+            path (str, optional): File to write. Defaults to ``MATHCRYPTO_PROFILE`` \
+                or ``$XDG_CACHE_HOME/mathcrypto/profile.json``.
+
+        Returns:
+            str: The path written
+        """
+        path = path or _default_path()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w") as file:
+            json.dump(self.to_dict(), file, indent=2)
+        os.replace(temporary, path)
+        return path
+
+    @classmethod
+    def load(cls, path: str = None):
+        """Reads a profile written by :meth:`save`
+
+        Args:
+            path (str, optional): File to read. Defaults to the path of :meth:`save`.
+
+        Raises:
+            FileNotFoundError: If there is no profile
+            ValueError: If the file is not a profile of this version
+
+        Returns:
+            Profile: The profile
+        """
+        with open(path or _default_path()) as file:
+            data = json.load(file)
+        if not isinstance(data, dict) or data.get("version") != _PROFILE_VERSION:
+            raise ValueError("The file is not a mathcrypto profile of a supported version.")
+        return cls(data["units"], data["machine"])
+
+    @classmethod
+    def default(cls):
+        """The stored profile of this machine if there is one, else the defaults. Read once per process.
+
+        Returns:
+            Profile: The profile used when none is passed to :class:`Dispatcher`
+        """
+        if cls._default is None:
+            try:
+                cls._default = cls.load()
+            except (FileNotFoundError, ValueError):
+                cls._default = cls()
+        return cls._default
+
+    @classmethod
+    def calibrate(cls, repeat: int = 3):
+        """Measures the cost of a unit of work of every algorithm on small instances, in a few seconds
+
+        Args:
+            repeat (int, optional): Runs of every measurement, the fastest counts. Defaults to 3.
+
+        Returns:
+            Profile: The measured profile, see :meth:`save`
+        """
+        units = {}
+        with instrumentation.span("calibrate"):
+            with ProcessPoolExecutor(max_workers=2) as executor:
+                # the first map starts the processes
+                units["spawn"] = _fastest(lambda: list(executor.map(int, range(2))), 1) / 2
+
+            prime = 1009
+            units["scan"] = _fastest(lambda: DHCracker.mov_attack(0, 11, prime - 1), repeat) / prime ** 2
+
+            prime = _BRUTE_FORCE_LIMIT - 1
+            key = multiprocessing.Value("i", -1)
+            candidates = 20000
+            task = (prime, 3, 0, 0)
+            seconds = _fastest(lambda: DHCracker._cracker(task, range(1, candidates + 1), key), repeat)
+            units["brute_force"] = seconds / (candidates * prime.bit_length())
+
+            prime = backend.next_prime(1 << 32)
+            crack_me = DHCryptosystem(prime=prime, generator=3, alice_sends=0, bob_sends=0)
+            units["baby_step"] = _fastest(lambda: DHCracker.baby_step(crack_me), repeat) / math.isqrt(prime)
+            tracemalloc.start()
+            try:
+                DHCracker._baby_step_table(prime, 3, 1 << 14)
+                units["baby_step_bytes"] = tracemalloc.get_traced_memory()[1] / (1 << 14)
+            finally:
+                tracemalloc.stop()
+
+            rng = SeededRNG(32)
+            prime = Primes.get_safe_prime(32, rng=rng)
+            factors = [2, (prime - 1) // 2]
+            generator = MultiplicativeGroup.find_primitive_root(prime, factors=factors)
+            targets = [backend.powmod(generator, rng.randrange(1, prime - 1), prime) for _ in range(repeat)]
+            start = time.perf_counter()
+            for seed, target in enumerate(targets):
+                PollardRho.discrete_log(prime, generator, target, rng=SeededRNG(seed))
+            units["pollard_rho"] = (time.perf_counter() - start) / repeat / math.isqrt(prime)
+            target = targets[0]
+            seconds = _fastest(
+                lambda: IndexCalculus.discrete_log(prime, generator, target, order_factors=factors, rng=rng),
+                1,
+            )
+            units["index_calculus"] = seconds / _l_function(prime)
+
+            small = backend.next_prime(1 << 16)
+            semiprime = small * backend.next_prime(small)
+            seconds = _fastest(lambda: Primes.factorize(semiprime), repeat)
+            units["trial_division"] = seconds / math.isqrt(semiprime)
+            semiprimes = [backend.next_prime(rng.getrandbits(24) | 1 << 23) for _ in range(2 * repeat)]
+            semiprimes = [a * b for a, b in zip(semiprimes[::2], semiprimes[1::2])]
+            start = time.perf_counter()
+            for semiprime in semiprimes:
+                _rho_split(semiprime, rng)
+            units["rho_split"] = (time.perf_counter() - start) / repeat / _power(semiprimes[0], 0.25)
+
+            field = backend.next_prime(1 << 18)
+            _points_per_value.cache_clear()
+            units["table_build"] = _fastest(lambda: _points_per_value(field), 1) / field
+            seconds = _fastest(lambda: _count_range(field, 2, 3, 5, 0, field, True), repeat)
+            units["table_step"] = seconds / field
+            _points_per_value.cache_clear()
+            field = backend.next_prime(1 << 13)
+            seconds = _fastest(lambda: _count_range(field, 2, 3, 5, 0, field, False), repeat)
+            units["legendre"] = seconds / (field * field.bit_length() ** 2)
+
+        machine = _machine()
+        machine["calibrated"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+        return cls(units, machine)
+
+
+class Dispatcher:
+    """Solves problems with the algorithm the :class:`Profile` predicts to be the fastest
+
+    Every method takes ``profile`` (defaults to :meth:`Profile.default`), ``max_workers``
+    (defaults to the number of CPUs) and ``memory``, the bytes the tables may take
+    (defaults to half of the free memory). With instrumentation on, the choices are counted
+    as ``dispatch.<problem>.<algorithm>``.
+    """
+
+    @classmethod
+    def plan(
+        cls, problem: str, size: int, profile: Profile = None, max_workers: int = None, memory: int = None
+    ) -> tuple:
+        """The algorithm and number of workers that would be used
+
+        Args:
+            problem (str): ``"dlog"``, ``"factor"`` or ``"count_points"``
+            size (int): The prime of a discrete logarithm, the number to factor or the field of a curve
+
+        Returns:
+            tuple: ``(algorithm, workers)``
+        """
+        profile = profile or Profile.default()
+        _, algorithm, workers = profile.rank(problem, size, max_workers, memory)[0]
+        return algorithm, workers
+
+    @classmethod
+    def _chosen(cls, problem: str, algorithm: str):
+        if instrumentation.ENABLED:
+            instrumentation.count(f"dispatch.{problem}.{algorithm}")
+
+    @classmethod
+    def solve_dlog(
+        cls, crack_me, profile: Profile = None, max_workers: int = None, memory: int = None, rng=None
+    ) -> int or None:
+        """Calculates the key of a DHCryptosystem from its public values
+
+        Chooses between :meth:`DHCracker.mov_attack` (an in-process scan), :meth:`DHCracker.brute_force`,
+        :meth:`DHCracker.baby_step`, :meth:`DHCracker.pollard_rho` and :meth:`DHCracker.index_calculus`.
+        Index calculus is only used when the generator is a primitive root, which costs a factorization
+        of ``prime - 1`` with :meth:`factor`.
+
+        Args:
+            crack_me (DHCryptosystem): Object containing the publicly known values of the cryptosystem
+            rng (SeededRNG or SystemRNG, optional): Random source of the randomised algorithms
+
+        Returns:
+            int or None: The key, None if the exhaustive searches did not find it
+        """
+        profile = profile or Profile.default()
+        prime = crack_me.prime
+        for _, algorithm, workers in profile.rank("dlog", prime, max_workers, memory):
+            factors = None
+            if algorithm == "index_calculus":
+                factors = cls.factor(prime - 1, profile)
+                if not MultiplicativeGroup.is_primitive_root(crack_me.generator, prime, factors=set(factors)):
+                    continue
+            cls._chosen("dlog", algorithm)
+            with instrumentation.span("dispatch.dlog"):
+                return cls._solve_dlog(algorithm, crack_me, workers, factors, rng)
+        raise ValueError("No algorithm fits the memory for this prime.")
+
+    @classmethod
+    def _solve_dlog(cls, algorithm: str, crack_me, workers: int, factors: list, rng) -> int or None:
+        if algorithm == "mov_attack":
+            secret = DHCracker.mov_attack(crack_me.alice_sends, crack_me.generator, crack_me.prime - 1)
+            return backend.powmod(crack_me.bob_sends, secret, crack_me.prime) if secret is not None else None
+        if algorithm == "brute_force":
+            return DHCracker.brute_force(crack_me, workers)
+        if algorithm == "baby_step":
+            return DHCracker.baby_step(crack_me)
+        if algorithm == "pollard_rho":
+            return DHCracker.pollard_rho(crack_me, num_workers=workers, rng=rng)
+        return DHCracker.index_calculus(crack_me, num_workers=workers, order_factors=factors, rng=rng)
+
+    @classmethod
+    def factor(cls, num: int, profile: Profile = None, rng=None) -> list:
+        """Prime factors with duplicates in ascending order, like :meth:`Primes.factorize`
+
+        Primes below 1024 are divided out first. Every composite cofactor is then split by trial division
+        or by Pollard's rho, whichever the profile predicts to be faster for its size.
+
+        Args:
+            num (int): Number to factorize
+            rng (SeededRNG or SystemRNG, optional): Random source of Pollard's rho
+
+        Returns:
+            list: List of factors including duplicates
+        """
+        if num < 4:
+            return Primes.factorize(num)
+        profile = profile or Profile.default()
+        rng = get_rng(rng)
+        remaining = num
+        factors = []
+        for prime in _SMALL_PRIMES:
+            if prime * prime > remaining:
+                break
+            while remaining % prime == 0:
+                factors.append(prime)
+                remaining //= prime
+        cofactors = [remaining]
+        while cofactors:
+            cofactor = cofactors.pop()
+            if cofactor == 1:
+                continue
+            if Primes.is_prime(cofactor):
+                factors.append(cofactor)
+                continue
+            algorithm, _ = cls.plan("factor", cofactor, profile)
+            cls._chosen("factor", algorithm)
+            divisor = _rho_split(cofactor, rng) if algorithm == "pollard_rho" else None
+            if divisor is None:
+                factors += Primes.factorize(cofactor)
+            else:
+                cofactors += [divisor, cofactor // divisor]
+        factors.sort()
+        if verification.RATE:
+            verification.check("Primes.factorize", (num,), factors)
+        return factors
+
+    @classmethod
+    def phi(cls, num: int, profile: Profile = None, rng=None) -> int:
+        """Euler's totient from the factors found by :meth:`factor`, see :meth:`MathFunctions.phi`"""
+        totient = 1
+        previous = None
+        for factor in cls.factor(num, profile, rng) if num > 1 else ():
+            totient *= factor if factor == previous else factor - 1
+            previous = factor
+        if verification.RATE:
+            verification.check("MathFunctions.phi", (num,), totient)
+        return totient
+
+    @classmethod
+    def count_points(
+        cls,
+        field: int,
+        a4: int,
+        a5: int,
+        a6: int,
+        profile: Profile = None,
+        max_workers: int = None,
+        memory: int = None,
+    ) -> int:
+        """Order of ``y^2 = x^3 + a4*x^2 + a5*x + a6`` over an odd prime field, see :func:`count_points`
+
+        Counts with the table of squares or with Legendre symbols, in this process
+        or with the x range split over worker processes.
+
+        Returns:
+            int: Order of the curve, the point at infinity included
+        """
+        algorithm, workers = cls.plan("count_points", field, profile, max_workers, memory)
+        cls._chosen("count_points", algorithm)
+        table = algorithm == "table"
+        with instrumentation.span("dispatch.count_points"):
+            if workers == 1:
+                total = _count_range(field, a4, a5, a6, 0, field, table)
+            else:
+                bounds = [field * i // workers for i in range(workers + 1)]
+                tasks = [(field, a4, a5, a6, start, stop, table) for start, stop in zip(bounds, bounds[1:])]
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    total = sum(executor.map(_count_range, *zip(*tasks)))
+        if verification.RATE:
+            verification.check("EllipticCurve.get_curve_order", (field, a4, a5, a6), 1 + total)
+        return 1 + total
@@ -0,0 +1,313 @@
+"""Streaming export of large enumerations to ``.npy`` or raw binary files.
+
+Points of a curve, elements of a group and subgroups are written in fixed-size chunks as they
+are enumerated, so fields and moduli far above 10^7 never have their results in the Python heap.
+The files hold little-endian unsigned integers, one row per result, and numpy is not needed
+to write them. Next to every file, ``<path>.json`` describes the structure: the numpy dtype and shape,
+the byte offset of the data, the meaning of the columns and the parameters of the enumeration.
+
+Example::
+
+    Export.curve_points(curve, "points.npy", orders=True)
+
+    # later, in the analysis
+    points = numpy.load("points.npy", mmap_mode="r")
+    # or, for raw files, with the description
+    meta = json.load(open("points.bin.json"))
+    points = numpy.memmap("points.bin", meta["dtype"], "r", meta["offset"], tuple(meta["shape"]))
+"""
+import itertools
+import json
+import mmap
+import sys
+from array import array
+
+from . import backend, instrumentation
+from .cryptography.ecdh import ECDHCryptosystem, _multiply
+from .cryptography.elliptic_curves import count_points
+from .math.groups import MultiplicativeGroup, _distinct_factors
+
+_NPY_MAGIC = b"\x93NUMPY\x01\x00"
+# room for any shape, the header is rewritten in place once the number of rows is known
+_NPY_HEADER_SIZE = 128
+_FORMATS = ("npy", "raw")
+
+
+def _npy_header(dtype: str, shape: tuple) -> bytes:
+    """Version 1.0 ``.npy`` header padded to :data:`_NPY_HEADER_SIZE` bytes"""
+    shape_text = f"({shape[0]},)" if len(shape) == 1 else f"({', '.join(map(str, shape))})"
+    header = f"{{'descr': '{dtype}', 'fortran_order': False, 'shape': {shape_text}, }}"
+    padding = _NPY_HEADER_SIZE - len(_NPY_MAGIC) - 2 - len(header) - 1
+    length = (len(header) + padding + 1).to_bytes(2, "little")
+    return _NPY_MAGIC + length + header.encode() + b" " * padding + b"\n"
+
+
+def _describe(path: str, file_format: str, dtype: str, shape: tuple, columns: tuple, meta: dict) -> dict:
+    """Writes the description of an exported file to ``<path>.json``"""
+    description = {
+        "format": file_format,
+        "dtype": dtype,
+        "shape": list(shape),
+        "offset": _NPY_HEADER_SIZE if file_format == "npy" else 0,
+        "columns": list(columns),
+        **meta,
+    }
+    with open(path + ".json", "w") as file:
+        json.dump(description, file, indent=2)
+    return description
+
+
+def _powers(mod: int, element: int):
+    """Yields ``element^k`` from k = 0 until the powers repeat"""
+    power = 1 % mod
+    while True:
+        yield power
+        power = power * element % mod
+        if power == 1 % mod:
+            return
+
+
+class ArrayWriter:
+    """Writes rows of unsigned integers to a ``.npy`` or raw file chunk by chunk
+
+    Values are buffered in an ``array`` of ``chunk_size`` rows and appended to the file when it is full.
+    The ``.npy`` header gets the final shape on :meth:`close`, which also writes the description.
+
+    Args:
+        path (str): File to write
+        columns (tuple): Names of the columns, one value per column and row
+        itemsize (int, optional): Bytes per value, 1, 2, 4 or 8. Defaults to 8.
+        file_format (str, optional): ``"npy"`` or ``"raw"``. Defaults to ``"npy"``.
+        meta (dict, optional): JSON serialisable parameters added to the description
+        chunk_size (int, optional): Rows per write. Defaults to 65536.
+
+    Raises:
+        ValueError: If the format or item size is not supported
+    """
+
+    def __init__(
+        self,
+        path: str,
+        columns: tuple,
+        itemsize: int = 8,
+        file_format: str = "npy",
+        meta: dict = None,
+        chunk_size: int = 1 << 16,
+    ):
+        if file_format not in _FORMATS:
+            raise ValueError(f"Unknown format {file_format}, use one of {_FORMATS}.")
+        typecode = next((code for code in "BHILQ" if array(code).itemsize == itemsize), None)
+        if typecode is None:
+            raise ValueError(f"No unsigned type of {itemsize} bytes.")
+        self.path = path
+        self.columns = tuple(columns)
+        self.dtype = f"<u{itemsize}" if itemsize > 1 else "|u1"
+        self.file_format = file_format
+        self.meta = dict(meta or {})
+        self.description = None
+        self._flushed = 0
+        self._typecode = typecode
+        self._buffer = array(typecode)
+        self._limit = chunk_size * len(self.columns)
+        self._file = open(path, "wb")
+        self._file.write(self._header())
+
+    def __repr__(self):
+        return f'<ArrayWriter path="{self.path}" format="{self.file_format}" rows="{self.rows}">'
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def rows(self) -> int:
+        """Number of rows written so far, buffered ones included"""
+        return self._flushed + len(self._buffer) // len(self.columns)
+
+    def _shape(self) -> tuple:
+        return (self.rows,) if len(self.columns) == 1 else (self.rows, len(self.columns))
+
+    def _header(self) -> bytes:
+        return _npy_header(self.dtype, self._shape()) if self.file_format == "npy" else b""
+
+    def write(self, values):
+        """Appends values, row after row. Iterators are consumed one chunk at a time.
+
+        Args:
+            values (iterable of int): Values of whole rows, ``len(columns)`` per row
+        """
+        values = iter(values)
+        while True:
+            self._buffer.extend(itertools.islice(values, self._limit - len(self._buffer)))
+            if len(self._buffer) < self._limit:
+                return
+            self._flush()
+
+    def _flush(self):
+        if len(self._buffer) % len(self.columns):
+            raise ValueError("The values written do not form whole rows.")
+        rows = self.rows
+        if sys.byteorder == "big":
+            self._buffer.byteswap()
+        self._buffer.tofile(self._file)
+        self._flushed = rows
+        self._buffer = array(self._typecode)
+
+    def close(self) -> dict:
+        """Writes the remaining rows, the final header and the description to ``<path>.json``
+
+        Returns:
+            dict: The description
+        """
+        if self.description is not None:
+            return self.description
+        try:
+            self._flush()
+            self._file.seek(0)
+            self._file.write(self._header())
+        finally:
+            self._file.close()
+        self.description = _describe(
+            self.path, self.file_format, self.dtype, self._shape(), self.columns, self.meta
+        )
+        return self.description
+
+
+class Export:
+    """Streams enumerations of the library into files, see :mod:`mathcrypto.export`"""
+
+    @classmethod
+    def curve_points(
+        cls, curve, path: str, orders: bool = False, file_format: str = "npy", chunk_size: int = 1 << 16
+    ) -> dict:
+        """Writes the points of a curve, see :meth:`EllipticCurve.iter_points`
+
+        Rows are ``(x, y)``, or ``(x, y, order)`` with ``orders``. Coordinates are reduced modulo the field
+        and the point at infinity is the last row, stored as ``(field, 0)`` with order 1.
+        Orders are found from the factorisation of the curve order with scalar multiplications,
+        a few dozen per point, instead of adding the point to itself like
+        :meth:`EllipticCurve.get_point_order`.
+
+        Args:
+            curve (EllipticCurve): Curve ``y^2 = x^3 + a4*x^2 + a5*x + a6`` over an odd prime field
+            path (str): File to write
+            orders (bool, optional): Whether to add the order of every point. Defaults to False.
+            file_format (str, optional): ``"npy"`` or ``"raw"``. Defaults to ``"npy"``.
+            chunk_size (int, optional): Rows per write. Defaults to 65536.
+
+        Raises:
+            ValueError: If the curve is not supported
+
+        Returns:
+            dict: The description written to ``<path>.json``
+        """
+        field = curve.field
+        points = curve.iter_points()
+        meta = {"kind": "curve_points", "field": field, "attributes": curve.attributes}
+        meta["infinity"] = [field, 0]
+        columns = ("x", "y")
+        largest = field
+        if orders:
+            order = count_points(field, *curve.attributes[4:])
+            meta["curve_order"] = order
+            columns = ("x", "y", "order")
+            points = cls._with_orders(curve, points, order)
+            # by Hasse's bound the curve order can reach field + 1 + 2 * sqrt(field)
+            largest = max(field, order)
+        itemsize = 4 if largest < 1 << 32 else 8
+        infinity = (field, 0, 1) if orders else (field, 0)
+        with instrumentation.span("export_curve_points"):
+            with ArrayWriter(path, columns, itemsize, file_format, meta, chunk_size) as writer:
+                for point in points:
+                    writer.write(infinity if point == "[∞,∞]" else point)
+            return writer.description
+
+    @classmethod
+    def _with_orders(cls, curve, points, curve_order: int):
+        """Adds the order of every point, the curve order divided by its primes while the multiple vanishes"""
+        p, a, shift = ECDHCryptosystem(curve=curve)._short_form
+        factors = _distinct_factors(curve_order)
+        for point in points:
+            if point == "[∞,∞]":
+                yield point
+                continue
+            short = ((point[0] + shift) % p, point[1])
+            order = curve_order
+            for q in factors:
+                while order % q == 0 and _multiply(short, order // q, a, p, 2) is None:
+                    order //= q
+            yield (*point, order)
+
+    @classmethod
+    def group_elements(cls, mod: int, path: str, file_format: str = "npy") -> dict:
+        """Writes the elements of the multiplicative group modulo ``mod`` in ascending order
+
+        See :meth:`MultiplicativeGroup.element_chunks`, the group itself is never built.
+
+        Args:
+            mod (int): Modulus of the group
+            path (str): File to write
+            file_format (str, optional): ``"npy"`` or ``"raw"``. Defaults to ``"npy"``.
+
+        Returns:
+            dict: The description written to ``<path>.json``
+        """
+        meta = {"kind": "group_elements", "mod": mod}
+        with instrumentation.span("export_group_elements"):
+            with ArrayWriter(path, ("element",), 4 if mod <= 1 << 32 else 8, file_format, meta) as writer:
+                for chunk in MultiplicativeGroup.element_chunks(mod):
+                    writer.write(chunk)
+            return writer.description
+
+    @classmethod
+    def subgroup(
+        cls, mod: int, element: int, path: str, membership: bool = False, file_format: str = "npy"
+    ) -> dict:
+        """Writes the subgroup generated by ``element`` modulo ``mod``
+
+        By default the rows are the powers ``element^k`` for k from 0 to the order minus one, in that order,
+        so row k is the antilogarithm of k. With ``membership``, the file has one byte for every number
+        in ``[0, mod)``, 1 for members of the subgroup, written through a memory map of the file.
+
+        Args:
+            mod (int): Modulus
+            element (int): Element coprime to ``mod``
+            path (str): File to write
+            membership (bool, optional): Whether to write membership flags instead of powers. \
+                Defaults to False.
+            file_format (str, optional): ``"npy"`` or ``"raw"``. Defaults to ``"npy"``.
+
+        Raises:
+            ValueError: If ``element`` is not coprime to ``mod``
+
+        Returns:
+            dict: The description written to ``<path>.json``, with the order of ``element``
+        """
+        element %= mod
+        if mod < 2 or backend.gcd(element, mod) != 1:
+            raise ValueError(f"{element} is not an element of the group modulo {mod}.")
+        meta = {"kind": "subgroup_membership" if membership else "subgroup", "mod": mod, "element": element}
+        with instrumentation.span("export_subgroup"):
+            if membership:
+                return cls._membership(mod, element, path, file_format, meta)
+            with ArrayWriter(path, ("power",), 4 if mod <= 1 << 32 else 8, file_format, meta) as writer:
+                writer.write(_powers(mod, element))
+                writer.meta["order"] = writer.rows
+            return writer.description
+
+    @classmethod
+    def _membership(cls, mod: int, element: int, path: str, file_format: str, meta: dict) -> dict:
+        """Flags the powers of ``element`` in a file of ``mod`` bytes mapped into memory"""
+        offset = _NPY_HEADER_SIZE if file_format == "npy" else 0
+        with open(path, "w+b") as file:
+            if file_format == "npy":
+                file.write(_npy_header("|u1", (mod,)))
+            file.truncate(offset + mod)
+            with mmap.mmap(file.fileno(), offset + mod) as flags:
+                order = 0
+                for power in _powers(mod, element):
+                    flags[offset + power] = 1
+                    order += 1
+        return _describe(path, file_format, "|u1", (mod,), ("member",), {**meta, "order": order})
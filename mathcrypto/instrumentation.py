@@ -0,0 +1,176 @@
+"""Opt-in operation counters and timing spans.
+
+Instrumentation is off by default. The library only checks the module level ``ENABLED`` flag
+at the entry points of its algorithms, so with instrumentation off nothing is counted or timed.
+
+Example::
+
+    from mathcrypto import instrumentation
+
+    with instrumentation.collect() as stats:
+        Primes.get_prime(256)
+    stats["counters"]["modexp"]
+
+Counter names used by the library:
+
+    - ``modexp``: modular exponentiations
+    - ``gcd``: greatest common divisor computations
+    - ``inversion``: modular inversions
+    - ``crt`` / ``phi``: Chinese remainder theorem and Euler's totient computations
+    - ``primality_test``: Miller-Rabin and Fermat primality tests
+    - ``primality_rounds``: rounds of the Fermat test
+    - ``certificate.verify``: primality certificate checks
+    - ``factorize.<tier>``: factorizations finished by the given tier
+    - ``product_tree.multiplications`` / ``remainder_tree.reductions``: product and remainder tree nodes
+    - ``bsgs.table_size`` / ``bsgs.giant_steps``: baby-step giant-step table entries and giant steps
+    - ``rho.distinguished_points`` / ``rho.collisions``: parallel Pollard's rho progress
+    - ``point_counting``: elliptic curve point counts
+    - ``ecdh.fixed_base_multiplications``: ECDH key pairs made from a fixed-base table
+    - ``curve_search.skipped``: curve candidates rejected before their points were counted
+    - ``dispatch.<problem>.<algorithm>``: algorithms chosen by the dispatcher
+    - ``verify.checked`` / ``verify.mismatch``: results re-checked by the verification hooks
+    - ``<cache>.cache_hit`` / ``<cache>.cache_miss``: lookups in the library's caches
+"""
+import time
+from contextlib import contextmanager
+
+ENABLED = False
+
+_counters = {}
+_spans = {}
+_callbacks = []
+
+
+def enable():
+    """Turns the instrumentation on"""
+    global ENABLED
+    ENABLED = True
+
+
+def disable():
+    """Turns the instrumentation off. Collected values are kept until :func:`reset`."""
+    global ENABLED
+    ENABLED = False
+
+
+def reset():
+    """Clears all collected counters and spans"""
+    _counters.clear()
+    _spans.clear()
+
+
+def count(name: str, amount: int = 1):
+    """Increments a counter. Callers check ``ENABLED`` first.
+
+    Args:
+        name (str): Name of the counter
+        amount (int, optional): Value to add to the counter. Defaults to 1.
+    """
+    _counters[name] = _counters.get(name, 0) + amount
+    for callback in _callbacks:
+        callback("count", name, amount)
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+        calls, seconds = _spans.get(self.name, (0, 0.0))
+        _spans[self.name] = (calls + 1, seconds + elapsed)
+        for callback in _callbacks:
+            callback("span", self.name, elapsed)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name: str):
+    """Times a block of code
+
+    Args:
+        name (str): Name of the span. Time of all blocks with the same name is summed up.
+
+    Returns:
+        context manager: Measures the block if instrumentation is enabled, does nothing otherwise
+    """
+    if not ENABLED:
+        return _NULL_SPAN
+    return _Span(name)
+
+
+def snapshot() -> dict:
+    """Exports the collected values
+
+    Returns:
+        dict: ``{"counters": {name: count}, "spans": {name: {"calls": int, "seconds": float}}}``
+    """
+    return {
+        "counters": dict(_counters),
+        "spans": {name: {"calls": calls, "seconds": seconds} for name, (calls, seconds) in _spans.items()},
+    }
+
+
+def add_callback(callback):
+    """Registers a function called on every recorded event
+
+    Args:
+        callback (callable): Called as ``callback(kind, name, value)`` where ``kind`` is ``"count"`` \
+            or ``"span"`` and ``value`` is the increment or the elapsed seconds.
+    """
+    _callbacks.append(callback)
+
+
+def remove_callback(callback):
+    """Unregisters a function registered with :func:`add_callback`"""
+    _callbacks.remove(callback)
+
+
+@contextmanager
+def collect():
+    """Enables instrumentation for a block and collects what happened in it
+
+    Yields:
+        dict: Empty dict filled with the :func:`snapshot` of the block only when the block exits
+    """
+    was_enabled = ENABLED
+    before = snapshot()
+    enable()
+    stats = {}
+    try:
+        yield stats
+    finally:
+        if not was_enabled:
+            disable()
+        after = snapshot()
+        stats["counters"] = {
+            name: value - before["counters"].get(name, 0)
+            for name, value in after["counters"].items()
+            if value != before["counters"].get(name, 0)
+        }
+        stats["spans"] = {}
+        for name, value in after["spans"].items():
+            previous = before["spans"].get(name, {"calls": 0, "seconds": 0.0})
+            if value["calls"] != previous["calls"]:
+                stats["spans"][name] = {
+                    "calls": value["calls"] - previous["calls"],
+                    "seconds": value["seconds"] - previous["seconds"],
+                }
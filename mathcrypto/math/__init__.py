@@ -1,2 +1,4 @@
 from .funcs import MathFunctions  # noqa: F401
 from .groups import MultiplicativeGroup  # noqa: F401
+from .fields import GF, ExtensionField, PrimeField  # noqa: F401
+from .trees import ProductTree  # noqa: F401
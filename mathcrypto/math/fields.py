@@ -0,0 +1,635 @@
+import functools
+from itertools import zip_longest
+
+from .. import backend, instrumentation
+from ..cryptography.primes import Primes
+
+
+def _trim(coefficients: list) -> list:
+    """Removes the zero coefficients of the highest powers"""
+    while coefficients and coefficients[-1] == 0:
+        coefficients.pop()
+    return coefficients
+
+
+def _poly_mod(dividend: list, divisor: list, p: int) -> list:
+    """Remainder of polynomials over GF(p), coefficients from the lowest power"""
+    remainder = list(dividend)
+    inverse = backend.invert(divisor[-1], p)
+    degree = len(divisor) - 1
+    for shift in range(len(remainder) - 1 - degree, -1, -1):
+        factor = remainder[shift + degree] * inverse % p
+        if factor:
+            for i, coefficient in enumerate(divisor):
+                remainder[shift + i] = (remainder[shift + i] - factor * coefficient) % p
+    return _trim(remainder[:degree])
+
+
+def _poly_mul(a: list, b: list, p: int) -> list:
+    """Product of polynomials over GF(p)"""
+    if not a or not b:
+        return []
+    product = [0] * (len(a) + len(b) - 1)
+    for i, x in enumerate(a):
+        if x:
+            for j, y in enumerate(b):
+                product[i + j] += x * y
+    return _trim([coefficient % p for coefficient in product])
+
+
+def _poly_pow_mod(base: list, exponent: int, modulus: list, p: int) -> list:
+    """``base^exponent`` modulo ``modulus`` over GF(p)"""
+    result = [1]
+    base = _poly_mod(base, modulus, p)
+    while exponent:
+        if exponent & 1:
+            result = _poly_mod(_poly_mul(result, base, p), modulus, p)
+        base = _poly_mod(_poly_mul(base, base, p), modulus, p)
+        exponent >>= 1
+    return result
+
+
+def _poly_gcd(a: list, b: list, p: int) -> list:
+    """Monic greatest common divisor of polynomials over GF(p)"""
+    a, b = _trim(list(a)), _trim(list(b))
+    while b:
+        a, b = b, _poly_mod(a, b, p)
+    if not a:
+        return a
+    inverse = backend.invert(a[-1], p)
+    return [coefficient * inverse % p for coefficient in a]
+
+
+class PrimeField:
+    """The finite field GF(p) of integers modulo a prime
+
+    Arithmetic on plain ints goes through the methods of the field, which reduce every intermediate
+    result and cache inverses. Calling the field wraps an int into a :class:`FieldElement`
+    with the usual operators. The ``batch_*`` methods work on whole sequences of ints,
+    :meth:`batch_inverse` needs a single modular inversion for the whole sequence.
+
+    Fields are usually created through :func:`GF`, which returns the same object for the same prime,
+    so the cache of inverses is shared.
+
+    Args:
+        p (int): Prime modulus
+        cache_size (int, optional): Maximum number of cached inverses. Defaults to 4096.
+    """
+
+    __slots__ = ("p", "cache_size", "_inverses")
+
+    degree = 1
+
+    def __init__(self, p: int, cache_size: int = 4096):
+        self.p = p
+        self.cache_size = cache_size
+        self._inverses = {}
+
+    def __repr__(self):
+        return f'<PrimeField p="{self.p}">'
+
+    def __reduce__(self):
+        return PrimeField, (self.p, self.cache_size)
+
+    def __eq__(self, other):
+        return isinstance(other, PrimeField) and other.p == self.p
+
+    def __hash__(self):
+        return hash(("PrimeField", self.p))
+
+    def __call__(self, value) -> "FieldElement":
+        if isinstance(value, FieldElement):
+            value = value.value
+        return FieldElement(self, value % self.p)
+
+    def __iter__(self):
+        for value in range(self.p):
+            yield FieldElement(self, value)
+
+    @property
+    def order(self) -> int:
+        """Number of elements of the field"""
+        return self.p
+
+    @property
+    def characteristic(self) -> int:
+        """Characteristic of the field"""
+        return self.p
+
+    def inverse(self, value: int) -> int:
+        """Multiplicative inverse of ``value``, cached
+
+        Raises:
+            ZeroDivisionError: If ``value`` is zero in the field
+        """
+        value %= self.p
+        inverse = self._inverses.get(value)
+        if inverse is None:
+            if value == 0:
+                raise ZeroDivisionError(f"0 has no inverse in GF({self.p}).")
+            if instrumentation.ENABLED:
+                instrumentation.count("inversion")
+            inverse = backend.invert(value, self.p)
+            if len(self._inverses) >= self.cache_size:
+                self._inverses.clear()
+            self._inverses[value] = inverse
+        return inverse
+
+    def legendre(self, value: int) -> int:
+        """Legendre symbol of ``value``: 1 for non-zero squares, -1 for non-squares, 0 for zero"""
+        value %= self.p
+        if value == 0:
+            return 0
+        if self.p == 2:
+            return 1
+        return 1 if backend.powmod(value, (self.p - 1) >> 1, self.p) == 1 else -1
+
+    def sqrt(self, value: int) -> int or None:
+        """Smaller square root of ``value`` using the Tonelli-Shanks algorithm
+
+        Returns:
+            int or None: The root r with ``r <= p - r``, None if ``value`` is not a square
+        """
+        p = self.p
+        value %= p
+        if value == 0 or p == 2:
+            return value
+        if self.legendre(value) != 1:
+            return None
+        if p % 4 == 3:
+            root = backend.powmod(value, (p + 1) >> 2, p)
+        else:
+            q, s = p - 1, 0
+            while q % 2 == 0:
+                q >>= 1
+                s += 1
+            z = 2
+            while self.legendre(z) != -1:
+                z += 1
+            m, c = s, backend.powmod(z, q, p)
+            t, root = backend.powmod(value, q, p), backend.powmod(value, (q + 1) >> 1, p)
+            while t != 1:
+                i, t_power = 0, t
+                while t_power != 1:
+                    t_power = t_power * t_power % p
+                    i += 1
+                    if i == m:
+                        return None
+                b = backend.powmod(c, 1 << (m - i - 1), p)
+                m, c, t, root = i, b * b % p, t * b * b % p, root * b % p
+        if root * root % p != value:
+            return None
+        return min(root, p - root)
+
+    def has_root(self, polynomial) -> bool:
+        """Whether a polynomial has a root in the field, that is ``gcd(x^p - x, polynomial) != 1``
+
+        Args:
+            polynomial (sequence of int): Coefficients, lowest power first
+
+        Returns:
+            bool: True if some x of the field is a root
+        """
+        polynomial = _trim([coefficient % self.p for coefficient in polynomial])
+        if len(polynomial) < 2:
+            return not polynomial
+        power = _poly_pow_mod([0, 1], self.p, polynomial, self.p)
+        difference = _trim([(a - b) % self.p for a, b in zip_longest(power, [0, 1], fillvalue=0)])
+        return len(_poly_gcd(difference, polynomial, self.p)) > 1
+
+    def batch_inverse(self, values) -> list:
+        """Inverses of all ``values`` with Montgomery's trick, one inversion and 3 multiplications each
+
+        Raises:
+            ZeroDivisionError: If any value is zero in the field
+        """
+        p = self.p
+        values = [value % p for value in values]
+        prefix = []
+        product = 1
+        for value in values:
+            prefix.append(product)
+            product = product * value % p
+        inverse = self.inverse(product)
+        inverses = [0] * len(values)
+        for index in range(len(values) - 1, -1, -1):
+            inverses[index] = inverse * prefix[index] % p
+            inverse = inverse * values[index] % p
+        return inverses
+
+    def batch_add(self, a, b) -> list:
+        """Element-wise sums of two sequences"""
+        p = self.p
+        return [(x + y) % p for x, y in zip(a, b)]
+
+    def batch_multiply(self, a, b) -> list:
+        """Element-wise products of two sequences"""
+        p = self.p
+        return [x * y % p for x, y in zip(a, b)]
+
+    def batch_pow(self, values, exponent: int) -> list:
+        """Every value raised to ``exponent``"""
+        p = self.p
+        return [backend.powmod(value, exponent, p) for value in values]
+
+    def batch_legendre(self, values) -> list:
+        """Legendre symbols of all ``values``"""
+        return [self.legendre(value) for value in values]
+
+
+class FieldElement:
+    """Element of a :class:`PrimeField`
+
+    Operators accept other elements of the same field and plain ints.
+
+    Attributes:
+        field (PrimeField): Field of the element
+        value (int): Representative in ``[0, p)``
+    """
+
+    __slots__ = ("field", "value")
+
+    def __init__(self, field: PrimeField, value: int):
+        self.field = field
+        self.value = value
+
+    def __repr__(self):
+        return f'<FieldElement value="{self.value}" p="{self.field.p}">'
+
+    def __reduce__(self):
+        return FieldElement, (self.field, self.value)
+
+    def __int__(self):
+        return self.value
+
+    def __index__(self):
+        return self.value
+
+    def __bool__(self):
+        return self.value != 0
+
+    def __hash__(self):
+        return hash(self.value)
+
+    def __eq__(self, other):
+        if isinstance(other, FieldElement):
+            return self.value == other.value and self.field.p == other.field.p
+        if isinstance(other, int):
+            return self.value == other % self.field.p
+        return NotImplemented
+
+    def _value(self, other) -> int:
+        if isinstance(other, FieldElement):
+            if other.field.p != self.field.p:
+                raise ValueError("The elements belong to different fields.")
+            return other.value
+        if isinstance(other, int):
+            return other
+        return NotImplemented
+
+    def __add__(self, other):
+        other = self._value(other)
+        if other is NotImplemented:
+            return other
+        return FieldElement(self.field, (self.value + other) % self.field.p)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        other = self._value(other)
+        if other is NotImplemented:
+            return other
+        return FieldElement(self.field, (self.value - other) % self.field.p)
+
+    def __rsub__(self, other):
+        other = self._value(other)
+        if other is NotImplemented:
+            return other
+        return FieldElement(self.field, (other - self.value) % self.field.p)
+
+    def __mul__(self, other):
+        other = self._value(other)
+        if other is NotImplemented:
+            return other
+        return FieldElement(self.field, self.value * other % self.field.p)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        other = self._value(other)
+        if other is NotImplemented:
+            return other
+        return FieldElement(self.field, self.value * self.field.inverse(other) % self.field.p)
+
+    def __rtruediv__(self, other):
+        other = self._value(other)
+        if other is NotImplemented:
+            return other
+        return FieldElement(self.field, other * self.field.inverse(self.value) % self.field.p)
+
+    def __neg__(self):
+        return FieldElement(self.field, -self.value % self.field.p)
+
+    def __pow__(self, exponent: int):
+        if exponent < 0:
+            inverse = self.field.inverse(self.value)
+            return FieldElement(self.field, backend.powmod(inverse, -exponent, self.field.p))
+        return FieldElement(self.field, backend.powmod(self.value, exponent, self.field.p))
+
+    def inverse(self) -> "FieldElement":
+        """Multiplicative inverse"""
+        return FieldElement(self.field, self.field.inverse(self.value))
+
+    def sqrt(self) -> "FieldElement" or None:
+        """Square root, see :meth:`PrimeField.sqrt`"""
+        root = self.field.sqrt(self.value)
+        return None if root is None else FieldElement(self.field, root)
+
+
+class ExtensionField:
+    """The finite field GF(p^k) of polynomials over GF(p) modulo an irreducible polynomial of degree k
+
+    Elements are :class:`ExtensionElement` objects holding a tuple of k coefficients, lowest power first.
+    Products are reduced modulo the polynomial right away and inverses are cached.
+
+    Args:
+        p (int): Prime characteristic
+        degree (int): Degree k of the extension
+        modulus (sequence of int, optional): Monic irreducible polynomial of degree k, lowest power first. \
+            Defaults to the first one found by :meth:`find_irreducible`.
+
+    Raises:
+        ValueError: If ``modulus`` is not a monic irreducible polynomial of degree ``degree``
+    """
+
+    __slots__ = ("p", "degree", "modulus", "cache_size", "_inverses")
+
+    def __init__(self, p: int, degree: int, modulus=None, cache_size: int = 4096):
+        self.p = p
+        self.degree = degree
+        if modulus is None:
+            modulus = self.find_irreducible(p, degree)
+        modulus = tuple(coefficient % p for coefficient in modulus)
+        if len(modulus) != degree + 1 or modulus[-1] != 1 or not self.is_irreducible(p, modulus):
+            raise ValueError(
+                f"{modulus} is not a monic irreducible polynomial of degree {degree} over GF({p})."
+            )
+        self.modulus = modulus
+        self.cache_size = cache_size
+        self._inverses = {}
+
+    def __repr__(self):
+        return f'<ExtensionField p="{self.p}" degree="{self.degree}" modulus="{self.modulus}">'
+
+    def __reduce__(self):
+        return ExtensionField, (self.p, self.degree, self.modulus, self.cache_size)
+
+    def __eq__(self, other):
+        return isinstance(other, ExtensionField) and (other.p, other.modulus) == (self.p, self.modulus)
+
+    def __hash__(self):
+        return hash(("ExtensionField", self.p, self.modulus))
+
+    def __call__(self, value) -> "ExtensionElement":
+        if isinstance(value, ExtensionElement):
+            return value
+        if isinstance(value, int):
+            value = [value]
+        coefficients = _poly_mod([coefficient % self.p for coefficient in value], list(self.modulus), self.p)
+        return ExtensionElement(self, self._pad(coefficients))
+
+    def __iter__(self):
+        for number in range(self.order):
+            coefficients = []
+            for _ in range(self.degree):
+                number, coefficient = divmod(number, self.p)
+                coefficients.append(coefficient)
+            yield ExtensionElement(self, tuple(coefficients))
+
+    @property
+    def order(self) -> int:
+        """Number of elements of the field"""
+        return self.p ** self.degree
+
+    @property
+    def characteristic(self) -> int:
+        """Characteristic of the field"""
+        return self.p
+
+    @classmethod
+    def is_irreducible(cls, p: int, polynomial) -> bool:
+        """Rabin's irreducibility test over GF(p)
+
+        Args:
+            p (int): Prime characteristic
+            polynomial (sequence of int): Polynomial, lowest power first
+
+        Returns:
+            bool: True if the polynomial is irreducible
+        """
+        polynomial = _trim([coefficient % p for coefficient in polynomial])
+        degree = len(polynomial) - 1
+        if degree < 1:
+            return False
+        x = _poly_mod([0, 1], polynomial, p)
+
+        def frobenius_difference(exponent: int) -> list:
+            """x^(p^exponent) - x modulo the polynomial"""
+            power = _poly_pow_mod(x, p ** exponent, polynomial, p)
+            return _trim([(a - b) % p for a, b in zip_longest(power, x, fillvalue=0)])
+
+        for q in set(Primes.factorize(degree)) if degree > 1 else ():
+            if len(_poly_gcd(frobenius_difference(degree // q), polynomial, p)) != 1:
+                return False
+        return frobenius_difference(degree) == []
+
+    @classmethod
+    def find_irreducible(cls, p: int, degree: int) -> tuple:
+        """First monic irreducible polynomial of ``degree`` over GF(p), preferring few terms
+
+        Returns:
+            tuple: Coefficients, lowest power first
+        """
+        for terms in range(p ** degree):
+            coefficients = []
+            for _ in range(degree):
+                terms, coefficient = divmod(terms, p)
+                coefficients.append(coefficient)
+            candidate = (*coefficients, 1)
+            if candidate[0] and cls.is_irreducible(p, candidate):
+                return candidate
+        raise ValueError(f"No irreducible polynomial of degree {degree} over GF({p}).")
+
+    def _pad(self, coefficients: list) -> tuple:
+        return tuple(coefficients) + (0,) * (self.degree - len(coefficients))
+
+    def add(self, a: tuple, b: tuple) -> tuple:
+        """Sum of two coefficient tuples"""
+        p = self.p
+        return tuple((x + y) % p for x, y in zip(a, b))
+
+    def subtract(self, a: tuple, b: tuple) -> tuple:
+        """Difference of two coefficient tuples"""
+        p = self.p
+        return tuple((x - y) % p for x, y in zip(a, b))
+
+    def multiply(self, a: tuple, b: tuple) -> tuple:
+        """Product of two coefficient tuples, reduced modulo the field polynomial"""
+        product = _poly_mul(_trim(list(a)), _trim(list(b)), self.p)
+        return self._pad(_poly_mod(product, list(self.modulus), self.p))
+
+    def power(self, a: tuple, exponent: int) -> tuple:
+        """``a^exponent``, negative exponents included"""
+        if exponent < 0:
+            a, exponent = self.inverse(a), -exponent
+        return self._pad(_poly_pow_mod(_trim(list(a)), exponent, list(self.modulus), self.p))
+
+    def inverse(self, a: tuple) -> tuple:
+        """Multiplicative inverse ``a^(p^k - 2)``, cached
+
+        Raises:
+            ZeroDivisionError: If ``a`` is zero
+        """
+        inverse = self._inverses.get(a)
+        if inverse is None:
+            if not any(a):
+                raise ZeroDivisionError(f"0 has no inverse in GF({self.p}^{self.degree}).")
+            if instrumentation.ENABLED:
+                instrumentation.count("inversion")
+            inverse = self.power(a, self.order - 2)
+            if len(self._inverses) >= self.cache_size:
+                self._inverses.clear()
+            self._inverses[a] = inverse
+        return inverse
+
+    def batch_inverse(self, values) -> list:
+        """Inverses of all coefficient tuples with Montgomery's trick, see :meth:`PrimeField.batch_inverse`"""
+        values = list(values)
+        prefix = []
+        product = self._pad([1])
+        for value in values:
+            prefix.append(product)
+            product = self.multiply(product, value)
+        inverse = self.inverse(product)
+        inverses = [None] * len(values)
+        for index in range(len(values) - 1, -1, -1):
+            inverses[index] = self.multiply(inverse, prefix[index])
+            inverse = self.multiply(inverse, values[index])
+        return inverses
+
+    def batch_multiply(self, a, b) -> list:
+        """Element-wise products of two sequences of coefficient tuples"""
+        return [self.multiply(x, y) for x, y in zip(a, b)]
+
+
+class ExtensionElement:
+    """Element of an :class:`ExtensionField`
+
+    Operators accept other elements of the same field and plain ints, which are embedded as constants.
+
+    Attributes:
+        field (ExtensionField): Field of the element
+        coefficients (tuple): Coefficients of the polynomial, lowest power first
+    """
+
+    __slots__ = ("field", "coefficients")
+
+    def __init__(self, field: ExtensionField, coefficients: tuple):
+        self.field = field
+        self.coefficients = coefficients
+
+    def __repr__(self):
+        field = f"GF({self.field.p}^{self.field.degree})"
+        return f'<ExtensionElement coefficients="{self.coefficients}" field="{field}">'
+
+    def __reduce__(self):
+        return ExtensionElement, (self.field, self.coefficients)
+
+    def __bool__(self):
+        return any(self.coefficients)
+
+    def __hash__(self):
+        return hash(self.coefficients)
+
+    def __eq__(self, other):
+        if isinstance(other, (ExtensionElement, int)):
+            return self.coefficients == self._coefficients(other)
+        return NotImplemented
+
+    def _coefficients(self, other) -> tuple:
+        if isinstance(other, ExtensionElement):
+            if other.field != self.field:
+                raise ValueError("The elements belong to different fields.")
+            return other.coefficients
+        if isinstance(other, int):
+            return self.field(other).coefficients
+        return NotImplemented
+
+    def __add__(self, other):
+        other = self._coefficients(other)
+        if other is NotImplemented:
+            return other
+        return ExtensionElement(self.field, self.field.add(self.coefficients, other))
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        other = self._coefficients(other)
+        if other is NotImplemented:
+            return other
+        return ExtensionElement(self.field, self.field.subtract(self.coefficients, other))
+
+    def __rsub__(self, other):
+        other = self._coefficients(other)
+        if other is NotImplemented:
+            return other
+        return ExtensionElement(self.field, self.field.subtract(other, self.coefficients))
+
+    def __mul__(self, other):
+        other = self._coefficients(other)
+        if other is NotImplemented:
+            return other
+        return ExtensionElement(self.field, self.field.multiply(self.coefficients, other))
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        other = self._coefficients(other)
+        if other is NotImplemented:
+            return other
+        return ExtensionElement(self.field, self.field.multiply(self.coefficients, self.field.inverse(other)))
+
+    def __rtruediv__(self, other):
+        other = self._coefficients(other)
+        if other is NotImplemented:
+            return other
+        return ExtensionElement(self.field, self.field.multiply(other, self.field.inverse(self.coefficients)))
+
+    def __neg__(self):
+        return ExtensionElement(self.field, self.field.subtract(self.field._pad([]), self.coefficients))
+
+    def __pow__(self, exponent: int):
+        return ExtensionElement(self.field, self.field.power(self.coefficients, exponent))
+
+    def inverse(self) -> "ExtensionElement":
+        """Multiplicative inverse"""
+        return ExtensionElement(self.field, self.field.inverse(self.coefficients))
+
+
+@functools.lru_cache(maxsize=64)
+def GF(p: int, degree: int = 1, modulus: tuple = None):
+    """Finite field with ``p^degree`` elements
+
+    The same object is returned for the same arguments, so caches are shared between its users.
+
+    Args:
+        p (int): Prime characteristic
+        degree (int, optional): Degree of the extension. Defaults to 1, the prime field.
+        modulus (tuple, optional): Irreducible polynomial of an extension, see :class:`ExtensionField`
+
+    Returns:
+        PrimeField or ExtensionField: The field
+    """
+    if degree == 1 and modulus is None:
+        return PrimeField(p)
+    return ExtensionField(p, degree, modulus)
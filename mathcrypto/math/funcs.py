@@ -1,3 +1,4 @@
+from .. import backend, instrumentation, verification
 from ..cryptography.primes import Primes
 
 
@@ -17,18 +18,25 @@ class MathFunctions:
             int: How many elements belong to a multiplicative group set by this number.
         """
 
-        if Primes.is_probable_prime_fermat(num):
-            return num - 1
+        if instrumentation.ENABLED:
+            instrumentation.count("phi")
 
-        factors = Primes.factorize(num)
-        totient = 1
-        used = []
-        for factor in factors:
-            if factor in used:
-                totient = totient * factor  # same as (totient * factor) but faster
-            else:
-                totient = totient * (factor - 1)  # same as (totient * (factor - 1)) but faster
-                used.append(factor)
+        if num == 1:
+            totient = 1
+        elif Primes.is_prime(num):
+            totient = num - 1
+        else:
+            factors = Primes.factorize(num)
+            totient = 1
+            used = []
+            for factor in factors:
+                if factor in used:
+                    totient = totient * factor  # same as (totient * factor) but faster
+                else:
+                    totient = totient * (factor - 1)  # same as (totient * (factor - 1)) but faster
+                    used.append(factor)
+        if verification.RATE:
+            verification.check("MathFunctions.phi", (num,), totient)
         return int(totient)
 
     @classmethod
@@ -45,9 +53,15 @@ class MathFunctions:
             int: Greatest Common Divisor of the two numbers
         """
 
+        if instrumentation.ENABLED:
+            instrumentation.count("gcd")
+        return cls._euclid_gcd(num_a, num_b)
+
+    @classmethod
+    def _euclid_gcd(cls, num_a: int, num_b: int) -> int:
         if num_a == 0:
             return num_b
-        return cls.euclid_gcd(num_b % num_a, num_a)
+        return cls._euclid_gcd(num_b % num_a, num_a)
 
     @classmethod
     def crt(cls, lis) -> int:
@@ -68,6 +82,10 @@ class MathFunctions:
             int: Solution for x
         """
 
+        if instrumentation.ENABLED:
+            instrumentation.count("crt")
+            instrumentation.count("modexp", len(lis))
+
         M = 1
         temp = 0
 
@@ -87,9 +105,11 @@ class MathFunctions:
 
         for item in lis:
             N = int(M / item[1])
-            L = pow(N, MathFunctions.phi(item[1]) - 1, item[1])
+            L = backend.powmod(N, MathFunctions.phi(item[1]) - 1, item[1])
             W = (L * N) % M
             temp += item[0] * W
+        if verification.RATE:
+            verification.check("MathFunctions.crt", (lis,), temp % M)
         return temp % M
 
     @classmethod
@@ -243,7 +263,12 @@ class MathFunctions:
             def __repr__(self):
                 return f"<EEA n={self.n} x={self.x}>"
 
+        if instrumentation.ENABLED:
+            instrumentation.count("inversion")
+
         if verbose:
             return EEA(modulus, number).ascii()
-        else:
-            return EEA(modulus, number).result
+        result = EEA(modulus, number).result
+        if verification.RATE:
+            verification.check("MathFunctions.eea", (modulus, number), result)
+        return result
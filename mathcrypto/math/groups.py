@@ -1,27 +1,399 @@
+import functools
+import itertools
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from .. import backend, instrumentation, serialization, verification
 from .funcs import MathFunctions
 from ..cryptography.primes import Primes
+from ..cryptography.rng import get_rng
+
+_SMALL_PRIMES = Primes.sieve(1 << 12)
+_CHUNK = 1 << 20
+_FLAGS_TO_DIGITS = bytes.maketrans(b"\x00\x01", b"01")
+_DIGITS_TO_FLAGS = bytes.maketrans(b"01", b"\x00\x01")
+# byte to the number of its set bits, int.bit_count needs Python 3.10
+_POPCOUNT = bytes(bin(byte).count("1") for byte in range(256))
+
+
+@functools.lru_cache(maxsize=256)
+def _distinct_factors(num: int) -> tuple:
+    """Distinct prime factors of ``num``, small ones by trial division, the rest by :meth:`Primes.factorize`"""
+    factors = []
+    for prime in _SMALL_PRIMES:
+        if num % prime == 0:
+            factors.append(prime)
+            while num % prime == 0:
+                num //= prime
+    if num > 1:
+        factors += sorted(set(Primes.factorize(num)))
+    return tuple(factors)
+
+
+def _check_generators(prime: int, order: int, exponents: tuple, candidates: list) -> list:
+    """``pow(candidate, order, prime) == 1`` and no ``pow(candidate, exponent, prime) == 1``. Runs in workers."""
+    if instrumentation.ENABLED:
+        instrumentation.count("modexp", len(candidates) * (len(exponents) + 1))
+    return [
+        backend.powmod(candidate, order, prime) == 1
+        and all(backend.powmod(candidate, e, prime) != 1 for e in exponents)
+        for candidate in candidates
+    ]
+
+
+def _coprime_flags(start: int, stop: int, factors) -> bytearray:
+    """One byte per number in ``[start, stop)``, 1 if it is not divisible by any of ``factors``"""
+    flags = bytearray(b"\x01") * (stop - start)
+    for factor in factors:
+        first = -start % factor
+        flags[first::factor] = bytes(len(range(first, stop - start, factor)))
+    return flags
+
+
+def _coprime_chunks(stop: int, factors):
+    """Yields ``(start, flags)`` over ``[0, stop)`` in chunks, see :func:`_coprime_flags`"""
+    for start in range(0, stop, _CHUNK):
+        yield start, _coprime_flags(start, min(stop, start + _CHUNK), factors)
+
+
+class Bitset:
+    """Set of integers in ``[0, size)`` stored as one bit per number
+
+    Membership is a constant-time bit test. Pickles as its raw bytes.
+
+    Args:
+        size (int): Upper bound of the members, excluded
+        bits (bytes or bytearray, optional): Existing bits, bit ``i % 8`` of byte ``i // 8`` marks ``i``
+    """
+
+    __slots__ = ("size", "bits")
+
+    def __init__(self, size: int, bits=None):
+        self.size = size
+        self.bits = bytearray(bits) if bits is not None else bytearray((size + 7) >> 3)
+
+    def __repr__(self):
+        return f'<Bitset size="{self.size}" count="{len(self)}">'
+
+    def __reduce__(self):
+        return Bitset, (self.size, bytes(self.bits))
+
+    def __contains__(self, number: int) -> bool:
+        return 0 <= number < self.size and self.bits[number >> 3] >> (number & 7) & 1 == 1
+
+    def __len__(self):
+        return sum(self.bits.translate(_POPCOUNT))
+
+    def __iter__(self):
+        for start, flags in self.chunks():
+            yield from itertools.compress(range(start, start + len(flags)), flags)
+
+    def add(self, number: int):
+        """Adds ``number`` to the set"""
+        self.bits[number >> 3] |= 1 << (number & 7)
+
+    def set_flags(self, start: int, flags: bytes):
+        """Sets the members of ``[start, start + len(flags))`` from one 0 or 1 byte per number
+
+        Args:
+            start (int): First number of the range, a multiple of 8
+            flags (bytes): 1 for members, 0 for other numbers
+        """
+        digits = bytes(flags).translate(_FLAGS_TO_DIGITS)[::-1]
+        value = int(digits, 2) if digits else 0
+        length = (len(flags) + 7) >> 3
+        self.bits[start >> 3 : (start >> 3) + length] = value.to_bytes(length, "little")
+
+    def chunks(self):
+        """Yields ``(start, flags)`` with one 0 or 1 byte per number, the reverse of :meth:`set_flags`"""
+        for start in range(0, self.size, _CHUNK):
+            stop = min(self.size, start + _CHUNK)
+            value = int.from_bytes(self.bits[start >> 3 : (stop + 7) >> 3], "little")
+            digits = format(value, "b").zfill(stop - start)[::-1][: stop - start]
+            yield start, digits.encode().translate(_DIGITS_TO_FLAGS)
+
+
+class LogTable:
+    """Discrete logarithm and antilogarithm tables of a cyclic group modulo ``mod``
+
+    ``log[x]`` is the exponent k with ``generator^k = x`` and ``antilog[k] = generator^k``,
+    so multiplication, inversion, powers, element orders, subgroup membership and discrete logarithms
+    are array lookups instead of modular exponentiations. Both tables are ``array('I')``,
+    4 bytes per entry, and ``antilog`` is doubled so a sum of two logarithms needs no reduction.
+
+    Args:
+        mod (int): Modulus of the group, below 2^24
+        generator (int): Generator of the whole group
+        order (int): Order of the group
+
+    Raises:
+        ValueError: If ``mod`` is too large or ``generator`` does not generate a group of ``order``
+    """
+
+    max_mod = 1 << 24
+    _MISSING = 0xFFFFFFFF
+
+    __slots__ = ("mod", "generator", "order", "log", "antilog")
+
+    def __init__(self, mod: int, generator: int, order: int):
+        if mod >= self.max_mod:
+            raise ValueError(f"Tables are only built for moduli below {self.max_mod}.")
+        self.mod = mod
+        self.generator = generator
+        self.order = order
+        self.log = array("I", [self._MISSING]) * mod
+        self.antilog = array("I", bytes(4 * 2 * order))
+        value = 1 % mod
+        for k in range(order):
+            if self.log[value] != self._MISSING:
+                raise ValueError(f"{generator} does not generate a group of order {order} modulo {mod}.")
+            self.log[value] = k
+            self.antilog[k] = self.antilog[k + order] = value
+            value = value * generator % mod
+        if value != 1 % mod:
+            raise ValueError(f"{generator} does not generate a group of order {order} modulo {mod}.")
+
+    def __repr__(self):
+        return f'<LogTable mod="{self.mod}" generator="{self.generator}" order="{self.order}">'
+
+    def __reduce__(self):
+        return _restore_log_table, (self.mod, self.generator, self.order, self.log, self.antilog)
+
+    def __contains__(self, element: int) -> bool:
+        return 0 <= element < self.mod and self.log[element] != self._MISSING
+
+    def discrete_log(self, element: int, base: int = None) -> int:
+        """Smallest k with ``base^k = element``
+
+        Args:
+            element (int): Element of the group
+            base (int, optional): Base of the logarithm. Defaults to the generator of the tables.
+
+        Raises:
+            ValueError: If ``element`` or ``base`` is not in the group or ``element`` is not a power of ``base``
+
+        Returns:
+            int: The logarithm
+        """
+        if element not in self:
+            raise ValueError(f"{element} is not an element of the group modulo {self.mod}.")
+        log = self.log[element]
+        if base is None:
+            return log
+        if base not in self:
+            raise ValueError(f"{base} is not an element of the group modulo {self.mod}.")
+        base_log = self.log[base]
+        # base^k = element  <=>  k * log(base) = log(element) (mod order),
+        # solvable iff log(element) is a multiple of the index gcd(log(base), order) of the subgroup of base
+        common = backend.gcd(base_log, self.order)
+        if log % common:
+            raise ValueError(f"{element} is not a power of {base}.")
+        modulus = self.order // common
+        if modulus == 1:
+            return 0
+        return (log // common) * backend.invert(base_log // common, modulus) % modulus
+
+    def multiply(self, a: int, b: int) -> int:
+        """``a * b`` in the group"""
+        return self.antilog[self.log[a] + self.log[b]]
+
+    def power(self, element: int, exponent: int) -> int:
+        """``element^exponent`` in the group, negative exponents included"""
+        return self.antilog[self.log[element] * exponent % self.order]
+
+    def inverse(self, element: int) -> int:
+        """Inverse of ``element``"""
+        return self.antilog[self.order - self.log[element]]
+
+    def element_order(self, element: int) -> int:
+        """Order of ``element``, ``order / gcd(log(element), order)``"""
+        return self.order // backend.gcd(self.log[element], self.order)
+
+    def in_subgroup(self, element: int, subgroup_order: int) -> bool:
+        """Whether ``element`` lies in the subgroup of ``subgroup_order``, a divisor of the group order"""
+        return self.log[element] % (self.order // subgroup_order) == 0
+
+    def subgroup(self, element: int) -> array:
+        """Elements of the subgroup generated by ``element``, in the order of the powers of ``element``"""
+        log = self.log[element]
+        subgroup_order = self.order // backend.gcd(log, self.order)
+        return array("I", (self.antilog[log * k % self.order] for k in range(subgroup_order)))
+
+
+def _restore_log_table(mod: int, generator: int, order: int, log: array, antilog: array) -> LogTable:
+    """Unpickles a LogTable without rebuilding it"""
+    table = LogTable.__new__(LogTable)
+    table.mod, table.generator, table.order, table.log, table.antilog = mod, generator, order, log, antilog
+    return table
 
 
 class MultiplicativeGroup:
 
     """Multiplicative group objects
 
+    With ``compact=True`` the elements and generators are stored in ``array`` objects
+    of 4 or 8 bytes per number instead of lists of int objects, and membership is tested
+    on a :class:`Bitset` over ``[0, mod)``, so a group modulo about 10^8 takes tens of megabytes
+    and every membership check is constant-time.
+
+    :meth:`to_bytes` stores the group in a compact binary form, see :mod:`mathcrypto.serialization`:
+    a compact group as its two bitsets, about ``mod / 4`` bytes, from which the arrays are rebuilt,
+    other groups as packed arrays of as many bytes per number as ``mod`` needs, and the log tables, if built, as raw arrays.
+    Groups pickle as that form too.
+
+    With ``tables=True`` the group also builds :class:`LogTable` from its first generator
+    and answers orders, subgroups, inverses and discrete logarithms from it without modular exponentiation.
+
+    Args:
+        mod (int): Modulus of the group
+        compact (bool, optional): Whether to use the compact storage. Defaults to False.
+        tables (bool, optional): Whether to precompute log tables, see :meth:`precompute`. Defaults to False.
+
     Attributes:
         mod (int): Modulus of the group
-        elements (list): List of elements in the group
+        elements (list or array): List of elements in the group
         order (int): Order of the group
-        generators (list): List of generators of the group
+        generators (list or array): List of generators of the group
+        tables (LogTable or None): Precomputed log tables
     """
 
-    def __init__(self, mod):
+    def __init__(self, mod, compact: bool = False, tables: bool = False):
         self.mod = mod
-        self.elements = self._generate_elements()
-        self.order = len(self.elements)
-        self.generators = self._get_generators()
+        self.compact = compact
+        self.tables = None
+        if compact:
+            self._element_set = self._generate_element_set()
+            self.elements = self._to_array(self._element_set)
+            self.order = len(self.elements)
+            self._generator_set = self._generate_generator_set()
+            self.generators = self._to_array(self._generator_set)
+        else:
+            self.elements = self._generate_elements()
+            self.order = len(self.elements)
+            self.generators = self._get_generators()
+            self._element_set = self.elements
+            self._generator_set = self.generators
+        if tables:
+            self.precompute()
 
     def __repr__(self):
+        if self.compact:
+            return (
+                f'<MultiplicativeGroup mod="{self.mod}" order="{self.order}" compact="True" '
+                f'generators="{len(self.generators)}">'
+            )
         return f'<MultiplicativeGroup mod="{self.mod}" order="{self.order}" elements="{self.elements}" generators="{self.generators}">'
 
+    def __reduce__(self):
+        return MultiplicativeGroup.from_bytes, (self.to_bytes(),)
+
+    def to_bytes(self) -> bytes:
+        """Compact binary form of the group and its tables, see :meth:`from_bytes`"""
+        generator = self.tables.generator if self.tables is not None else None
+        if self.compact:
+            arrays = [self._element_set.bits, self._generator_set.bits]
+        else:
+            arrays = [self.elements, self.generators]
+        if self.tables is not None:
+            arrays += [(self.tables.log, 4), (self.tables.antilog, 4)]
+        return serialization.encode(b"group", [self.mod, int(self.compact), generator], arrays)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Reads a group written by :meth:`to_bytes` without recomputing its elements, generators or tables
+
+        Args:
+            data (bytes, bytearray or memoryview): The binary form
+
+        Raises:
+            ValueError: If ``data`` is not a group written by :meth:`to_bytes`
+
+        Returns:
+            MultiplicativeGroup: The group
+        """
+        values, arrays = serialization.decode(data, b"group")
+        if len(values) != 3 or len(arrays) != (2 if values[2] is None else 4):
+            raise ValueError("The data does not hold the values of a group.")
+        mod, compact, generator = values
+        group = cls.__new__(cls)
+        group.mod = mod
+        group.compact = bool(compact)
+        group.tables = None
+        if group.compact:
+            group._element_set = Bitset(mod, arrays[0])
+            group._generator_set = Bitset(mod, arrays[1])
+            group.elements = group._to_array(group._element_set)
+            group.generators = group._to_array(group._generator_set)
+        else:
+            group.elements = group._element_set = list(arrays[0])
+            group.generators = group._generator_set = list(arrays[1])
+        group.order = len(group.elements)
+        if generator is not None:
+            group.tables = _restore_log_table(mod, generator, group.order, arrays[2], arrays[3])
+            if not group.compact:
+                group._element_set = group.tables
+        return group
+
+    @classmethod
+    def element_chunks(cls, mod: int):
+        """Yields the elements of the group modulo ``mod`` in ascending order, without building the group
+
+        The numbers coprime to ``mod`` are sieved in chunks of 2^20, so memory stays flat for any modulus.
+
+        Args:
+            mod (int): Modulus of the group
+
+        Yields:
+            array: The elements of the next chunk, 4 or 8 bytes per number
+        """
+        factors = _distinct_factors(mod) if mod > 1 else ()
+        for start, flags in _coprime_chunks(mod, factors):
+            if start == 0:
+                flags[0] = 0
+            chunk = array("I" if mod <= 1 << 32 else "Q")
+            chunk.extend(itertools.compress(range(start, start + len(flags)), flags))
+            yield chunk
+
+    def _to_array(self, members: Bitset) -> array:
+        """Members of the bitset in ascending order, 4 bytes per number if ``mod`` allows"""
+        members_array = array("I" if self.mod <= 1 << 32 else "Q")
+        for start, flags in members.chunks():
+            members_array.extend(itertools.compress(range(start, start + len(flags)), flags))
+        return members_array
+
+    def _generate_element_set(self) -> Bitset:
+        """Marks the numbers coprime to ``mod`` by sieving out the multiples of its prime factors"""
+        elements = Bitset(self.mod)
+        factors = _distinct_factors(self.mod) if self.mod > 1 else ()
+        for start, flags in _coprime_chunks(self.mod, factors):
+            if start == 0:
+                flags[0] = 0
+            elements.set_flags(start, flags)
+        return elements
+
+    def _generate_generator_set(self) -> Bitset:
+        """Finds one generator, then marks its powers ``generator^k`` with k coprime to the order"""
+        generators = Bitset(self.mod)
+        if self.order < 2:
+            # matches _get_generators, which finds none in the trivial group
+            return generators
+        order_factors = _distinct_factors(self.order)
+        exponents = tuple(self.order // q for q in order_factors)
+        for element in self.elements:
+            if _check_generators(self.mod, self.order, exponents, [element])[0]:
+                generator = element
+                break
+        else:
+            return generators
+
+        power = 1
+        for start, flags in _coprime_chunks(self.order, order_factors):
+            for is_coprime in flags:
+                if is_coprime:
+                    generators.add(power)
+                power = power * generator % self.mod
+        return generators
+
     def _generate_elements(self):
         """Generates all elements in the group
 
@@ -49,15 +421,216 @@ class MultiplicativeGroup:
             if i not in cleaned_factors:
                 cleaned_factors.append(i)
 
+        if instrumentation.ENABLED:
+            instrumentation.count("modexp", len(self.elements) * len(cleaned_factors))
         generators = []
         for element in self.elements:
             for factor in cleaned_factors:
-                if pow(element, int(phi / factor), self.mod) == 1:
+                if backend.powmod(element, int(phi / factor), self.mod) == 1:
                     break
             else:
                 generators.append(element)
         return generators
 
+    @classmethod
+    def order_factors(cls, prime: int, factors=None) -> tuple:
+        """Distinct prime factors of ``prime - 1``, the order of the multiplicative group modulo ``prime``
+
+        The factorisations are cached, so repeated calls for the same prime are free.
+        Small factors are found by trial division and a remaining probable prime is kept as it is,
+        which covers safe primes ``2q + 1`` of any size. Other large cofactors fall back to
+        :meth:`Primes.factorize`, which is slow, so pass ``factors`` for such primes.
+
+        Args:
+            prime (int): Prime modulus
+            factors (iterable of int, optional): Known prime factors of ``prime - 1``, duplicates allowed
+
+        Returns:
+            tuple: Distinct prime factors in ascending order
+        """
+        if factors is not None:
+            return tuple(sorted(set(factors)))
+        return _distinct_factors(prime - 1)
+
+    @classmethod
+    def is_primitive_root(cls, element: int, prime: int, factors=None) -> bool:
+        """Checks whether ``element`` generates the whole group modulo ``prime``
+
+        Uses one modular exponentiation per distinct prime factor q of ``prime - 1``:
+        ``element`` is a generator if ``element^((prime - 1) / q) != 1`` for all of them.
+
+        Args:
+            element (int): Element to check
+            prime (int): Prime modulus
+            factors (iterable of int, optional): Known prime factors of ``prime - 1``
+
+        Returns:
+            bool: True if ``element`` is a primitive root modulo ``prime``
+        """
+        return cls.verify_generators(prime, [element], factors=factors)[0]
+
+    @classmethod
+    def verify_generators(
+        cls,
+        prime: int,
+        candidates,
+        order: int = None,
+        factors=None,
+        num_cpus: int = 1,
+        chunk_size: int = 4096,
+    ) -> list:
+        """Checks many candidates at once against the same prime and order
+
+        The exponents are computed once for the whole batch. With ``num_cpus`` above 1,
+        chunks of candidates are checked on a process pool.
+
+        Args:
+            prime (int): Prime modulus
+            candidates (iterable of int): Elements to check
+            order (int, optional): Required order of the candidates, a divisor of ``prime - 1``. \
+                Defaults to ``prime - 1``, checking for primitive roots.
+            factors (iterable of int, optional): Known prime factors of ``prime - 1``
+            num_cpus (int, optional): Number of processes. Defaults to 1.
+            chunk_size (int, optional): Candidates per task of the process pool. Defaults to 4096.
+
+        Raises:
+            ValueError: If ``order`` does not divide ``prime - 1``
+
+        Returns:
+            list: True for every candidate of exactly ``order``, in the order of ``candidates``
+        """
+        order = order if order is not None else prime - 1
+        if (prime - 1) % order:
+            raise ValueError(f"{order} does not divide the group order {prime - 1}.")
+        exponents = tuple(order // q for q in cls.order_factors(prime, factors) if order % q == 0)
+        candidates = [candidate % prime for candidate in candidates]
+        if num_cpus <= 1 or len(candidates) <= chunk_size:
+            return _check_generators(prime, order, exponents, candidates)
+        with ProcessPoolExecutor(max_workers=num_cpus) as executor:
+            chunks = [candidates[i : i + chunk_size] for i in range(0, len(candidates), chunk_size)]
+            results = executor.map(_check_generators, *zip(*((prime, order, exponents, c) for c in chunks)))
+            return [result for chunk in results for result in chunk]
+
+    @classmethod
+    def find_primitive_root(cls, prime: int, factors=None, rng=None) -> int:
+        """Finds a generator of the multiplicative group modulo ``prime``
+
+        Args:
+            prime (int): Prime modulus
+            factors (iterable of int, optional): Known prime factors of ``prime - 1``
+            rng (SeededRNG or SystemRNG, optional): If given, random candidates are tried, \
+                otherwise the smallest primitive root is returned.
+
+        Returns:
+            int: A primitive root modulo ``prime``
+        """
+        return cls.find_subgroup_generator(prime, prime - 1, factors=factors, rng=rng)
+
+    @classmethod
+    def find_subgroup_generator(cls, prime: int, order: int, factors=None, rng=None) -> int:
+        """Finds an element of exactly ``order`` modulo ``prime``
+
+        Random elements are raised to ``(prime - 1) / order``, which lands in the subgroup of ``order``,
+        and kept if no prime factor of ``order`` divides their order, so about one in
+        ``order / phi(order)`` candidates succeeds.
+
+        Args:
+            prime (int): Prime modulus
+            order (int): Order of the subgroup, a divisor of ``prime - 1``. \
+                For a prime ``order`` no factorisation of ``prime - 1`` is needed.
+            factors (iterable of int, optional): Known prime factors of ``prime - 1`` or of ``order``
+            rng (SeededRNG or SystemRNG, optional): If given, random candidates are tried, \
+                otherwise candidates 2, 3, 4... are raised to ``(prime - 1) / order`` in turn.
+
+        Raises:
+            ValueError: If ``order`` does not divide ``prime - 1`` or ``prime`` is not a prime
+
+        Returns:
+            int: Generator of the subgroup of ``order``
+        """
+        if (prime - 1) % order:
+            raise ValueError(f"{order} does not divide the group order {prime - 1}.")
+        if order == 1:
+            return 1
+        if factors is None and order != prime - 1 and Primes.is_prime(order):
+            factors = (order,)
+        cofactor = (prime - 1) // order
+        exponents = tuple(order // q for q in cls.order_factors(prime, factors) if order % q == 0)
+        candidate = 1
+        while True:
+            candidate = get_rng(rng).randrange(2, prime) if rng is not None else candidate + 1
+            if candidate >= prime:
+                raise ValueError(f"No element of order {order} exists modulo {prime}.")
+            element = backend.powmod(candidate, cofactor, prime)
+            if _check_generators(prime, order, exponents, [element])[0]:
+                return element
+
+    def precompute(self, generator: int = None) -> LogTable:
+        """Builds the log and antilog tables of a cyclic group with ``mod`` below 2^24
+
+        Args:
+            generator (int, optional): Generator the logarithms are taken to. Defaults to the first generator.
+
+        Raises:
+            ValueError: If the group is not cyclic or ``mod`` is too large for tables
+
+        Returns:
+            LogTable: The tables, also kept in :attr:`tables`
+        """
+        if generator is None and self.order == 1:
+            # the trivial group {1} is generated by 1
+            generator = 1
+        if generator is None:
+            if not len(self.generators):
+                raise ValueError(f"The group modulo {self.mod} has no generator, tables need a cyclic group.")
+            generator = self.generators[0]
+        self.tables = LogTable(self.mod, generator, self.order)
+        if not self.compact:
+            # the tables know the elements, and unlike the list they answer in constant time
+            self._element_set = self.tables
+        return self.tables
+
+    def discrete_log(self, element: int, base: int = None) -> int:
+        """Smallest k with ``base^k = element``
+
+        Args:
+            element (int): Element of the group
+            base (int, optional): Base of the logarithm. Defaults to the generator of the tables, \
+                required without tables.
+
+        Raises:
+            ValueError: When the ``element`` does not belong to the group or is not a power of ``base``
+
+        Returns:
+            int: The logarithm
+        """
+        if element not in self._element_set:
+            raise ValueError
+        if self.tables is not None:
+            return self.tables.discrete_log(element, base)
+        if base is None:
+            raise ValueError("The base is required without precomputed tables.")
+        power = 1 % self.mod
+        for k in range(self.order):
+            if power == element:
+                return k
+            power = power * base % self.mod
+        raise ValueError(f"{element} is not a power of {base}.")
+
+    def _element_order(self, element: int) -> int:
+        """Order of an element from the prime factors of the group order, without listing its powers"""
+        order = self.order
+        modexps = 0
+        for q in _distinct_factors(self.order):
+            while order % q == 0:
+                modexps += 1
+                if backend.powmod(element, order // q, self.mod) != 1:
+                    break
+                order //= q
+        if instrumentation.ENABLED:
+            instrumentation.count("modexp", modexps)
+        return order
+
     def get_element_order(self, element) -> int:
         """Gets the order of an element in the group
 
@@ -71,15 +644,24 @@ class MultiplicativeGroup:
             int: Returns the order of ``element`` in the group
         """
 
-        if element not in self.elements:
+        if element not in self._element_set:
             raise ValueError
-        if element in self.generators:
-            return self.order
-
-        s = set()
-        for exp in range(len(self.elements)):
-            s.add(pow(element, exp, self.mod))
-        return len(s)
+        if self.tables is not None:
+            order = self.tables.element_order(element)
+        elif element in self._generator_set:
+            order = self.order
+        elif self.compact:
+            order = self._element_order(element)
+        else:
+            if instrumentation.ENABLED:
+                instrumentation.count("modexp", len(self.elements))
+            s = set()
+            for exp in range(len(self.elements)):
+                s.add(backend.powmod(element, exp, self.mod))
+            order = len(s)
+        if verification.RATE:
+            verification.check("MultiplicativeGroup.get_element_order", (self.mod, element), order)
+        return order
 
     def get_element_subgroup(self, element) -> int:
         """Gets the subgroup of any element in the group
@@ -94,14 +676,24 @@ class MultiplicativeGroup:
             list: Returns the order of ``element`` in the group
         """
 
-        if element not in self.elements:
+        if element not in self._element_set:
             raise ValueError
-        if element in self.generators:
+        if self.tables is not None:
+            subgroup = sorted(self.tables.subgroup(element))
+            return array(self.elements.typecode, subgroup) if self.compact else subgroup
+        if element in self._generator_set:
             return self.elements
+        if self.compact:
+            subgroup = [1]
+            for _ in range(self._element_order(element) - 1):
+                subgroup.append(subgroup[-1] * element % self.mod)
+            return array(self.elements.typecode, sorted(subgroup))
 
+        if instrumentation.ENABLED:
+            instrumentation.count("modexp", len(self.elements))
         s = set()
         for exp in range(len(self.elements)):
-            s.add(pow(element, exp, self.mod))
+            s.add(backend.powmod(element, exp, self.mod))
         return list(s)
 
     def get_inverse_element(self, element: int) -> int:
@@ -118,7 +710,12 @@ class MultiplicativeGroup:
         """
 
         """Returns the inverse to an element in the group"""
-        if element not in self.elements:
+        if element not in self._element_set:
             raise ValueError
-        inverse = pow(element, MathFunctions.phi(self.mod) - 1, self.mod)
+        if self.tables is not None:
+            return self.tables.inverse(element)
+        if instrumentation.ENABLED:
+            instrumentation.count("inversion")
+            instrumentation.count("modexp")
+        inverse = backend.powmod(element, self.order - 1, self.mod)
         return inverse
@@ -0,0 +1,211 @@
+import os
+import pickle
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from .. import backend, instrumentation
+
+# Divisors above this many bits are divided recursively, below it the built-in division is faster
+_DIVISION_LIMIT = 4000
+
+
+def _divide_2n_by_n(a: int, b: int, n: int) -> tuple:
+    """Quotient and remainder of ``a < 2^n * b`` by the n-bit ``b``, Burnikel-Ziegler recursion"""
+    if n <= _DIVISION_LIMIT:
+        return divmod(a, b)
+    pad = n & 1
+    if pad:
+        a, b, n = a << 1, b << 1, n + 1
+    half = n >> 1
+    mask = (1 << half) - 1
+    b1, b2 = b >> half, b & mask
+    q1, r = _divide_3_by_2(a >> n, (a >> half) & mask, b, b1, b2, half)
+    q2, r = _divide_3_by_2(r, a & mask, b, b1, b2, half)
+    return q1 << half | q2, r >> pad
+
+
+def _divide_3_by_2(a12: int, a3: int, b: int, b1: int, b2: int, n: int) -> tuple:
+    """Divides the 3 halves ``a12 * 2^n + a3`` by the 2 halves ``b = b1 * 2^n + b2``"""
+    if a12 >> n == b1:
+        q, r = (1 << n) - 1, a12 - (b1 << n) + b1
+    else:
+        q, r = _divide_2n_by_n(a12, b1, n)
+    r = (r << n | a3) - q * b2
+    while r < 0:
+        q -= 1
+        r += b
+    return q, r
+
+
+def _mod(a: int, b: int) -> int:
+    """``a % b`` for non-negative ints, with subquadratic division of huge numbers.
+
+    The built-in division of Python ints takes quadratic time, which dominates the top of a remainder tree.
+    Splitting the division into halves moves the work into multiplications, which use Karatsuba.
+    """
+    n = b.bit_length()
+    if n <= _DIVISION_LIMIT or type(a) is not int:
+        return a % b
+    digits = []
+    while a:
+        digits.append(a & ((1 << n) - 1))
+        a >>= n
+    r = 0
+    for digit in reversed(digits):
+        r = _divide_2n_by_n(r << n | digit, b, n)[1]
+    return r
+
+
+def _multiply_pairs(values: list) -> list:
+    """Products of neighbouring values, the last one is carried over if the count is odd. Runs in workers."""
+    products = [values[i] * values[i + 1] for i in range(0, len(values) - 1, 2)]
+    if len(values) % 2:
+        products.append(values[-1])
+    return products
+
+
+def _reduce(parents: list, children: list, squares: bool) -> list:
+    """Every child's parent remainder reduced modulo the child or its square. Runs in workers."""
+    if squares:
+        return [_mod(parents[i >> 1], child * child) for i, child in enumerate(children)]
+    return [_mod(parents[i >> 1], child) for i, child in enumerate(children)]
+
+
+class ProductTree:
+    """Product tree of many moduli, the base of the remainder tree
+
+    Level 0 holds the moduli, every level above holds the products of neighbouring pairs of the level below
+    and the root is the product of all moduli. Building the tree costs a few multiplications
+    of the size of the root, instead of one operation per pair of moduli.
+    With :meth:`remainders`, a number is reduced modulo every modulus by walking back down the tree.
+
+    Levels with many nodes are split into chunks computed on a process pool. With ``spill_directory``,
+    every finished level below the root is pickled to disk and loaded again only while walking down,
+    so at most two levels are in memory at once.
+
+    Args:
+        moduli (iterable of int): Positive moduli, at least one
+        num_cpus (int, optional): Number of processes. Defaults to 1.
+        spill_directory (str, optional): Directory to store the levels in. A private temporary directory \
+            is created in it and removed by :meth:`close`.
+        chunk_size (int, optional): Nodes per task of the process pool. Defaults to 256.
+
+    Example::
+
+        with ProductTree([15, 21, 77]) as tree:
+            tree.root  # 24255
+            tree.remainders(100)  # [10, 16, 23]
+    """
+
+    def __init__(self, moduli, num_cpus: int = 1, spill_directory: str = None, chunk_size: int = 256):
+        level = [backend.native(modulus) for modulus in moduli]
+        if not level:
+            raise ValueError("A product tree needs at least one modulus.")
+        self.num_cpus = num_cpus
+        self.chunk_size = chunk_size
+        self.size = len(level)
+        self.directory = None
+        if spill_directory is not None:
+            self.directory = tempfile.mkdtemp(prefix="product-tree-", dir=spill_directory)
+        self._levels = []
+        self._executor = ProcessPoolExecutor(max_workers=num_cpus) if num_cpus > 1 else None
+        try:
+            with instrumentation.span("product_tree"):
+                while len(self._levels) == 0 or len(level) > 1:
+                    self._store(level)
+                    if instrumentation.ENABLED:
+                        instrumentation.count("product_tree.multiplications", len(level) // 2)
+                    level = self._map(_multiply_pairs, level)
+                self._root = level[0]
+        except BaseException:
+            self.close()
+            raise
+
+    def __repr__(self):
+        return f'<ProductTree size="{self.size}" depth="{self.depth}" directory="{self.directory}">'
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def depth(self) -> int:
+        """Number of levels below the root"""
+        return len(self._levels)
+
+    @property
+    def root(self) -> int:
+        """Product of all moduli"""
+        return int(self._root)
+
+    def level(self, index: int) -> list:
+        """Nodes of a level, 0 are the moduli and :attr:`depth` is the root alone"""
+        if index == len(self._levels):
+            return [self._root]
+        level = self._levels[index]
+        if self.directory is None:
+            return level
+        with open(level, "rb") as file:
+            return pickle.load(file)
+
+    def remainders(self, value: int, squares: bool = False, control=None) -> list:
+        """``value`` modulo every modulus, computed down the remainder tree
+
+        Args:
+            value (int): Number to reduce, usually below the root
+            squares (bool, optional): Reduce modulo the squares of the nodes instead. \
+                Used by :meth:`BatchGCD.gcds`. Defaults to False.
+            control (SolverControl, optional): Cancellation and progress, one step per level
+
+        Raises:
+            SolverInterrupted: If ``control`` stopped the computation
+
+        Returns:
+            list: The remainders in the order of the moduli
+        """
+        with instrumentation.span("remainder_tree"):
+            remainders = [backend.native(value)]
+            if control is not None:
+                control.start(self.depth)
+            for index in range(self.depth - 1, -1, -1):
+                children = self.level(index)
+                if instrumentation.ENABLED:
+                    instrumentation.count("remainder_tree.reductions", len(children))
+                remainders = self._map(_reduce, children, remainders, squares)
+                if control is not None:
+                    control.step(1)
+            return [int(remainder) for remainder in remainders]
+
+    def close(self):
+        """Stops the workers and deletes the spilled levels"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self.directory is not None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _store(self, level: list):
+        if self.directory is None:
+            self._levels.append(level)
+            return
+        path = os.path.join(self.directory, f"level-{len(self._levels)}.pickle")
+        with open(path, "wb") as file:
+            pickle.dump(level, file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._levels.append(path)
+
+    def _map(self, function, level: list, parents: list = None, squares: bool = False) -> list:
+        """Applies ``function`` to the level, split into chunks of even length on the process pool"""
+        chunk_size = self.chunk_size + self.chunk_size % 2
+        if self._executor is None or len(level) <= chunk_size:
+            return function(level) if parents is None else function(parents, level, squares)
+        starts = range(0, len(level), chunk_size)
+        if parents is None:
+            results = self._executor.map(function, [level[i : i + chunk_size] for i in starts])
+        else:
+            chunks = [level[i : i + chunk_size] for i in starts]
+            parent_chunks = [parents[i >> 1 : (i + chunk_size) >> 1] for i in starts]
+            results = self._executor.map(function, parent_chunks, chunks, [squares] * len(chunks))
+        return [node for chunk in results for node in chunk]
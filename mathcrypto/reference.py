@@ -0,0 +1,145 @@
+"""Reference implementations of the library's results.
+
+Every function here follows the definition as directly as possible: trial division, counting, repeated
+multiplication and exhaustive search. They are slow, use plain ``int`` arithmetic only and share no code
+with the optimised paths, so a result on which both agree does not depend on a shared bug.
+
+They answer the same questions with the same conventions as the public methods they mirror,
+see :data:`REFERENCES`, and are what :mod:`mathcrypto.verification` compares the fast paths against.
+Inputs outside of their domain raise ``ValueError``.
+"""
+import math
+from collections import Counter
+
+
+class ReferenceBackend:
+    """Definition-level implementations, one per checked public method"""
+
+    name = "reference"
+
+    @staticmethod
+    def is_prime(num: int) -> bool:
+        """Trial division by every number up to the square root, see :meth:`Primes.is_prime`"""
+        if num < 2:
+            return False
+        divisor = 2
+        while divisor * divisor <= num:
+            if num % divisor == 0:
+                return False
+            divisor += 1
+        return True
+
+    @staticmethod
+    def factorize(num: int) -> list:
+        """Prime factors in ascending order with duplicates, ``[1]`` for 1, see :meth:`Primes.factorize`"""
+        if num < 1:
+            raise ValueError("Only positive numbers are factorized.")
+        if num == 1:
+            return [1]
+        factors = []
+        divisor = 2
+        while divisor * divisor <= num:
+            while num % divisor == 0:
+                factors.append(divisor)
+                num //= divisor
+            divisor += 1
+        if num > 1:
+            factors.append(num)
+        return factors
+
+    @staticmethod
+    def phi(num: int) -> int:
+        """Count of the numbers in ``[1, num]`` coprime to ``num``, see :meth:`MathFunctions.phi`"""
+        if num < 1:
+            raise ValueError("Phi is defined for positive numbers.")
+        return sum(1 for k in range(1, num + 1) if math.gcd(k, num) == 1)
+
+    @staticmethod
+    def crt(congruences) -> int:
+        """Smallest non-negative solution found by sieving, see :meth:`MathFunctions.crt`
+
+        Raises:
+            ValueError: If the moduli are not pairwise coprime
+        """
+        moduli = [modulus for _, modulus in congruences]
+        for i, modulus in enumerate(moduli):
+            if any(math.gcd(modulus, other) != 1 for other in moduli[i + 1 :]):
+                raise ValueError("The moduli are not pairwise coprime.")
+        solution, step = 0, 1
+        for remainder, modulus in congruences:
+            while solution % modulus != remainder % modulus:
+                solution += step
+            step *= modulus
+        return solution
+
+    @staticmethod
+    def eea(modulus: int, number: int) -> int:
+        """Inverse of ``number`` found by trying every residue, see :meth:`MathFunctions.eea`
+
+        Raises:
+            ValueError: If ``number`` is not invertible
+        """
+        for inverse in range(modulus):
+            if number * inverse % modulus == 1:
+                return inverse
+        raise ValueError(f"{number} is not invertible modulo {modulus}.")
+
+    @staticmethod
+    def element_order(mod: int, element: int) -> int:
+        """Number of multiplications by ``element`` that lead back to 1, \
+            see :meth:`MultiplicativeGroup.get_element_order`
+
+        Raises:
+            ValueError: If ``element`` is not coprime to ``mod``
+        """
+        if mod < 2 or math.gcd(element, mod) != 1:
+            raise ValueError(f"{element} is not an element of the group modulo {mod}.")
+        order, power = 1, element % mod
+        while power != 1 % mod:
+            power = power * element % mod
+            order += 1
+        return order
+
+    @classmethod
+    def curve_order(cls, field: int, a4: int, a5: int, a6: int) -> int:
+        """Points of ``y^2 = x^3 + a4*x^2 + a5*x + a6`` counted with a table of all squares, \
+            see :meth:`EllipticCurve.get_curve_order`
+
+        Raises:
+            ValueError: If ``field`` is not an odd prime
+        """
+        if field < 3 or not cls.is_prime(field):
+            raise ValueError("Points are counted over odd prime fields.")
+        roots = Counter(y * y % field for y in range(field))
+        return 1 + sum(roots[(x ** 3 + a4 * x ** 2 + a5 * x + a6) % field] for x in range(field))
+
+    @staticmethod
+    def add_point(field: int, a4: int, a5: int, point_p: list, point_q: list):
+        """Textbook chord and tangent addition of two affine points of the curve, \
+            see :meth:`EllipticCurve.add_point`
+
+        Returns:
+            list or str: The sum, ``"[∞,∞]"`` for the point at infinity
+        """
+        (px, py), (qx, qy) = [[coordinate % field for coordinate in point] for point in (point_p, point_q)]
+        if px == qx and (py + qy) % field == 0:
+            return "[∞,∞]"
+        if px == qx:
+            slope = (3 * px * px + 2 * a4 * px + a5) * pow(2 * py, -1, field) % field
+        else:
+            slope = (qy - py) * pow(qx - px, -1, field) % field
+        x = (slope * slope - a4 - px - qx) % field
+        return [x, (slope * (px - x) - py) % field]
+
+
+# checked name to (reference, work of the reference for the arguments), see mathcrypto.verification
+REFERENCES = {
+    "Primes.is_prime": (ReferenceBackend.is_prime, lambda num: math.isqrt(max(num, 0))),
+    "Primes.factorize": (ReferenceBackend.factorize, lambda num: math.isqrt(max(num, 0))),
+    "MathFunctions.phi": (ReferenceBackend.phi, lambda num: num),
+    "MathFunctions.crt": (ReferenceBackend.crt, lambda congruences: sum(m for _, m in congruences)),
+    "MathFunctions.eea": (ReferenceBackend.eea, lambda modulus, number: modulus),
+    "MultiplicativeGroup.get_element_order": (ReferenceBackend.element_order, lambda mod, element: mod),
+    "EllipticCurve.get_curve_order": (ReferenceBackend.curve_order, lambda field, a4, a5, a6: field),
+    "EllipticCurve.add_point": (ReferenceBackend.add_point, lambda field, a4, a5, p, q: 1),
+}
@@ -0,0 +1,190 @@
+"""Compact binary format for parameters, tables and results.
+
+A record starts with a header naming its kind, followed by a list of integers and a list of arrays.
+Integers are stored as a 4-byte length and their big-endian two's complement bytes, a length of 0
+stands for ``None``. Arrays of non-negative integers are stored as fixed-width big-endian records
+of the smallest number of bytes that fits the largest value. Records of up to 8 bytes are packed
+and unpacked with :mod:`array` and slice assignments, without a Python loop over the values.
+
+Example::
+
+    data = serialization.encode(b"point", [x, y])
+    (x, y), _ = serialization.decode(data, b"point")
+"""
+import struct
+import sys
+from array import array
+
+_MAGIC = b"MCSB"
+_VERSION = 1
+_HEADER = struct.Struct(">4sB8s")
+_LENGTH = struct.Struct(">I")
+_ARRAY = struct.Struct(">QB")
+_TYPECODES = {}
+for _typecode in "LQHIB":
+    _TYPECODES[array(_typecode).itemsize] = _typecode
+
+
+def _item_size(width: int) -> int or None:
+    """Smallest ``array`` item size holding records of ``width`` bytes, None above 8 bytes"""
+    for size in (1, 2, 4, 8):
+        if width <= size:
+            return size
+    return None
+
+
+def pack_array(values, width: int = None) -> bytes:
+    """Packs non-negative integers into fixed-width big-endian records with a count and width header
+
+    Args:
+        values (sequence of int or bytes): Non-negative integers, bytes are packed one per record
+        width (int, optional): Bytes per record. Defaults to the smallest width that fits.
+
+    Raises:
+        ValueError: If a value is negative or does not fit ``width``
+
+    Returns:
+        bytes: The packed array
+    """
+    if isinstance(values, (bytes, bytearray, memoryview)):
+        values = array("B", bytes(values))
+    elif not isinstance(values, array):
+        values = list(values)
+    signed = not isinstance(values, array) or values.typecode not in _TYPECODES.values()
+    if signed and min(values, default=0) < 0:
+        raise ValueError("Only non-negative integers can be packed into an array.")
+    needed = max(1, (max(values, default=0).bit_length() + 7) // 8)
+    width = width or needed
+    if needed > width:
+        raise ValueError(f"The values do not fit in {width} bytes.")
+    header = _ARRAY.pack(len(values), width)
+    size = _item_size(width)
+    if size is None:
+        return header + b"".join(value.to_bytes(width, "big") for value in values)
+    packed = array(_TYPECODES[size], values)
+    if sys.byteorder == "little":
+        packed.byteswap()
+    items = packed.tobytes()
+    if size == width:
+        return header + items
+    # keeps the low ``width`` bytes of every big-endian item
+    records = bytearray(len(values) * width)
+    for i in range(width):
+        records[i::width] = items[size - width + i :: size]
+    return header + records
+
+
+def unpack_array(data, offset: int = 0) -> tuple:
+    """Reads an array written by :func:`pack_array`
+
+    Args:
+        data (bytes, bytearray or memoryview): Buffer holding the array
+        offset (int, optional): Position of the array in ``data``. Defaults to 0.
+
+    Raises:
+        ValueError: If ``data`` ends before the array does
+
+    Returns:
+        (tuple): tuple containing:
+
+            - array or list: The values, an ``array`` for records of up to 8 bytes
+            - int: Position just after the array
+    """
+    if offset + _ARRAY.size > len(data):
+        raise ValueError("The data ends inside an array header.")
+    count, width = _ARRAY.unpack_from(data, offset)
+    start = offset + _ARRAY.size
+    end = start + count * width
+    if end > len(data):
+        raise ValueError("The data ends inside an array.")
+    size = _item_size(width)
+    if size is None:
+        values = [int.from_bytes(data[i : i + width], "big") for i in range(start, end, width)]
+        return values, end
+    records = bytes(data[start:end])
+    if size != width:
+        items = bytearray(count * size)
+        for i in range(width):
+            items[size - width + i :: size] = records[i::width]
+        records = items
+    values = array(_TYPECODES[size])
+    values.frombytes(records)
+    if sys.byteorder == "little":
+        values.byteswap()
+    return values, end
+
+
+def encode(kind: bytes, ints, arrays=()) -> bytes:
+    """Encodes a record
+
+    Args:
+        kind (bytes): Name of the record, at most 8 bytes, checked by :func:`decode`
+        ints (iterable of int or None): Integers of any size and sign
+        arrays (iterable, optional): Sequences of non-negative integers, or ``(values, width)`` tuples \
+            to force a width
+
+    Returns:
+        bytes: The encoded record
+    """
+    ints = list(ints)
+    parts = [_HEADER.pack(_MAGIC, _VERSION, kind), _LENGTH.pack(len(ints))]
+    for value in ints:
+        if value is None:
+            parts.append(_LENGTH.pack(0))
+            continue
+        encoded = value.to_bytes(value.bit_length() // 8 + 1, "big", signed=True)
+        parts += [_LENGTH.pack(len(encoded)), encoded]
+    arrays = list(arrays)
+    parts.append(_LENGTH.pack(len(arrays)))
+    for values in arrays:
+        parts.append(pack_array(*values) if isinstance(values, tuple) else pack_array(values))
+    return b"".join(parts)
+
+
+def decode(data, kind: bytes) -> tuple:
+    """Decodes a record written by :func:`encode`
+
+    Args:
+        data (bytes, bytearray or memoryview): The encoded record
+        kind (bytes): Expected name of the record
+
+    Raises:
+        ValueError: If ``data`` is not a record of ``kind`` or is truncated
+
+    Returns:
+        (tuple): tuple containing:
+
+            - list: The integers, ``None`` included
+            - list: The arrays, see :func:`unpack_array`
+    """
+    data = memoryview(data).cast("B")
+    if len(data) < _HEADER.size:
+        raise ValueError("The data is too short to be a record.")
+    magic, version, found = _HEADER.unpack_from(data)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError("The data is not a mathcrypto record.")
+    found = found.rstrip(b"\0")
+    if found != kind:
+        raise ValueError(f"Expected a {kind.decode()} record, got {found.decode(errors='replace')}.")
+    offset = _HEADER.size
+    try:
+        (count,) = _LENGTH.unpack_from(data, offset)
+        offset += _LENGTH.size
+        ints = []
+        for _ in range(count):
+            (length,) = _LENGTH.unpack_from(data, offset)
+            offset += _LENGTH.size
+            if offset + length > len(data):
+                raise struct.error
+            value = int.from_bytes(data[offset : offset + length], "big", signed=True) if length else None
+            ints.append(value)
+            offset += length
+        (count,) = _LENGTH.unpack_from(data, offset)
+        offset += _LENGTH.size
+    except struct.error:
+        raise ValueError("The data ends inside the integers of the record.")
+    arrays = []
+    for _ in range(count):
+        values, offset = unpack_array(data, offset)
+        arrays.append(values)
+    return ints, arrays
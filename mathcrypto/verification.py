@@ -0,0 +1,179 @@
+"""Sampled cross-checking of the optimised paths against the reference implementations.
+
+Verification is off by default. When it is on, the checked public methods hand a fraction ``verify``
+of their results to :func:`check`, which recomputes them with :mod:`mathcrypto.reference`
+and records every disagreement. The library only checks the module level ``RATE`` at the end of those
+methods, so with verification off nothing is sampled. Calls whose reference would cost more than
+``limit`` steps are skipped, the references are exponential in the size of their inputs.
+
+Verification is turned on with the ``MATHCRYPTO_VERIFY`` environment variable (the fraction to check)
+or at runtime::
+
+    from mathcrypto import verification
+
+    with verification.sampling(verify=0.01) as stats:
+        run_the_workload()
+    stats["disagreements"]
+
+Checked methods: ``Primes.is_prime``, ``Primes.factorize``, ``MathFunctions.phi``, ``MathFunctions.crt``,
+``MathFunctions.eea``, ``MultiplicativeGroup.get_element_order``, ``EllipticCurve.get_curve_order``
+and ``EllipticCurve.add_point`` over prime fields.
+"""
+import os
+import random
+from contextlib import contextmanager
+
+from . import instrumentation
+from .reference import REFERENCES
+
+RATE = 0.0
+
+# disagreements kept for inspection, every one of them is counted in any case
+_MAX_RECORDS = 1000
+_SAMPLE_BITS = 53
+_limit = 1 << 20
+_strict = False
+_rng = random.Random()
+_checked = {}
+_skipped = {}
+_mismatches = {}
+_disagreements = []
+
+
+class VerificationError(Exception):
+    """Raised by :func:`check` in strict mode when a result disagrees with the reference
+
+    Attributes:
+        record (dict): The disagreement, see :func:`snapshot`
+    """
+
+    def __init__(self, record: dict):
+        super().__init__(
+            f"{record['function']}{tuple(record['args'])} returned {record['result']!r}, "
+            f"the reference {record['expected']!r}"
+        )
+        self.record = record
+
+
+def enable(verify: float = 1.0, limit: int = 1 << 20, strict: bool = False, rng=None):
+    """Turns the verification on
+
+    Args:
+        verify (float, optional): Fraction of the calls to recheck, from 0 to 1. Defaults to 1.0.
+        limit (int, optional): Most steps of a reference computation, larger calls are skipped. \
+            Defaults to 2^20.
+        strict (bool, optional): Whether to raise :class:`VerificationError` on a disagreement \
+            instead of only recording it. Defaults to False.
+        rng (optional): Source of the sampling with a ``getrandbits`` method, like ``SeededRNG``. \
+            Defaults to a ``random.Random``.
+
+    Raises:
+        ValueError: If ``verify`` is not between 0 and 1
+    """
+    global RATE, _limit, _strict, _rng
+    if not 0 <= verify <= 1:
+        raise ValueError(f"The fraction of calls to verify must be between 0 and 1, not {verify}.")
+    RATE, _limit, _strict = float(verify), limit, strict
+    _rng = rng if rng is not None else random.Random()
+
+
+def disable():
+    """Turns the verification off. Recorded results are kept until :func:`reset`."""
+    global RATE
+    RATE = 0.0
+
+
+def reset():
+    """Clears all recorded checks and disagreements"""
+    _checked.clear()
+    _skipped.clear()
+    _mismatches.clear()
+    _disagreements.clear()
+
+
+def check(name: str, args: tuple, result):
+    """Rechecks a result against the reference with probability ``RATE``. Callers check ``RATE`` first.
+
+    Args:
+        name (str): Name of the checked method, a key of :data:`mathcrypto.reference.REFERENCES`
+        args (tuple): Arguments of the reference
+        result: Result of the optimised path
+
+    Raises:
+        VerificationError: If the result disagrees with the reference in strict mode
+    """
+    if RATE < 1 and _rng.getrandbits(_SAMPLE_BITS) >= RATE * (1 << _SAMPLE_BITS):
+        return
+    reference, cost = REFERENCES[name]
+    try:
+        if cost(*args) > _limit:
+            raise ValueError
+        expected = reference(*args)
+    except ValueError:
+        # too large or outside of the domain of the reference, so there is nothing to compare with
+        _skipped[name] = _skipped.get(name, 0) + 1
+        return
+    _checked[name] = _checked.get(name, 0) + 1
+    if instrumentation.ENABLED:
+        instrumentation.count("verify.checked")
+    if expected == result:
+        return
+    _mismatches[name] = _mismatches.get(name, 0) + 1
+    if instrumentation.ENABLED:
+        instrumentation.count("verify.mismatch")
+    record = {"function": name, "args": args, "result": result, "expected": expected}
+    if len(_disagreements) < _MAX_RECORDS:
+        _disagreements.append(record)
+    if _strict:
+        raise VerificationError(record)
+
+
+def snapshot() -> dict:
+    """Exports the recorded results
+
+    Returns:
+        dict: ``{"checked": {name: count}, "skipped": {name: count}, "mismatches": {name: count}, \
+            "disagreements": [{"function": name, "args": tuple, "result": ..., "expected": ...}]}``, \
+            at most 1000 disagreements are kept
+    """
+    return {
+        "checked": dict(_checked),
+        "skipped": dict(_skipped),
+        "mismatches": dict(_mismatches),
+        "disagreements": list(_disagreements),
+    }
+
+
+@contextmanager
+def sampling(verify: float = 1.0, limit: int = 1 << 20, strict: bool = False, rng=None):
+    """Enables verification for a block and collects what was checked in it
+
+    Args:
+        verify (float, optional): Fraction of the calls to recheck. Defaults to 1.0.
+        limit (int, optional): Most steps of a reference computation. Defaults to 2^20.
+        strict (bool, optional): Whether to raise on the first disagreement. Defaults to False.
+        rng (optional): Source of the sampling. Defaults to a ``random.Random``.
+
+    Yields:
+        dict: Empty dict filled with the :func:`snapshot` of the block only when the block exits
+    """
+    previous = (RATE, _limit, _strict, _rng)
+    before = snapshot()
+    enable(verify, limit, strict, rng)
+    stats = {}
+    try:
+        yield stats
+    finally:
+        enable(*previous)
+        after = snapshot()
+        for key in ("checked", "skipped", "mismatches"):
+            stats[key] = {
+                name: value - before[key].get(name, 0)
+                for name, value in after[key].items()
+                if value != before[key].get(name, 0)
+            }
+        stats["disagreements"] = after["disagreements"][len(before["disagreements"]) :]
+
+
+if os.environ.get("MATHCRYPTO_VERIFY"):
+    enable(float(os.environ["MATHCRYPTO_VERIFY"]))
@@ -0,0 +1,49 @@
+import asyncio
+import time
+
+import pytest
+
+from mathcrypto import aio
+from mathcrypto.cryptography.control import SolverInterrupted
+from mathcrypto.cryptography.diffie_hellman import DHCryptosystem
+from mathcrypto.cryptography.primes import Primes
+
+
+@pytest.fixture(autouse=True)
+def executors():
+    aio.configure(process_workers=1, max_concurrency=4)
+    yield
+    aio.shutdown()
+
+
+def test_async_counterparts():
+    async def main():
+        crack_me = DHCryptosystem(
+            prime=1019, generator=2, alice_sends=pow(2, 100, 1019), bob_sends=pow(2, 7, 1019)
+        )
+        return await asyncio.gather(aio.get_prime(64), aio.factorize(24), aio.baby_step(crack_me))
+
+    prime, factors, key = asyncio.run(main())
+    assert Primes.is_probable_prime_fermat(prime, 10)
+    assert factors == [2, 2, 2, 3]
+    assert key == pow(2, 700, 1019)
+
+
+def test_timeout_stops_worker():
+    async def main():
+        return await aio.factorize(1000000007 * 998244353, timeout=0.2)
+
+    with pytest.raises(SolverInterrupted):
+        asyncio.run(main())
+
+
+def test_cancellation_frees_worker():
+    async def main():
+        task = asyncio.ensure_future(aio.factorize(1000000007 * 998244353))
+        await asyncio.sleep(0.5)
+        task.cancel()
+        start = time.monotonic()
+        assert await aio.factorize(24) == [2, 2, 2, 3]
+        return time.monotonic() - start
+
+    assert asyncio.run(main()) < 5
@@ -0,0 +1,69 @@
+import pytest
+
+from mathcrypto import backend
+from mathcrypto.cryptography.diffie_hellman import DHCryptosystem
+from mathcrypto.cryptography.primes import Primes
+from mathcrypto.cryptography.rng import SeededRNG
+
+
+@pytest.fixture(params=backend.available())
+def selected(request):
+    previous = backend.get_backend().name
+    backend.set_backend(request.param)
+    yield request.param
+    backend.set_backend(previous)
+
+
+def test_primitives(selected):
+    assert backend.powmod(5, 117, 19) == pow(5, 117, 19)
+    assert backend.powmod(3, -2, 7) == pow(3, -2, 7)
+    assert backend.invert(3, 7) == 5
+    assert backend.gcd(84, 36) == 12
+    assert backend.isqrt(2**200 + 1) == 2**100
+    assert all(type(value) is int for value in (backend.powmod(2, 10, 1000), backend.isqrt(10)))
+
+
+def test_invert_not_invertible(selected):
+    with pytest.raises(ValueError):
+        backend.invert(6, 9)
+
+
+def test_is_prime_matches_sieve(selected):
+    primes = set(Primes.sieve(20000))
+    assert [num for num in range(-2, 20001) if backend.is_prime(num)] == sorted(primes)
+
+
+@pytest.mark.parametrize(
+    "num, expected",
+    [
+        (561, False),
+        (3215031751, False),
+        (3825123056546413051, False),
+        (3317044064679887385961981, False),
+        (2**61 - 1, True),
+        (2**127 - 1, True),
+        (2**521 - 1, True),
+        (2**521 + 1, False),
+    ],
+)
+def test_is_prime_large(selected, num, expected):
+    assert backend.is_prime(num) == expected
+
+
+@pytest.mark.parametrize("num, expected", [(-1, 2), (2, 3), (13, 17), (2**64, 2**64 + 13)])
+def test_next_prime(selected, num, expected):
+    assert backend.next_prime(num) == expected
+
+
+def test_same_results(selected):
+    rng = SeededRNG(41)
+    prime = Primes.get_safe_prime(64, rng=rng)
+    system = DHCryptosystem()
+    system.generate_from(prime=prime, rng=rng, primitive_root=True)
+    assert (prime, system.generator) == (12315613606026989387, 3017869574763512651)
+    assert system.alice_key == system.bob_key == 7174396548788841371
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        backend.set_backend("mpir")
@@ -0,0 +1,82 @@
+import io
+import json
+
+import pytest
+
+from mathcrypto import cli
+
+
+def _run(argv, capsys, stdin: str = None, monkeypatch=None):
+    if stdin is not None:
+        monkeypatch.setattr("sys.stdin", io.StringIO(stdin))
+    status = cli.main(argv)
+    return status, capsys.readouterr().out
+
+
+@pytest.mark.parametrize("workers, unordered", [(1, False), (2, False), (2, True)])
+def test_factorize_stdin(capsys, monkeypatch, workers, unordered):
+    argv = ["factorize", "--workers", str(workers), "--chunk-size", "3"]
+    argv += ["--unordered"] if unordered else []
+    status, out = _run(argv, capsys, "".join(f"{n}\n" for n in range(2, 40)), monkeypatch)
+    records = [json.loads(line) for line in out.splitlines()]
+    assert status == 0
+    if unordered:
+        records.sort(key=lambda record: record["n"])
+    assert [record["n"] for record in records] == list(range(2, 40))
+    assert records[34] == {"n": 36, "factors": [2, 2, 3, 3]}
+
+
+@pytest.mark.parametrize("option", ["--workers", "--chunk-size", "--max-in-flight"])
+@pytest.mark.parametrize("value", ["0", "-2", "x"])
+def test_counts_must_be_positive(capsys, option, value):
+    with pytest.raises(SystemExit) as exit_info:
+        cli.main(["phi", "--range", "5", "9", option, value])
+    assert exit_info.value.code == 2
+    assert capsys.readouterr().out == ""
+
+
+def test_phi_range_csv(capsys):
+    status, out = _run(["phi", "--range", "5", "9", "--output-format", "csv"], capsys)
+    assert status == 0
+    assert out.splitlines() == ["n,phi,error", "5,4,", "6,2,", "7,6,", "8,4,"]
+
+
+def test_csv_file_and_errors(tmp_path, capsys):
+    path = tmp_path / "elements.csv"
+    path.write_text("mod,element\n23,5\n23,2\n23,x\n")
+    output = tmp_path / "orders.jsonl"
+    status, _ = _run(["element-order", str(path), "--output", str(output)], capsys)
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert status == 1
+    assert [record.get("order") for record in records] == [22, 11, None]
+    assert "ValueError" in records[2]["error"]
+
+
+def test_headerless_csv_and_arrays(tmp_path, capsys, monkeypatch):
+    path = tmp_path / "curves.csv"
+    path.write_text("97,2,3\n")
+    status, out = _run(["curve-order", str(path)], capsys)
+    assert json.loads(out) == {"field": "97", "a": "2", "b": "3", "order": 100}
+
+    status, out = _run(["dlog"], capsys, '[23, 5, 8, 19]\n{"prime": 23}\nnot json\n', monkeypatch)
+    records = [json.loads(line) for line in out.splitlines()]
+    assert status == 1
+    assert records[0]["key"] == 2
+    assert records[1]["error"] == "missing field 'generator'"
+    assert records[2]["error"] == "invalid JSON"
+
+
+def test_dlog_methods(capsys, monkeypatch):
+    for method in ("baby-step", "pollard-rho"):
+        status, out = _run(["dlog", "--method", method], capsys, "[1019, 2, 8, 16]\n", monkeypatch)
+        assert json.loads(out)["key"] == pow(2, 3 * 4, 1019)
+
+
+def test_computation_key_error(monkeypatch):
+    def broken(n, options):
+        return {"phi": {}[n]}
+
+    monkeypatch.setitem(cli.COMMANDS, "phi", (broken, ("n",), ("phi",), ""))
+    records = cli._run_chunk("phi", [{"n": "5"}, {"m": "5"}], {})
+    assert records[0]["error"] == "KeyError: 5"
+    assert records[1]["error"] == "missing field 'n'"
@@ -0,0 +1,46 @@
+import math
+
+from mathcrypto.cryptography.batch_gcd import BatchGCD
+from mathcrypto.cryptography.primes import Primes
+from mathcrypto.cryptography.rng import SeededRNG
+
+PRIMES = [Primes.get_safe_prime(40, rng=SeededRNG(seed)) for seed in range(12)]
+
+
+def _moduli():
+    p = PRIMES
+    # 0 and 2 share p0, 2 and 4 share p4, so every factor of 2 is shared; 5 and 6 are equal
+    pairs = [(0, 1), (2, 3), (0, 4), (5, 6), (4, 7), (8, 9), (8, 9), (10, 11)]
+    return [p[i] * p[j] for i, j in pairs]
+
+
+def test_gcds():
+    moduli = _moduli()
+    pairwise = [
+        math.gcd(modulus, math.prod(other for j, other in enumerate(moduli) if j != i))
+        for i, modulus in enumerate(moduli)
+    ]
+    assert BatchGCD.gcds(moduli) == pairwise
+
+
+def test_shared_factors():
+    p = PRIMES
+    assert BatchGCD.shared_factors(_moduli()) == {
+        p[0]: [0, 2],
+        p[4]: [2, 4],
+        p[8] * p[9]: [5, 6],
+    }
+
+
+def test_shared_factors_parallel(tmp_path):
+    rng = SeededRNG(1)
+    moduli = [Primes.get_prime(48, rng=rng) * Primes.get_prime(48, rng=rng) for _ in range(300)]
+    moduli[17] = PRIMES[0] * PRIMES[1]
+    moduli[250] = PRIMES[1] * PRIMES[2]
+    shared = BatchGCD.shared_factors(moduli, num_cpus=2, spill_directory=str(tmp_path))
+    assert shared == {PRIMES[1]: [17, 250]}
+
+
+def test_nothing_shared():
+    assert BatchGCD.gcds([PRIMES[0] * PRIMES[1]]) == [1]
+    assert BatchGCD.shared_factors([PRIMES[0] * PRIMES[1], PRIMES[2] * PRIMES[3]]) == {}
@@ -0,0 +1,88 @@
+import math
+import pickle
+
+import pytest
+
+from mathcrypto import instrumentation
+from mathcrypto.cryptography.certificates import PrimalityCertificate, _rho_split
+from mathcrypto.cryptography.primes import Primes
+from mathcrypto.cryptography.rng import SeededRNG
+from mathcrypto.cryptography.table_cache import TableCache
+
+MERSENNE_127 = 2 ** 127 - 1
+# 379# + 1, the product of the primes up to 379 plus one
+PRIMORIAL_PRIME = math.prod(Primes.sieve(379)) + 1
+
+
+@pytest.mark.parametrize("bit_length,safe", [(3, True), (32, False), (100, False), (128, True), (256, True)])
+def test_generate(bit_length, safe):
+    certificate = PrimalityCertificate.generate(bit_length, safe=safe, rng=SeededRNG(bit_length))
+    assert certificate.prime.bit_length() == bit_length
+    assert certificate.verify()
+    if safe:
+        assert PrimalityCertificate(certificate.prime // 2, certificate.steps).verify()
+
+
+@pytest.mark.parametrize(
+    "prime,method", [(MERSENNE_127, "pocklington"), (PRIMORIAL_PRIME, "pratt"), (97, "miller-rabin")]
+)
+def test_prove(prime, method):
+    certificate = PrimalityCertificate.prove(prime, rng=SeededRNG(1))
+    assert certificate.method == method and certificate.verify()
+
+
+@pytest.mark.parametrize("num", [MERSENNE_127 * 3, 2 ** 89 + 1, 25])
+def test_prove_composite(num):
+    with pytest.raises(ValueError):
+        PrimalityCertificate.prove(num, rng=SeededRNG(1))
+
+
+def test_prove_with_factors():
+    # p - 1 = 2 * a * b with two 64-bit primes, too large for Pollard's rho
+    a, b = 2 ** 64 - 59, 2 ** 64 - 83
+    k = 1
+    while not Primes.is_prime(2 * k * a * b + 1):
+        k += 1
+    certificate = PrimalityCertificate.prove(2 * k * a * b + 1, factors=[a, b], rng=SeededRNG(3))
+    assert certificate.verify() and certificate.method == "pratt"
+
+
+@pytest.mark.parametrize("factors", [[1], [0], [-3], [3, 1]])
+def test_prove_rejects_factors_below_two(factors):
+    with pytest.raises(ValueError):
+        PrimalityCertificate.prove(MERSENNE_127, factors=factors, rng=SeededRNG(1))
+
+
+def test_verify_rejects_tampering():
+    certificate = PrimalityCertificate.generate(160, rng=SeededRNG(4))
+    factors, witnesses = certificate.steps[certificate.prime]
+    steps = {**certificate.steps, certificate.prime: (factors, (1,))}
+    wrong_witness = PrimalityCertificate(certificate.prime, steps)
+    assert not wrong_witness.verify()
+    small_factor = PrimalityCertificate(certificate.prime, {certificate.prime: (((2, 1),), witnesses)})
+    assert not small_factor.verify()
+    assert not PrimalityCertificate(certificate.prime + 2, certificate.steps).verify()
+    assert not PrimalityCertificate(MERSENNE_127 * 3).verify()
+
+
+def test_serialization():
+    certificate = PrimalityCertificate.generate(300, safe=True, rng=SeededRNG(5))
+    data = certificate.to_bytes()
+    for clone in (PrimalityCertificate.from_bytes(data), pickle.loads(pickle.dumps(certificate))):
+        assert clone.prime == certificate.prime and clone.steps == certificate.steps
+
+
+def test_cache(tmp_path):
+    cache = TableCache(str(tmp_path))
+    first = PrimalityCertificate.prove(MERSENNE_127, cache=cache, rng=SeededRNG(1))
+    with instrumentation.collect() as stats:
+        second = PrimalityCertificate.prove(MERSENNE_127, cache=cache)
+    assert second.steps == first.steps
+    assert stats["counters"]["prime_certificate.cache_hit"] == 1
+    assert stats["counters"]["certificate.verify"] == 1
+
+
+@pytest.mark.parametrize("num", [91, 10403, 1000003 * 1000033])
+def test_rho_split(num):
+    divisor = _rho_split(num, SeededRNG(6))
+    assert 1 < divisor < num and num % divisor == 0
@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+from mathcrypto.cryptography.control import CancellationToken, SolverControl, SolverInterrupted
+from mathcrypto.cryptography.diffie_hellman import DHCracker, DHCryptosystem
+from mathcrypto.cryptography.elliptic_curves import EllipticCurve
+from mathcrypto.cryptography.primes import Primes
+
+
+def test_baby_step_resumes_from_checkpoint():
+    crack_me = DHCryptosystem(prime=1000003, generator=2, alice_sends=pow(2, 999000, 1000003))
+    crack_me.bob_sends = pow(2, 12345, 1000003)
+    expected = DHCracker.baby_step(crack_me)
+
+    control = SolverControl(max_iterations=64, check_every=32)
+    with pytest.raises(SolverInterrupted) as interrupted:
+        DHCracker.baby_step(crack_me, control=control)
+    assert interrupted.value.reason == "budget"
+
+    checkpoint = json.loads(json.dumps(interrupted.value.checkpoint))
+    assert DHCracker.baby_step(crack_me, control=SolverControl(checkpoint=checkpoint)) == expected
+
+
+def test_baby_step_many_resumes_from_json_checkpoint():
+    prime, generator = 1000003, 2
+    targets = [pow(generator, log, prime) for log in (999000, 12345, 7, 500000)]
+    control = SolverControl(max_iterations=64, check_every=32)
+    found = {}
+    with pytest.raises(SolverInterrupted) as interrupted:
+        for index, log in DHCracker.baby_step_many(prime, generator, targets, control=control):
+            found[index] = log
+
+    checkpoint = json.loads(json.dumps(interrupted.value.checkpoint))
+    control = SolverControl(checkpoint=checkpoint)
+    found.update(DHCracker.baby_step_many(prime, generator, targets, control=control))
+    assert sorted(found) == [0, 1, 2, 3]
+    assert all(pow(generator, log, prime) == targets[index] for index, log in found.items())
+
+
+def test_factorize_resumes_from_checkpoint():
+    num = 2 * 2 * 1009 * 1013
+    control = SolverControl(max_iterations=100, check_every=100)
+    with pytest.raises(SolverInterrupted) as interrupted:
+        Primes.factorize(num, control=control)
+    resumed = Primes.factorize(num, control=SolverControl(checkpoint=interrupted.value.checkpoint))
+    assert resumed == [2, 2, 1009, 1013]
+
+
+def test_cancelled_token_stops_solver():
+    token = CancellationToken()
+    token.cancel()
+    curve = EllipticCurve(1, 0, 0, 1, 0, 2, 3, 97)
+    with pytest.raises(SolverInterrupted) as interrupted:
+        curve.get_all_point_order(control=SolverControl(token=token))
+    assert interrupted.value.reason == "cancelled"
+
+
+def test_progress_callback():
+    calls = []
+    crack_me = DHCryptosystem(prime=1000003, generator=2, alice_sends=pow(2, 999000, 1000003), bob_sends=2)
+    control = SolverControl(
+        progress=lambda done, total: calls.append(done), progress_every=100, check_every=100
+    )
+    DHCracker.baby_step(crack_me, control=control)
+    assert calls and calls[0] == 100
+
+
+def test_brute_force_deadline():
+    crack_me = DHCryptosystem(prime=2147483647, generator=7, alice_sends=5, bob_sends=5)
+    with pytest.raises(SolverInterrupted) as interrupted:
+        DHCracker.brute_force(crack_me, 2, control=SolverControl(timeout=0.2))
+    assert interrupted.value.reason == "deadline"
@@ -0,0 +1,61 @@
+import pytest
+
+from mathcrypto.cryptography.curve_search import CurveCandidate, CurveSearch
+from mathcrypto.cryptography.elliptic_curves import EllipticCurve, count_points
+from mathcrypto.cryptography.primes import Primes
+
+
+@pytest.mark.parametrize("field", [5, 7, 13, 97, 101])
+def test_count_points(field):
+    for a4, a5, a6 in [(0, 1, 1), (0, 2, 3), (3, 5, 7), (0, 0, 1), (1, field - 1, 0)]:
+        points = sum(
+            1
+            for x in range(field)
+            for y in range(field)
+            if (y * y - x ** 3 - a4 * x * x - a5 * x - a6) % field == 0
+        )
+        assert count_points(field, a4, a5, a6) == points + 1
+        assert EllipticCurve(1, 0, 0, 1, a4, a5, a6, field).get_curve_order() == points + 1
+
+
+@pytest.mark.parametrize("num_workers", [1, 2])
+def test_search_prime_order(num_workers):
+    found = list(
+        CurveSearch.search(
+            range(100, 130), range(0, 6), range(1, 6), prime_order=True, num_workers=num_workers
+        )
+    )
+    assert found
+    for candidate in found:
+        assert Primes.is_prime(candidate.field)
+        assert Primes.is_prime(candidate.order)
+        assert candidate.curve().get_curve_order(get_points=True)[0] == candidate.order
+    expected = [
+        CurveCandidate(field, a, b, order)
+        for field in (101, 103, 107, 109, 113, 127)
+        for a in range(0, 6)
+        for b in range(1, 6)
+        if (4 * a ** 3 + 27 * b * b) % field
+        for order in [count_points(field, 0, a, b)]
+        if Primes.is_prime(order)
+    ]
+    assert sorted(found, key=repr) == sorted(expected, key=repr)
+
+
+def test_search_twists_and_predicate():
+    found = list(
+        CurveSearch.search(
+            1009, range(0, 10), range(1, 10), cofactor=4, twists=True, predicate=lambda c: c.order > 1000
+        )
+    )
+    assert any(candidate.twist for candidate in found)
+    for candidate in found:
+        assert candidate.order > 1000 and candidate.order % 4 == 0
+        assert count_points(1009, 0, candidate.a, candidate.b) == candidate.order
+
+
+def test_search_embedding_degree():
+    # y^2 = x^3 + b over p = 2 (mod 3) is supersingular with p + 1 points and embedding degree 2
+    found = list(CurveSearch.search([1013, 1019], [0], [1, 2], embedding_degree=2))
+    assert [(c.field, c.order) for c in found] == [(1013, 1014), (1013, 1014), (1019, 1020), (1019, 1020)]
+    assert CurveSearch.embedding_degree(1013, 1014) == 2
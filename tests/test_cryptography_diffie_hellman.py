@@ -0,0 +1,59 @@
+import pytest
+
+from mathcrypto.cryptography.diffie_hellman import DHCracker, DHCryptosystem, DHSession
+from mathcrypto.cryptography.rng import SeededRNG
+
+
+@pytest.mark.parametrize("count,num_cpus,chunk_size", [(10, 1, 3), (25, 2, 4)])
+def test_generate_sessions(count, num_cpus, chunk_size):
+    dh = DHCryptosystem(prime=1019, generator=2)
+    sessions = list(dh.generate_sessions(count, num_cpus=num_cpus, chunk_size=chunk_size))
+    assert len(sessions) == count
+    assert dh.verify_sessions(sessions, recompute=True) == []
+
+
+def test_verify_sessions_reports_mismatch():
+    dh = DHCryptosystem(prime=23, generator=5)
+    sessions = [DHSession(6, 15, 8, 19, 2, 2), DHSession(6, 15, 8, 19, 2, 3)]
+    assert dh.verify_sessions(sessions) == [1]
+
+
+@pytest.mark.parametrize(
+    "prime,generator,logs",
+    [(1019, 2, [0, 1, 5, 500, 1017, 5]), (7919, 7, list(range(0, 7918, 97))), (23, 5, [3])],
+)
+def test_baby_step_many(prime, generator, logs):
+    targets = [pow(generator, log, prime) for log in logs]
+    results = dict(DHCracker.baby_step_many(prime, generator, targets))
+    assert sorted(results) == list(range(len(targets)))
+    for index, log in results.items():
+        assert pow(generator, log, prime) == targets[index]
+
+
+def test_baby_step_many_outside_group():
+    # 2 generates the subgroup of order 11 in Z_23^*, 5 is not in it
+    results = dict(DHCracker.baby_step_many(23, 2, [4, 5], order=11))
+    assert results[0] == 2
+    assert results[1] is None
+
+
+def test_generate_from_primitive_root():
+    dh = DHCryptosystem()
+    dh.generate_from(bit_length=64, primitive_root=True, rng=SeededRNG(3))
+    assert dh.check_generator()
+    assert dh.alice_key == dh.bob_key
+    assert not DHCryptosystem(prime=23, generator=2).check_generator()
+
+
+@pytest.mark.parametrize("num_chunks", [1, 2, 3, 8])
+def test_chunker_covers_every_exponent(num_chunks):
+    chunks = DHCracker._chunker(num_chunks, 1019)
+    assert len(chunks) == num_chunks
+    assert set(range(1019)) <= {exponent for chunk in chunks for exponent in chunk}
+
+
+@pytest.mark.parametrize("prime, chunk_size", [(3, 16), (1019, 0), (1019, -1)])
+def test_generate_sessions_invalid(prime, chunk_size):
+    dh = DHCryptosystem(prime=prime, generator=2)
+    with pytest.raises(ValueError):
+        list(dh.generate_sessions(10, chunk_size=chunk_size))
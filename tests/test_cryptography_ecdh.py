@@ -0,0 +1,101 @@
+import pytest
+
+from mathcrypto.cryptography.ecdh import CURVES, ECDHCryptosystem
+from mathcrypto.cryptography.elliptic_curves import EllipticCurve
+from mathcrypto.cryptography.rng import SeededRNG
+
+
+def _naive_multiples(curve, point, count):
+    """``[k * point for k in range(count)]`` by repeated addition"""
+    field = curve.field
+    multiples = ["[∞,∞]", point]
+    while len(multiples) < count:
+        previous = multiples[-1]
+        if previous == "[∞,∞]":
+            multiples.append(point)
+            continue
+        added = EllipticCurve(*curve.attributes, field, *previous).add_point(*point)
+        multiples.append(added if added == "[∞,∞]" else [added[0] % field, added[1] % field])
+    return multiples
+
+
+@pytest.mark.parametrize("attributes, field", [((1, 0, 0, 1, 0, 2, 3), 101), ((1, 0, 0, 1, 2, 3, 5), 97)])
+@pytest.mark.parametrize("window", [1, 3, 4])
+def test_multiply_small_curve(attributes, field, window):
+    curve = EllipticCurve(*attributes, field)
+    points = [point for point in curve.get_curve_order(get_points=True)[1] if point != "[∞,∞]"]
+    for x, y in points[:4]:
+        point = [x % field, y % field]
+        system = ECDHCryptosystem(curve, window=window)
+        system.generate_from(generator=point, rng=SeededRNG(field))
+        assert system.alice_key == system.bob_key
+        multiples = _naive_multiples(curve, point, 2 * system.order + 2)
+        for k, expected in enumerate(multiples):
+            assert system.multiply(point, k) == expected
+            assert system.multiply_generator(k) == expected
+
+
+def test_multiply_negative_scalar():
+    curve = EllipticCurve(1, 0, 0, 1, 2, 3, 5, 97)
+    system = ECDHCryptosystem(curve)
+    system.generate_from(generator=[2, 67], rng=SeededRNG(1))
+    assert system.multiply([2, 67], -1) == [2, 30]
+    for k in range(1, 2 * system.order):
+        assert system.multiply([2, 67], -k) == system.multiply([2, 30], k) == system.multiply_generator(-k)
+
+
+@pytest.mark.parametrize("name", list(CURVES))
+def test_named_curves(name):
+    system = ECDHCryptosystem.named(name)
+    assert system.multiply(system.generator, system.order) == "[∞,∞]"
+    system.generate_from(rng=SeededRNG(1))
+    assert system.alice_key == system.bob_key
+    assert system.multiply_generator(system.alice_secret) == system.alice_sends
+    assert system.decompress(system.compress(system.alice_key)) == system.alice_key
+    assert len(system.compress(system.alice_key)) == 33
+
+
+def test_secp256k1_known_multiple():
+    system = ECDHCryptosystem.named("secp256k1")
+    assert system.multiply_generator(2) == [
+        0xC6047F9441ED7D6D3045406E95C07CD85C778E4B8CEF3CA7ABAC09B95C709EE5,
+        0x1AE168FEA63DC339A3C58419466CEAEEF7F632653266D0E1236431A950CFE52A,
+    ]
+
+
+@pytest.mark.parametrize("num_cpus", [1, 2])
+def test_generate_keys(num_cpus):
+    system = ECDHCryptosystem.named("P-256")
+    keys = list(system.generate_keys(40, num_cpus=num_cpus, chunk_size=16, rng=SeededRNG(7)))
+    assert keys == list(system.generate_keys(40, chunk_size=16, rng=SeededRNG(7)))
+    for secret, point in keys[:5]:
+        assert system.multiply(system.generator, secret) == point
+
+
+@pytest.mark.parametrize("chunk_size", [0, -16])
+def test_generate_keys_invalid_chunk_size(chunk_size):
+    with pytest.raises(ValueError):
+        list(ECDHCryptosystem.named("P-256").generate_keys(40, chunk_size=chunk_size))
+
+
+def test_generate_rest():
+    system = ECDHCryptosystem.named("secp256k1", alice_secret=12345)
+    system.generate_rest(rng=SeededRNG(2))
+    assert system.alice_key == system.bob_key
+    assert system.alice_sends == system.multiply_generator(12345)
+
+    system = ECDHCryptosystem.named("secp256k1", alice_sends=[1, 2])
+    with pytest.raises(ValueError):
+        system.generate_rest()
+
+
+def test_invalid():
+    system = ECDHCryptosystem.named("P-256")
+    with pytest.raises(ValueError):
+        system.decompress(b"\x04" + bytes(32))
+    with pytest.raises(ValueError):
+        system.multiply([1, 2], 5)
+    with pytest.raises(ValueError):
+        ECDHCryptosystem().generate_from()
+    with pytest.raises(ValueError):
+        ECDHCryptosystem.named("curve25519")
@@ -0,0 +1,34 @@
+import os
+
+import pytest
+
+from mathcrypto import instrumentation
+from mathcrypto.cryptography.diffie_hellman import DHCracker, DHCryptosystem
+from mathcrypto.cryptography.index_calculus import IndexCalculus
+from mathcrypto.cryptography.rng import SeededRNG
+
+PRIME = 1000000007  # (p - 1) / 2 is prime, 5 is a primitive root
+
+
+@pytest.mark.parametrize("secret", [1, 123456789, 999999999])
+def test_discrete_log(secret):
+    assert IndexCalculus.discrete_log(PRIME, 5, pow(5, secret, PRIME), rng=SeededRNG(secret)) == secret
+
+
+def test_discrete_log_smooth_order():
+    # 1000003 - 1 = 2 * 3 * 166667, 2 is a primitive root
+    assert IndexCalculus.discrete_log(1000003, 2, pow(2, 4321, 1000003)) == 4321
+
+
+def test_index_calculus_cache(tmp_path):
+    crack_me = DHCryptosystem(
+        prime=PRIME, generator=5, alice_sends=pow(5, 1234, PRIME), bob_sends=pow(5, 99, PRIME)
+    )
+    key = DHCracker.index_calculus(crack_me, num_workers=2, cache=str(tmp_path))
+    assert key == pow(5, 1234 * 99, PRIME)
+    assert len(os.listdir(tmp_path)) == 2
+
+    crack_me.alice_sends = pow(5, 4321, PRIME)
+    with instrumentation.collect() as stats:
+        assert DHCracker.index_calculus(crack_me, cache=str(tmp_path)) == pow(5, 4321 * 99, PRIME)
+    assert stats["counters"]["index_calculus.cache_hit"] == 1
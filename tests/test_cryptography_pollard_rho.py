@@ -0,0 +1,24 @@
+import pytest
+
+from mathcrypto.cryptography.diffie_hellman import DHCracker, DHCryptosystem
+from mathcrypto.cryptography.pollard_rho import PollardRho, SQLiteStore
+from mathcrypto.cryptography.rng import SeededRNG
+
+PRIME = 1000003  # 2 is a primitive root
+
+
+@pytest.mark.parametrize("secret", [1, 12345, 999000])
+def test_discrete_log(secret):
+    log = PollardRho.discrete_log(PRIME, 2, pow(2, secret, PRIME), rng=SeededRNG(secret))
+    assert pow(2, log, PRIME) == pow(2, secret, PRIME)
+
+
+def test_pollard_rho_with_workers_and_sqlite(tmp_path):
+    crack_me = DHCryptosystem(
+        prime=PRIME, generator=2, alice_sends=pow(2, 4242, PRIME), bob_sends=pow(2, 77, PRIME)
+    )
+    store = SQLiteStore(str(tmp_path / "points.sqlite"))
+    key = DHCracker.pollard_rho(crack_me, num_workers=2, store=store)
+    assert key == pow(2, 4242 * 77, PRIME)
+    assert len(store) > 0
+    store.close()
@@ -1,6 +1,7 @@
 import pytest
 
 from mathcrypto.cryptography.primes import Primes
+from mathcrypto.cryptography.rng import SeededRNG
 
 
 @pytest.mark.parametrize("num", [32, 64, 128])
@@ -8,7 +9,9 @@ def test_get_prime(num):
     assert Primes.is_probable_prime_fermat(Primes.get_prime(num), 10)
 
 
-@pytest.mark.parametrize("num,expected", [(13, True), (240, False), (17, True)])
+@pytest.mark.parametrize(
+    "num,expected", [(13, True), (240, False), (17, True), (2, True), (9, False), (25, False), (121, False)]
+)
 def test_is_prime(num, expected):
     assert Primes.is_prime(num) == expected
 
@@ -21,3 +24,17 @@ def test_is_probable_prime_fermat(num, expected):
 @pytest.mark.parametrize("num,expected", [(123, [3, 41]), (13, [13]), (24, [2, 2, 2, 3])])
 def test_factorize(num, expected):
     assert Primes.factorize(num) == expected
+
+
+@pytest.mark.parametrize("bit_length", [3, 8, 32, 128])
+def test_get_safe_prime(bit_length):
+    prime = Primes.get_safe_prime(bit_length, rng=SeededRNG(bit_length))
+    assert prime.bit_length() == bit_length
+    assert Primes.is_prime(prime) and Primes.is_prime((prime - 1) // 2)
+
+
+def test_get_safe_prime_rejects_carmichael_halves():
+    # with Fermat tests 2 * 561 + 1 = 1123 came out for about 1 seed in 250
+    for seed in range(1000):
+        prime = Primes.get_safe_prime(11, rng=SeededRNG(seed))
+        assert Primes.is_prime((prime - 1) // 2), seed
@@ -0,0 +1,42 @@
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from mathcrypto.cryptography.diffie_hellman import DHCryptosystem
+from mathcrypto.cryptography.primes import Primes
+from mathcrypto.cryptography.rng import SeededRNG, SystemRNG
+
+
+def test_seeded_rng_is_reproducible():
+    assert Primes.get_prime(64, rng=SeededRNG(7)) == Primes.get_prime(64, rng=SeededRNG(7))
+    assert SeededRNG(7).spawn(1).getrandbits(64) != SeededRNG(7).spawn(2).getrandbits(64)
+
+
+@pytest.mark.parametrize("a,b", [(0, 0), (1, 6), (2, 2 ** 100)])
+def test_system_rng_randint_range(a, b):
+    rng = SystemRNG(buffer_size=16)
+    for _ in range(50):
+        assert a <= rng.randint(a, b) <= b
+
+
+def test_system_rng_pickle_drops_buffer():
+    rng = SystemRNG()
+    rng.getrandbits(8)
+    clone = pickle.loads(pickle.dumps(rng))
+    assert not hasattr(clone._local, "buffer")
+
+
+def test_system_rng_threads_never_share_bytes():
+    rng = SystemRNG(buffer_size=64)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        draws = list(executor.map(lambda _: [rng.getrandbits(128) for _ in range(200)], range(8)))
+    values = [value for draw in draws for value in draw]
+    assert len(set(values)) == len(values)
+
+
+def test_generate_sessions_independent_of_num_cpus():
+    dh = DHCryptosystem(prime=1019, generator=2)
+    single = [s.alice_secret for s in dh.generate_sessions(12, num_cpus=1, chunk_size=5, rng=SeededRNG(3))]
+    multi = [s.alice_secret for s in dh.generate_sessions(12, num_cpus=2, chunk_size=5, rng=SeededRNG(3))]
+    assert single == multi
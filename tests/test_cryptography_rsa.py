@@ -0,0 +1,60 @@
+import pytest
+
+from mathcrypto.cryptography.primes import Primes
+from mathcrypto.cryptography.rng import SeededRNG
+from mathcrypto.cryptography.rsa import RSA, RSAPrivateKey, RSAPublicKey
+
+
+@pytest.mark.parametrize("bit_length", [16, 17, 64, 512])
+def test_generate(bit_length):
+    key = RSA.generate(bit_length, rng=SeededRNG(bit_length))
+    assert key.bit_length == bit_length
+    assert Primes.is_prime(key.p) and Primes.is_prime(key.q)
+    assert key.e * key.d % ((key.p - 1) * (key.q - 1)) == 1
+    assert key.q * key.q_inv % key.p == 1
+    assert RSA.generate(bit_length, rng=SeededRNG(bit_length)).n == key.n
+
+
+def test_textbook_key():
+    key = RSAPrivateKey(61, 53, 17)
+    assert (key.n, key.d, key.dp, key.dq, key.q_inv) == (3233, 2753, 53, 49, 38)
+    assert key.public_key == RSAPublicKey(3233, 17)
+    assert key.public_key.encrypt(65) == 2790
+    assert key.decrypt(2790) == 65
+    assert key.public_key.verify(65, key.sign(65))
+    assert not key.public_key.verify(66, key.sign(65))
+
+
+def test_invalid_keys():
+    with pytest.raises(ValueError):
+        RSAPrivateKey(61, 61)
+    with pytest.raises(ValueError):
+        RSAPrivateKey(61, 53, 3)  # 3 divides 52
+    with pytest.raises(ValueError):
+        RSAPrivateKey(61, 53, 17).decrypt(3233)
+
+
+@pytest.mark.parametrize("num_cpus", [1, 2])
+def test_bulk(num_cpus):
+    key = RSA.generate(128, rng=SeededRNG(3))
+    rng = SeededRNG(4)
+    messages = [rng.randrange(0, key.n) for _ in range(500)]
+    ciphertexts = list(key.public_key.encrypt_many(messages, num_cpus=num_cpus, chunk_size=64))
+    assert ciphertexts == [pow(message, key.e, key.n) for message in messages]
+    assert list(key.decrypt_many(ciphertexts, num_cpus=num_cpus, chunk_size=64)) == messages
+    assert list(key.sign_many(messages[:10])) == [pow(message, key.d, key.n) for message in messages[:10]]
+
+
+@pytest.mark.parametrize("bit_length, e", [(15, 65537), (8, 3), (64, 4), (64, 65536), (64, 1), (64, -3)])
+def test_generate_invalid(bit_length, e):
+    with pytest.raises(ValueError):
+        RSA.generate(bit_length, e, rng=SeededRNG(1))
+
+
+@pytest.mark.parametrize("num_cpus, chunk_size", [(0, 64), (-1, 64), (1, 0), (2, -5)])
+def test_bulk_invalid(num_cpus, chunk_size):
+    key = RSAPrivateKey(61, 53, 17)
+    with pytest.raises(ValueError):
+        key.public_key.encrypt_many([65], num_cpus=num_cpus, chunk_size=chunk_size)
+    with pytest.raises(ValueError):
+        key.decrypt_many([2790], num_cpus=num_cpus, chunk_size=chunk_size)
@@ -0,0 +1,57 @@
+import os
+import pickle
+
+from mathcrypto import instrumentation
+from mathcrypto.cryptography.diffie_hellman import DHCracker, DHCryptosystem
+from mathcrypto.cryptography.primes import Primes
+from mathcrypto.cryptography.table_cache import IntMap, IntTable, TableCache
+
+
+def test_int_table_roundtrip():
+    values = [0, 1, 255, 256, 2 ** 70]
+    table = IntTable(*IntTable.pack(values))
+    assert list(table) == values
+    assert table[-1] == 2 ** 70
+    assert table.index(256) == 3
+    assert list(pickle.loads(pickle.dumps(table))) == values
+
+
+def test_int_map():
+    mapping = IntMap.from_dict({7: 1, 3: 2, 11: 3})
+    assert 3 in mapping and 4 not in mapping
+    assert mapping[11] == 3
+
+
+def test_cached_baby_step(tmp_path):
+    cache = TableCache(str(tmp_path))
+    crack_me = DHCryptosystem(prime=1000003, generator=2, alice_sends=pow(2, 999000, 1000003), bob_sends=2)
+    expected = DHCracker.baby_step(crack_me)
+    assert DHCracker.baby_step(crack_me, cache=cache) == expected
+    with instrumentation.collect() as stats:
+        assert DHCracker.baby_step(crack_me, cache=cache) == expected
+    assert stats["counters"]["bsgs.cache_hit"] == 1
+    assert "bsgs.cache_miss" not in stats["counters"]
+
+
+def test_cached_sieve_and_eviction(tmp_path):
+    cache = TableCache(str(tmp_path), max_bytes=1000)
+    assert list(Primes.sieve(1000, cache=cache)) == Primes.sieve(1000)
+    Primes.sieve(2000, cache=cache)
+    assert len(os.listdir(tmp_path)) == 1
+    assert cache.get("primes", (1000,)) is None
+
+
+def test_tables_are_closed_before_replace_and_evict(tmp_path):
+    cache = TableCache(str(tmp_path), max_bytes=500)
+    table = cache.put("primes", (100,), {"primes": Primes.sieve(100)})
+    assert cache.get("primes", (100,)) is table
+    stored_again = cache.put("primes", (100,), {"primes": Primes.sieve(100)})
+    assert table.closed and not stored_again.closed
+    cache.put("primes", (2000,), {"primes": Primes.sieve(2000)})
+    assert stored_again.closed
+    with cache:
+        with cache.get("primes", (2000,)) as reopened:
+            assert reopened["primes"][0] == 2
+        assert reopened.closed
+        kept = cache.get("primes", (2000,))
+    assert kept.closed and kept.columns == {}
@@ -0,0 +1,143 @@
+import json
+import math
+
+import pytest
+
+from mathcrypto import instrumentation
+from mathcrypto.cryptography.diffie_hellman import DHCryptosystem
+from mathcrypto.cryptography.elliptic_curves import count_points
+from mathcrypto.cryptography.primes import Primes
+from mathcrypto.cryptography.rng import SeededRNG
+from mathcrypto.dispatch import _DEFAULT_UNITS, Dispatcher, Profile
+from mathcrypto.math.funcs import MathFunctions
+
+# unit of work of every algorithm, see Profile
+UNITS = {
+    "mov_attack": "scan",
+    "brute_force": "brute_force",
+    "baby_step": "baby_step",
+    "pollard_rho": "pollard_rho",
+    "index_calculus": "index_calculus",
+    "trial_division": "trial_division",
+    "table": "table_step",
+    "legendre": "legendre",
+}
+
+
+def forcing(algorithm):
+    """Profile in which ``algorithm`` is by far the cheapest"""
+    units = {name: 1000.0 for name in _DEFAULT_UNITS}
+    units.update({"spawn": 0.0, "baby_step_bytes": 1.0, UNITS.get(algorithm, "rho_split"): 1e-12})
+    return Profile(units)
+
+
+def dh(prime, generator, seed=1):
+    system = DHCryptosystem(prime=prime, generator=generator)
+    system.generate_rest(rng=SeededRNG(seed))
+    return system
+
+
+DLOG = ["mov_attack", "brute_force", "baby_step", "pollard_rho", "index_calculus"]
+
+
+@pytest.mark.parametrize("algorithm", DLOG)
+def test_solve_dlog(algorithm):
+    system = dh(1019, 2)
+    with instrumentation.collect() as stats:
+        key = Dispatcher.solve_dlog(system.public(), forcing(algorithm), max_workers=1, rng=SeededRNG(2))
+    assert key == system.alice_key
+    assert stats["counters"][f"dispatch.dlog.{algorithm}"] == 1
+
+
+def test_solve_dlog_index_calculus_needs_primitive_root():
+    # 4 generates the subgroup of order 509 modulo 1019
+    system = dh(1019, 4)
+    profile = forcing("index_calculus")
+    profile.units["baby_step"] = 1e-6
+    with instrumentation.collect() as stats:
+        assert Dispatcher.solve_dlog(system.public(), profile, max_workers=1) == system.alice_key
+    assert "dispatch.dlog.index_calculus" not in stats["counters"]
+    assert stats["counters"]["dispatch.dlog.baby_step"] == 1
+
+
+@pytest.mark.parametrize("algorithm", ["trial_division", "pollard_rho"])
+@pytest.mark.parametrize(
+    "num",
+    [1, 2, 97, 561, 1024, 2 ** 16 * 3 ** 5, 1000003 * 1000033, 2 ** 64 + 1, 65537 ** 2 * 101],
+)
+def test_factor(num, algorithm):
+    factors = Dispatcher.factor(num, forcing(algorithm), rng=SeededRNG(num))
+    assert factors == sorted(factors)
+    assert math.prod(factors) == num
+    assert all(Primes.is_prime(factor) for factor in factors) or factors == [1]
+    if num < 1 << 40:
+        assert factors == Primes.factorize(num)
+
+
+@pytest.mark.parametrize("num", [1, 2, 36, 97, 561, 1000, 2 ** 32 + 1])
+def test_phi(num):
+    assert Dispatcher.phi(num) == MathFunctions.phi(num)
+
+
+@pytest.mark.parametrize("algorithm", ["table", "legendre"])
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_count_points(algorithm, max_workers):
+    profile = forcing(algorithm)
+    assert Dispatcher.plan("count_points", 10007, profile, max_workers) == (algorithm, max_workers)
+    assert Dispatcher.count_points(10007, 0, 2, 3, profile, max_workers) == count_points(10007, 0, 2, 3)
+
+
+def test_rank():
+    profile = Profile()
+    ranking = profile.rank("dlog", 2 ** 40 + 15, max_workers=8, memory=1 << 40)
+    assert [seconds for seconds, _, _ in ranking] == sorted(seconds for seconds, _, _ in ranking)
+    algorithms = [algorithm for _, algorithm, _ in ranking]
+    # brute force shares the key through a C int
+    assert "brute_force" not in algorithms
+    assert "baby_step" in algorithms
+    # the baby-step table of a 40 bit prime takes about 100 MB
+    assert "baby_step" not in [algorithm for _, algorithm, _ in profile.rank("dlog", 2 ** 40, memory=1 << 20)]
+    assert all(workers == 1 for _, _, workers in profile.rank("dlog", 2 ** 40, max_workers=1))
+    with pytest.raises(ValueError):
+        profile.rank("sorting", 10)
+
+
+def test_crossovers():
+    profile = Profile()
+    changes = profile.crossovers("dlog", max_bits=96, max_workers=1, memory=1 << 30)
+    algorithms = [algorithm for _, algorithm, _ in changes]
+    assert algorithms == ["mov_attack", "baby_step", "pollard_rho", "index_calculus"]
+    assert [bits for bits, _, _ in changes] == sorted(bits for bits, _, _ in changes)
+    # slower processes push parallel counting to larger fields
+    fast, slow = Profile({"spawn": 0.001}), Profile({"spawn": 1.0})
+    assert any(workers > 1 for _, _, workers in fast.crossovers("count_points", 24, 8, 1 << 30))
+    assert all(workers == 1 for _, _, workers in slow.crossovers("count_points", 24, 8, 1 << 30))
+
+
+def test_profile_save_load(tmp_path, monkeypatch):
+    path = str(tmp_path / "profile.json")
+    profile = Profile({"spawn": 0.5}, {"cpus": 3})
+    assert profile.save(path) == path
+    loaded = Profile.load(path)
+    assert loaded.units == profile.units
+    assert loaded.machine == {"cpus": 3}
+
+    with open(path, "w") as file:
+        json.dump({"version": 0}, file)
+    with pytest.raises(ValueError):
+        Profile.load(path)
+
+    monkeypatch.setenv("MATHCRYPTO_PROFILE", str(tmp_path / "missing.json"))
+    monkeypatch.setattr(Profile, "_default", None)
+    assert Profile.default().units == _DEFAULT_UNITS
+    monkeypatch.setattr(Profile, "_default", None)
+    monkeypatch.setenv("MATHCRYPTO_PROFILE", str(tmp_path / "new" / "profile.json"))
+    profile.save()
+    assert Profile.default().units["spawn"] == 0.5
+
+
+def test_calibrate():
+    profile = Profile.calibrate(repeat=1)
+    assert set(profile.units) == set(_DEFAULT_UNITS)
+    assert all(0 < value < 1000 for value in profile.units.values())
+    assert "calibrated" in profile.machine
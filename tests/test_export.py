@@ -0,0 +1,134 @@
+import ast
+import json
+import math
+from array import array
+
+import pytest
+
+from mathcrypto.cryptography.elliptic_curves import EllipticCurve
+from mathcrypto.export import ArrayWriter, Export
+from mathcrypto.math.groups import MultiplicativeGroup
+
+
+def load(path):
+    """Reads an exported file without numpy, checking the .npy header against the description"""
+    with open(str(path) + ".json") as file:
+        meta = json.load(file)
+    with open(path, "rb") as file:
+        data = file.read()
+    if meta["format"] == "npy":
+        assert data[:8] == b"\x93NUMPY\x01\x00"
+        length = int.from_bytes(data[8:10], "little")
+        header = ast.literal_eval(data[10 : 10 + length].decode())
+        assert 10 + length == meta["offset"]
+        assert header == {"descr": meta["dtype"], "fortran_order": False, "shape": tuple(meta["shape"])}
+    values = array({1: "B", 2: "H", 4: "I", 8: "Q"}[int(meta["dtype"][2:])])
+    values.frombytes(data[meta["offset"] :])
+    if len(meta["shape"]) == 2:
+        width = meta["shape"][1]
+        return meta, [list(values[i : i + width]) for i in range(0, len(values), width)]
+    return meta, list(values)
+
+
+@pytest.mark.parametrize("field,a,b", [(97, 2, 3), (101, 0, 7), (103, 1, 0)])
+def test_iter_points(field, a, b):
+    curve = EllipticCurve(1, 0, 0, 1, 0, a, b, field)
+    order, points = curve.get_curve_order(get_points=True)
+    iterated = list(curve.iter_points())
+    assert len(iterated) == order
+    # get_curve_order gives negative roots, iter_points reduces them modulo the field
+    reduced = [point if point == "[∞,∞]" else [point[0] % field, point[1] % field] for point in points]
+    assert sorted(map(str, iterated)) == sorted(map(str, reduced))
+
+
+def test_iter_points_unsupported():
+    with pytest.raises(ValueError):
+        next(EllipticCurve(1, 0, 0, 1, 0, 2, 3, 91).iter_points())
+
+
+@pytest.mark.parametrize("file_format", ["npy", "raw"])
+def test_curve_points(tmp_path, file_format):
+    curve = EllipticCurve(1, 0, 0, 1, 0, 2, 3, 97)
+    path = tmp_path / "points"
+    description = Export.curve_points(curve, str(path), orders=True, file_format=file_format, chunk_size=7)
+    meta, rows = load(path)
+    assert description == meta
+    assert meta["shape"] == [curve.get_curve_order(), 3]
+    assert meta["columns"] == ["x", "y", "order"]
+    assert rows[-1] == [97, 0, 1]
+    for x, y, order in rows[:-1]:
+        assert curve.is_point_on_elliptic_curve(x, y)
+        assert curve.get_point_order(x, y) == order
+
+
+def test_curve_points_order_above_field(tmp_path, monkeypatch):
+    # the order of a curve over a field just below 2^32 can need 8 bytes
+    monkeypatch.setattr("mathcrypto.export.count_points", lambda *args: 1 << 32)
+    monkeypatch.setattr(
+        Export, "_with_orders", classmethod(lambda cls, curve, points, order: [(1, 2, order)])
+    )
+    path = tmp_path / "points.npy"
+    Export.curve_points(EllipticCurve(1, 0, 0, 1, 0, 2, 3, 97), str(path), orders=True)
+    meta, rows = load(path)
+    assert meta["dtype"] == "<u8"
+    assert rows == [[1, 2, 1 << 32]]
+
+
+def test_curve_points_without_orders(tmp_path):
+    curve = EllipticCurve(1, 0, 0, 1, 0, 0, 7, 101)
+    path = tmp_path / "points.npy"
+    Export.curve_points(curve, str(path))
+    meta, rows = load(path)
+    assert rows == [list(point) for point in curve.iter_points() if point != "[∞,∞]"] + [[101, 0]]
+
+
+@pytest.mark.parametrize("mod", [2, 97, 98, 1000, 2 ** 21 + 6])
+def test_group_elements(tmp_path, mod):
+    path = tmp_path / "elements.npy"
+    Export.group_elements(mod, str(path))
+    meta, elements = load(path)
+    if mod < 10 ** 4:
+        assert elements == MultiplicativeGroup(mod).elements
+    else:
+        assert elements == [n for n in range(1, mod) if math.gcd(n, mod) == 1]
+    assert meta["mod"] == mod
+
+
+@pytest.mark.parametrize("mod,element", [(97, 5), (97, 4), (98, 3), (1000, 7)])
+def test_subgroup(tmp_path, mod, element):
+    expected = MultiplicativeGroup(mod).get_element_subgroup(element)
+    path = tmp_path / "powers.npy"
+    description = Export.subgroup(mod, element, str(path))
+    meta, powers = load(path)
+    assert description["order"] == len(expected)
+    assert sorted(powers) == sorted(expected)
+    assert powers[:2] == [1, element % mod]
+
+    path = tmp_path / "members.bin"
+    description = Export.subgroup(mod, element, str(path), membership=True, file_format="raw")
+    meta, flags = load(path)
+    assert description["order"] == len(expected)
+    assert len(flags) == mod
+    assert [n for n, flag in enumerate(flags) if flag] == sorted(expected)
+
+
+def test_subgroup_not_an_element(tmp_path):
+    with pytest.raises(ValueError):
+        Export.subgroup(98, 7, str(tmp_path / "powers.npy"))
+
+
+def test_array_writer(tmp_path):
+    path = tmp_path / "rows.npy"
+    with ArrayWriter(str(path), ("a", "b"), itemsize=2, chunk_size=3, meta={"note": "test"}) as writer:
+        writer.write(range(20))
+        assert writer.rows == 10
+        writer.write(iter([20, 21]))
+    meta, rows = load(path)
+    assert rows == [[i, i + 1] for i in range(0, 22, 2)]
+    assert meta["note"] == "test"
+
+    with pytest.raises(ValueError):
+        ArrayWriter(str(path), ("a",), file_format="csv")
+    with pytest.raises(ValueError):
+        with ArrayWriter(str(path), ("a", "b")) as writer:
+            writer.write([1, 2, 3])
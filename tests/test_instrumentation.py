@@ -0,0 +1,34 @@
+from mathcrypto import instrumentation
+from mathcrypto.cryptography.diffie_hellman import DHCracker, DHCryptosystem
+from mathcrypto.cryptography.primes import Primes
+from mathcrypto.math.funcs import MathFunctions
+
+
+def test_disabled_by_default():
+    instrumentation.reset()
+    MathFunctions.euclid_gcd(135, 186)
+    assert instrumentation.snapshot() == {"counters": {}, "spans": {}}
+
+
+def test_collect_counts_primitives():
+    with instrumentation.collect() as stats:
+        Primes.is_probable_prime_fermat(17, rounds=3)
+        MathFunctions.euclid_gcd(135, 186)
+        Primes.factorize(24)
+    assert not instrumentation.ENABLED
+    assert stats["counters"]["gcd"] == 1
+    assert stats["counters"]["primality_rounds"] >= 3
+    assert stats["counters"]["factorize.trial_division"] == 1
+    assert stats["spans"]["factorize"]["calls"] == 1
+
+
+def test_callback_receives_events():
+    events = []
+    instrumentation.add_callback(lambda kind, name, value: events.append((kind, name)))
+    try:
+        with instrumentation.collect():
+            DHCracker.baby_step(DHCryptosystem(prime=23, generator=5, alice_sends=8, bob_sends=19))
+    finally:
+        instrumentation._callbacks.clear()
+    assert ("span", "baby_step") in events
+    assert ("count", "bsgs.table_size") in events
@@ -0,0 +1,71 @@
+import itertools
+import pickle
+
+import pytest
+
+from mathcrypto.cryptography.elliptic_curves import EllipticCurve
+from mathcrypto.math.fields import GF, ExtensionField, PrimeField
+
+
+@pytest.mark.parametrize("p", [2, 13, 17, 101, 1009])
+def test_prime_field_sqrt(p):
+    field = GF(p)
+    for value in range(p):
+        roots = [root for root in range(p) if root * root % p == value]
+        assert field.sqrt(value) == (roots[0] if roots else None)
+        assert field.legendre(value) == (0 if value == 0 else 1 if roots else -1)
+
+
+@pytest.mark.parametrize("p", [7, 101, 2**61 - 1])
+def test_prime_field_arithmetic(p):
+    field = GF(p)
+    a, b = field(3), field(p - 5)
+    assert a + b == -2
+    assert a * b == -15
+    assert (a / b) * b == a
+    assert a ** -1 * 3 == 1
+    assert field.batch_inverse([1, 2, 3, p - 1]) == [pow(v, -1, p) for v in (1, 2, 3, p - 1)]
+    assert field.batch_multiply([2, 3], [4, 5]) == [8 % p, 15 % p]
+    assert GF(p) is field and isinstance(field, PrimeField)
+    assert pickle.loads(pickle.dumps(a)) == a
+    with pytest.raises(ZeroDivisionError):
+        field.inverse(p)
+
+
+@pytest.mark.parametrize(
+    "p,degree,count", [(2, 2, 1), (2, 3, 2), (2, 4, 3), (3, 2, 3), (3, 3, 8), (5, 2, 10)]
+)
+def test_irreducible_count(p, degree, count):
+    polynomials = itertools.product(range(p), repeat=degree)
+    assert sum(ExtensionField.is_irreducible(p, (*low, 1)) for low in polynomials) == count
+
+
+@pytest.mark.parametrize("p,degree", [(2, 3), (3, 2), (5, 2)])
+def test_extension_field(p, degree):
+    field = GF(p, degree)
+    elements = list(field)
+    assert len(elements) == p ** degree == field.order
+    nonzero = [element for element in elements if element]
+    for a in elements:
+        for b in nonzero:
+            assert (a / b) * b == a
+            assert a * b == b * a
+            assert (a + b) - b == a
+    assert all(element ** (field.order - 1) == 1 for element in nonzero)
+    inverses = field.batch_inverse([element.coefficients for element in nonzero])
+    assert inverses == [element.inverse().coefficients for element in nonzero]
+
+
+def test_extension_field_invalid_modulus():
+    with pytest.raises(ValueError):
+        ExtensionField(2, 2, (1, 0, 1))
+
+
+def test_curve_over_extension_field():
+    field = GF(5, 2)
+    curve = EllipticCurve(1, 0, 0, 1, 0, 1, 1, field)
+    points = [(x, y) for x in field for y in field if curve.is_point_on_elliptic_curve(x, y)]
+    # y^2 = x^3 + x + 1 has 9 points over GF(5), trace -3, so 25 + 1 - (9 - 10) = 27 over GF(25)
+    assert len(points) + 1 == 27
+    for point in points[:10]:
+        assert 27 % curve.get_point_order(*point) == 0
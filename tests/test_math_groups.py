@@ -1,6 +1,10 @@
+import math
+import pickle
+
 import pytest
 
-from mathcrypto.math.groups import MultiplicativeGroup
+from mathcrypto.cryptography.rng import SeededRNG
+from mathcrypto.math.groups import Bitset, LogTable, MultiplicativeGroup
 
 
 @pytest.mark.parametrize("mod,expected", [(9, 6), (11, 10), (22, 10)])
@@ -51,3 +55,122 @@ def test_get_element_subgroup(mod, element, expected):
 def test_get_inverse_element(mod, element, expected):
     group = MultiplicativeGroup(mod)
     assert group.get_inverse_element(element) == expected
+
+
+@pytest.mark.parametrize("prime,expected", [(23, 5), (1019, 2), (7919, 7), (2**61 - 1, 37)])
+def test_find_primitive_root(prime, expected):
+    assert MultiplicativeGroup.find_primitive_root(prime) == expected
+
+
+@pytest.mark.parametrize("prime,order", [(23, 11), (23, 2), (1019, 509), (7919, 37), (7919, 74)])
+def test_find_subgroup_generator(prime, order):
+    element = MultiplicativeGroup.find_subgroup_generator(prime, order, rng=SeededRNG(order))
+    assert MultiplicativeGroup(prime).get_element_order(element) == order
+
+
+@pytest.mark.parametrize("mod", [11, 13, 29])
+def test_verify_generators(mod):
+    group = MultiplicativeGroup(mod)
+    checks = MultiplicativeGroup.verify_generators(mod, group.elements, num_cpus=2, chunk_size=4)
+    assert [element for element, check in zip(group.elements, checks) if check] == group.generators
+
+
+def test_find_subgroup_generator_wrong_order():
+    with pytest.raises(ValueError):
+        MultiplicativeGroup.find_subgroup_generator(23, 7)
+
+
+@pytest.mark.parametrize("mod", [2, 9, 11, 22, 29, 91, 1019])
+def test_compact_group(mod):
+    group = MultiplicativeGroup(mod, compact=True)
+    elements = [element for element in range(1, mod) if math.gcd(element, mod) == 1]
+    orders = {element: len({pow(element, k, mod) for k in range(mod)}) for element in elements}
+    assert list(group.elements) == elements
+    assert group.order == len(elements)
+    if group.order > 1:
+        assert list(group.generators) == [element for element in elements if orders[element] == group.order]
+    for element in elements:
+        assert group.get_element_order(element) == orders[element]
+        assert len(group.get_element_subgroup(element)) == orders[element]
+        assert element * group.get_inverse_element(element) % mod == 1
+    with pytest.raises(ValueError):
+        group.get_element_order(mod)
+
+
+def test_compact_group_pickle():
+    group = pickle.loads(pickle.dumps(MultiplicativeGroup(1019, compact=True)))
+    assert list(group.generators) == MultiplicativeGroup(1019).generators
+    assert group.get_element_order(2) == 1018
+
+
+@pytest.mark.parametrize("size,members", [(1, []), (10, [0, 3, 9]), (100003, [7, 8, 65536, 100002])])
+def test_bitset(size, members):
+    bitset = Bitset(size)
+    for member in members:
+        bitset.add(member)
+    assert list(bitset) == members
+    assert len(bitset) == len(members)
+    assert all(member in bitset for member in members)
+    assert -1 not in bitset and size not in bitset
+
+
+@pytest.mark.parametrize("mod,compact", [(9, False), (13, False), (50, True), (1019, True)])
+def test_group_tables(mod, compact):
+    group = MultiplicativeGroup(mod, compact=compact, tables=True)
+    plain = MultiplicativeGroup(mod, compact=True)
+    for element in group.elements:
+        assert group.get_element_order(element) == plain.get_element_order(element)
+        assert list(group.get_element_subgroup(element)) == sorted(plain.get_element_subgroup(element))
+        assert element * group.get_inverse_element(element) % mod == 1
+        assert pow(group.tables.generator, group.discrete_log(element), mod) == element
+
+
+@pytest.mark.parametrize("tables", [False, True])
+@pytest.mark.parametrize("mod,element,base", [(9, 8, 3), (9, 3, 2), (9, 8, 4), (13, 2, 0), (13, 2, 14)])
+def test_discrete_log_not_a_power(mod, element, base, tables):
+    with pytest.raises(ValueError):
+        MultiplicativeGroup(mod, tables=tables).discrete_log(element, base=base)
+
+
+@pytest.mark.parametrize("tables", [False, True])
+def test_discrete_log_smallest_exponent(tables):
+    group = MultiplicativeGroup(13, tables=tables)
+    for base in group.elements:
+        for element in group.get_element_subgroup(base):
+            k = group.discrete_log(element, base=base)
+            assert pow(base, k, 13) == element
+            assert all(pow(base, j, 13) != element for j in range(k))
+
+
+def test_trivial_group_tables():
+    group = MultiplicativeGroup(2, tables=True)
+    assert group.tables.generator == 1
+    assert group.discrete_log(1) == group.discrete_log(1, base=1) == 0
+    assert group.get_element_order(1) == 1
+
+
+@pytest.mark.parametrize("mod,generator", [(13, 2), (1019, 2), (27, 5)])
+def test_log_table(mod, generator):
+    order = MultiplicativeGroup(mod).order
+    table = LogTable(mod, generator, order)
+    elements = [element for element in range(1, mod) if element in table]
+    assert len(elements) == order
+    for a in elements[:20]:
+        assert table.power(a, -5) == pow(a, -5, mod)
+        for b in elements[:20]:
+            assert table.multiply(a, b) == a * b % mod
+            powers = {pow(b, k, mod) for k in range(order)}
+            if a in powers:
+                assert pow(b, table.discrete_log(a, b), mod) == a
+            else:
+                with pytest.raises(ValueError):
+                    table.discrete_log(a, b)
+        for divisor in (d for d in range(1, order + 1) if order % d == 0):
+            assert table.in_subgroup(a, divisor) == (pow(a, divisor, mod) == 1)
+    assert pickle.loads(pickle.dumps(table)).log == table.log
+
+
+@pytest.mark.parametrize("mod,generator,order", [(13, 3, 12), (8, 3, 4), (1 << 24, 3, 1 << 22)])
+def test_log_table_invalid(mod, generator, order):
+    with pytest.raises(ValueError):
+        LogTable(mod, generator, order)
@@ -0,0 +1,45 @@
+import math
+
+import pytest
+
+from mathcrypto.cryptography.rng import SeededRNG
+from mathcrypto.math import trees
+from mathcrypto.math.trees import ProductTree
+
+
+@pytest.mark.parametrize("moduli", [[7], [15, 21], [15, 21, 77], list(range(2, 40))])
+def test_product_tree(moduli):
+    with ProductTree(moduli) as tree:
+        assert tree.root == math.prod(moduli)
+        assert tree.size == len(moduli)
+        assert tree.level(0) == moduli
+        assert tree.level(tree.depth) == [tree.root]
+        num = 100000000000000000003
+        assert tree.remainders(num) == [num % modulus for modulus in moduli]
+        assert tree.remainders(num, squares=True) == [num % (modulus * modulus) for modulus in moduli]
+
+
+@pytest.mark.parametrize("num_cpus, spill", [(1, True), (2, False), (2, True)])
+def test_product_tree_parallel_and_spilled(tmp_path, num_cpus, spill):
+    rng = SeededRNG(5)
+    moduli = [rng.getrandbits(64) | 1 for _ in range(100)]
+    value = rng.getrandbits(4000)
+    spill_directory = str(tmp_path) if spill else None
+    with ProductTree(moduli, num_cpus=num_cpus, spill_directory=spill_directory, chunk_size=9) as tree:
+        assert tree.root == math.prod(moduli)
+        assert tree.remainders(value) == [value % modulus for modulus in moduli]
+        assert len(list(tmp_path.iterdir())) == int(spill)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_product_tree_empty():
+    with pytest.raises(ValueError):
+        ProductTree([])
+
+
+@pytest.mark.parametrize("bits", [4001, 9000, 30000])
+def test_mod(bits):
+    rng = SeededRNG(bits)
+    for a_bits in (bits - 3, 2 * bits, 5 * bits + 11):
+        a, b = rng.getrandbits(a_bits), rng.getrandbits(bits) | 1 << (bits - 1)
+        assert trees._mod(a, b) == a % b
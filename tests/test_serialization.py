@@ -0,0 +1,114 @@
+import pickle
+from array import array
+
+import pytest
+
+from mathcrypto import serialization
+from mathcrypto.cryptography.diffie_hellman import DHCracker, DHCryptosystem
+from mathcrypto.cryptography.elliptic_curves import EllipticCurve
+from mathcrypto.cryptography.rng import SeededRNG
+from mathcrypto.math.groups import MultiplicativeGroup
+
+
+@pytest.mark.parametrize("ints", [[], [0, -1, 1, 127, 128, -129, None, 2 ** 300, -(2 ** 70)]])
+def test_encode_ints(ints):
+    assert serialization.decode(serialization.encode(b"test", ints), b"test") == (ints, [])
+
+
+@pytest.mark.parametrize(
+    "values,width",
+    [
+        ([], 1),
+        ([0, 255], 1),
+        ([256, 3], 2),
+        ([2 ** 16 + 1, 7], 3),
+        ([2 ** 32 - 1], 4),
+        ([2 ** 40, 1], 6),
+        ([2 ** 70, 0], 9),
+    ],
+)
+def test_pack_array(values, width):
+    packed = serialization.pack_array(values)
+    assert len(packed) == 9 + width * len(values)
+    unpacked, end = serialization.unpack_array(packed)
+    assert list(unpacked) == values and end == len(packed)
+
+
+def test_pack_array_forced_width_and_bytes():
+    unpacked, _ = serialization.unpack_array(serialization.pack_array(array("I", [1, 2]), 4))
+    assert unpacked.itemsize == 4 and list(unpacked) == [1, 2]
+    unpacked, _ = serialization.unpack_array(serialization.pack_array(b"\x00\xff"))
+    assert bytes(unpacked) == b"\x00\xff"
+    with pytest.raises(ValueError):
+        serialization.pack_array([-1])
+    with pytest.raises(ValueError):
+        serialization.pack_array([256], 1)
+
+
+def test_decode_rejects_other_data():
+    data = serialization.encode(b"dh", [1, 2], [[3]])
+    with pytest.raises(ValueError):
+        serialization.decode(data, b"group")
+    with pytest.raises(ValueError):
+        serialization.decode(b"not a record at all", b"dh")
+    for length in range(len(data)):
+        with pytest.raises(ValueError):
+            serialization.decode(data[:length], b"dh")
+
+
+def test_dh_roundtrip():
+    dh = DHCryptosystem()
+    dh.generate_from(bit_length=64, rng=SeededRNG(1))
+    for clone in (DHCryptosystem.from_bytes(dh.to_bytes()), pickle.loads(pickle.dumps(dh))):
+        assert vars(clone) == vars(dh)
+    assert len(dh.to_bytes()) < len(pickle.dumps(vars(dh)))
+
+
+def test_dh_public():
+    dh = DHCryptosystem(prime=1019, generator=2, alice_secret=5, bob_secret=7)
+    dh.generate_rest()
+    public = dh.public()
+    assert public.alice_secret is None and public.bob_secret is None and public.alice_key is None
+    assert (public.prime, public.alice_sends, public.bob_sends) == (1019, dh.alice_sends, dh.bob_sends)
+    assert DHCracker.brute_force(public, 2) == dh.alice_key
+
+
+@pytest.mark.parametrize(
+    "curve", [EllipticCurve(1, 0, 0, 1, 0, 2, 3, 97, 3, 6), EllipticCurve(1, 0, 0, 1, 0, -1, 4)]
+)
+def test_curve_roundtrip(curve):
+    for clone in (EllipticCurve.from_bytes(curve.to_bytes()), pickle.loads(pickle.dumps(curve))):
+        assert vars(clone) == vars(curve)
+
+
+def test_curve_points():
+    curve = EllipticCurve(1, 0, 0, 1, 0, 2, 3, 97)
+    order, points = curve.get_curve_order(get_points=True)
+    data = curve.points_to_bytes(points)
+    assert len(data) < len(pickle.dumps(points)) / 3
+    restored = curve.points_from_bytes(data)
+    assert len(restored) == order and restored[-1] == "[∞,∞]"
+    assert restored[:-1] == [[x, y % 97] for x, y in points[:-1]]
+    with pytest.raises(ValueError):
+        EllipticCurve(1, 0, 0, 1, 0, 2, 3, 101).points_from_bytes(data)
+
+
+@pytest.mark.parametrize(
+    "mod,compact,tables",
+    [(1019, False, False), (1019, True, True), (98, False, True), (2 ** 16 + 1, True, False)],
+)
+def test_group_roundtrip(mod, compact, tables):
+    group = MultiplicativeGroup(mod, compact=compact, tables=tables)
+    for clone in (MultiplicativeGroup.from_bytes(group.to_bytes()), pickle.loads(pickle.dumps(group))):
+        assert clone.compact == compact and clone.order == group.order
+        assert list(clone.elements) == list(group.elements)
+        assert list(clone.generators) == list(group.generators)
+        assert isinstance(clone.elements, type(group.elements))
+        assert clone.get_element_order(3) == group.get_element_order(3)
+        if tables:
+            assert clone.tables.log == group.tables.log and clone.tables.antilog == group.tables.antilog
+
+
+def test_compact_group_stores_bits():
+    group = MultiplicativeGroup(100003, compact=True)
+    assert len(group.to_bytes()) < 100003 // 4 + 100
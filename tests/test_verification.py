@@ -0,0 +1,210 @@
+import math
+
+import pytest
+
+from mathcrypto import instrumentation, verification
+from mathcrypto.cryptography.elliptic_curves import EllipticCurve
+from mathcrypto.cryptography.primes import Primes
+from mathcrypto.cryptography.rng import SeededRNG
+from mathcrypto.math.funcs import MathFunctions
+from mathcrypto.math.groups import MultiplicativeGroup
+from mathcrypto.reference import REFERENCES, ReferenceBackend
+
+CARMICHAEL = [561, 1105, 1729, 2465, 2821, 6601, 8911, 10585, 15841, 29341, 41041, 46657, 52633, 62745]
+PRIMES = Primes.sieve(1 << 12)
+SAMPLES = 40
+
+
+def choice(rng, values):
+    return values[rng.randrange(0, len(values))]
+
+
+def special_number(rng):
+    """Numbers where shortcuts tend to go wrong: Carmichael numbers, prime powers and semiprimes"""
+    kind = rng.randrange(0, 4)
+    if kind == 0:
+        return choice(rng, CARMICHAEL)
+    if kind == 1:
+        return choice(rng, PRIMES[:20]) ** rng.randint(2, 8)
+    if kind == 2:
+        return choice(rng, PRIMES) * choice(rng, PRIMES)
+    return rng.randrange(0, 1 << 20)
+
+
+def case_is_prime(rng):
+    Primes.is_prime(special_number(rng))
+
+
+def case_factorize(rng):
+    Primes.factorize(max(1, special_number(rng)))
+
+
+def case_phi(rng):
+    MathFunctions.phi(max(1, special_number(rng) % (1 << 16)))
+
+
+def case_crt(rng):
+    moduli = []
+    while len(moduli) < rng.randint(2, 4):
+        modulus = choice(rng, PRIMES[:25]) ** rng.randint(1, 2)
+        if all(math.gcd(modulus, other) == 1 for other in moduli):
+            moduli.append(modulus)
+    MathFunctions.crt([[rng.randrange(0, modulus), modulus] for modulus in moduli])
+
+
+def case_eea(rng):
+    modulus = rng.randrange(2, 1 << 16)
+    number = rng.randrange(1, modulus + 1)
+    while math.gcd(number, modulus) != 1:
+        number = rng.randrange(1, modulus + 1)
+    MathFunctions.eea(modulus, number)
+
+
+def case_element_order(rng):
+    mod = rng.randrange(2, 3000)
+    group = MultiplicativeGroup(mod, compact=bool(rng.randrange(0, 2)))
+    for _ in range(5):
+        group.get_element_order(choice(rng, list(group.elements)))
+
+
+def case_curve_order(rng):
+    field = choice(rng, PRIMES[1:])
+    a4, a5, a6 = (rng.randrange(0, field) for _ in range(3))
+    EllipticCurve(1, 0, 0, 1, a4, a5, a6, field).get_curve_order(get_points=field < 500)
+
+
+def case_add_point(rng):
+    field = choice(rng, PRIMES[1:100])
+    a4, a5, a6 = (rng.randrange(0, field) for _ in range(3))
+    points = list(EllipticCurve(1, 0, 0, 1, a4, a5, a6, field).iter_points())[:-1]
+    for _ in range(5):
+        point_p = choice(rng, points)
+        point_q = [point_p, [point_p[0], -point_p[1]], choice(rng, points)][rng.randrange(0, 3)]
+        curve = EllipticCurve(1, 0, 0, 1, a4, a5, a6, field, *point_p)
+        try:
+            curve.add_point(*point_q)
+        except ValueError:
+            # the tangent at a point with y = 0 is vertical, the sum is not representable here
+            assert point_p[1] == 0
+
+
+# checked name to a function making one or more random calls of the optimised path
+CASES = {
+    "Primes.is_prime": case_is_prime,
+    "Primes.factorize": case_factorize,
+    "MathFunctions.phi": case_phi,
+    "MathFunctions.crt": case_crt,
+    "MathFunctions.eea": case_eea,
+    "MultiplicativeGroup.get_element_order": case_element_order,
+    "EllipticCurve.get_curve_order": case_curve_order,
+    "EllipticCurve.add_point": case_add_point,
+}
+
+
+def test_every_reference_has_a_case():
+    assert set(CASES) == set(REFERENCES)
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_differential(name, seed):
+    rng = SeededRNG(seed)
+    with verification.sampling(verify=1.0) as stats:
+        for _ in range(SAMPLES):
+            CASES[name](rng)
+    assert stats["disagreements"] == []
+    assert stats["checked"][name] >= SAMPLES
+
+
+@pytest.mark.parametrize("num", CARMICHAEL)
+def test_carmichael_numbers(num):
+    with verification.sampling(strict=True):
+        assert not Primes.is_prime(num)
+        assert Primes.factorize(num) == ReferenceBackend.factorize(num)
+        assert MathFunctions.phi(num) == ReferenceBackend.phi(num)
+
+
+@pytest.mark.parametrize(
+    "function,args,expected",
+    [
+        (ReferenceBackend.is_prime, (97,), True),
+        (ReferenceBackend.is_prime, (1,), False),
+        (ReferenceBackend.factorize, (1,), [1]),
+        (ReferenceBackend.factorize, (360,), [2, 2, 2, 3, 3, 5]),
+        (ReferenceBackend.phi, (1,), 1),
+        (ReferenceBackend.phi, (36,), 12),
+        (ReferenceBackend.crt, ([[8, 9], [3, 5]],), 8),
+        (ReferenceBackend.eea, (7, 3), 5),
+        (ReferenceBackend.element_order, (7, 2), 3),
+        (ReferenceBackend.curve_order, (97, 0, 2, 3), 100),
+        (ReferenceBackend.add_point, (97, 0, 2, [3, 6], [3, 91]), "[∞,∞]"),
+        (ReferenceBackend.add_point, (97, 0, 2, [3, 6], [3, 6]), [80, 10]),
+    ],
+)
+def test_reference(function, args, expected):
+    assert function(*args) == expected
+
+
+def test_reference_domain():
+    with pytest.raises(ValueError):
+        ReferenceBackend.crt([[1, 4], [3, 6]])
+    with pytest.raises(ValueError):
+        ReferenceBackend.eea(8, 4)
+    with pytest.raises(ValueError):
+        ReferenceBackend.curve_order(91, 0, 2, 3)
+
+
+def test_disabled_by_default():
+    verification.reset()
+    Primes.is_prime(97)
+    assert not verification.RATE
+    assert verification.snapshot()["checked"] == {}
+
+
+def test_disagreement_is_recorded():
+    with verification.sampling() as stats:
+        verification.check("MathFunctions.phi", (36,), 11)
+        verification.check("MathFunctions.phi", (36,), 12)
+    assert stats["checked"] == {"MathFunctions.phi": 2}
+    assert stats["mismatches"] == {"MathFunctions.phi": 1}
+    assert stats["disagreements"] == [
+        {"function": "MathFunctions.phi", "args": (36,), "result": 11, "expected": 12}
+    ]
+
+
+def test_strict():
+    with pytest.raises(verification.VerificationError) as error:
+        with verification.sampling(strict=True):
+            verification.check("Primes.is_prime", (91,), True)
+    assert error.value.record["expected"] is False
+    assert not verification.RATE
+
+
+def test_limit_and_domain_are_skipped():
+    with instrumentation.collect() as counters, verification.sampling(limit=100) as stats:
+        Primes.is_prime(2 ** 61 - 1)
+        MathFunctions.phi(10007)
+        EllipticCurve(1, 0, 0, 1, 0, 2, 3, 91).get_curve_order()
+        MathFunctions.phi(97)
+    assert stats["skipped"] == {
+        "Primes.is_prime": 1,
+        "MathFunctions.phi": 1,
+        "EllipticCurve.get_curve_order": 1,
+    }
+    # phi and get_curve_order test the primality of 10007, 91 and 97 on the way
+    assert stats["checked"] == {"Primes.is_prime": 3, "MathFunctions.phi": 1}
+    assert counters["counters"]["verify.checked"] == 4
+
+
+def test_sampling_fraction():
+    with verification.sampling(verify=0.25, rng=SeededRNG(1)) as stats:
+        for num in range(2000):
+            Primes.is_prime(num)
+    assert 400 < stats["checked"]["Primes.is_prime"] < 600
+
+    with verification.sampling(verify=0.0) as stats:
+        verification.check("Primes.is_prime", (91,), True)
+    assert stats["checked"] == {}
+
+    with pytest.raises(ValueError):
+        verification.enable(1.5)